@@ -0,0 +1,436 @@
+"""Direct processing of ZIP/TAR archives of profiles without extracting them to disk.
+
+Profile members (*.csv, possibly compressed) are streamed straight into the
+parsers: members up to the streaming threshold of the memory budget are read
+whole, larger and compressed ones are parsed group by group while they are
+read (see memory_governor). Outputs go either to a mirrored folder tree or into an output archive
+(.zip, .tar, .tar.gz/.tgz, .tar.bz2, .tar.xz).
+
+With jobs > 1 members are parsed in a process pool. ZIP members are read by
+the workers themselves (random access), TAR members are read sequentially and
+handed to the workers, with a bounded number of members in flight.
+"""
+import io
+import logging
+import os
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterator, Optional, Set, TextIO, Union
+import parser_api
+import parser_utils
+from memory_governor import MemoryBudget, BudgetExceeded, limit_jobs, parse_lines
+from output_writer import OutputWriter, DEFAULT_DURABILITY, DEFAULT_FORMAT, OUTPUT_FORMATS, fsync_directory, \
+    serialize_output
+
+if TYPE_CHECKING:
+    from progress import Progress
+
+logger = logging.getLogger(__name__)
+
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+ARCHIVE_SUFFIXES = ('.zip',) + TAR_SUFFIXES
+
+# Tar write modes by output archive suffix
+TAR_WRITE_MODES = {
+    '.tar': 'w', '.tar.gz': 'w:gz', '.tgz': 'w:gz', '.tar.bz2': 'w:bz2', '.tbz2': 'w:bz2',
+    '.tar.xz': 'w:xz', '.txz': 'w:xz',
+}
+
+# Members handed to workers ahead of the one currently being written, per worker
+IN_FLIGHT_PER_JOB = 4
+
+# Prefix of the error of members skipped under the memory budget, as in main.process_files
+SKIPPED = "skipped: "
+
+
+def archive_suffix(path) -> str:
+    """Return the archive suffix of path ('.zip', '.tar.gz', ...) or '' if it is not an archive name."""
+    name = str(path).lower()
+    for suffix in sorted(ARCHIVE_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return suffix
+    return ''
+
+
+def is_archive(path) -> bool:
+    """Check if path is an existing ZIP or TAR archive."""
+    path = Path(path)
+    if not path.is_file():
+        return False
+    return zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+
+
+def safe_member_path(name: str) -> Optional[PurePosixPath]:
+    """Return the member name as a relative path, or None if it would escape the output folder."""
+    path = PurePosixPath(name.replace('\\', '/'))
+    if path.is_absolute() or '..' in path.parts or not path.parts:
+        return None
+    return path
+
+
+def decompress_member(name: str, data: bytes) -> bytes:
+    """Decompress a member compressed on its own (e.g. 'card.csv.gz' inside a tar)."""
+    suffix = parser_utils.compression_suffix(name)
+    if suffix == '.gz':
+        import gzip
+        return gzip.decompress(data)
+    if suffix == '.bz2':
+        import bz2
+        return bz2.decompress(data)
+    if suffix == '.xz':
+        import lzma
+        return lzma.decompress(data)
+    if suffix == '.zst':
+        with parser_utils.open_zstd(io.BytesIO(data)) as f:
+            return f.read().encode('utf-8')
+    return data
+
+
+class ForwardReader(io.RawIOBase):
+    """Read-only, non-seekable view of a member stream.
+
+    Members of a TAR read in stream mode fail when asked whether they are seekable,
+    which text and decompressing readers do when they are opened.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        return self.stream.readinto(buffer)
+
+
+def open_member(name: str, raw: BinaryIO) -> TextIO:
+    """Open a member stream as text, decompressing it on the fly (invalid UTF-8 is replaced, like parse_bytes)."""
+    raw = io.BufferedReader(ForwardReader(raw))
+    suffix = parser_utils.compression_suffix(name)
+    if suffix == '.gz':
+        import gzip
+        return gzip.open(raw, 'rt', encoding='utf-8', errors='replace')
+    if suffix == '.bz2':
+        import bz2
+        return bz2.open(raw, 'rt', encoding='utf-8', errors='replace')
+    if suffix == '.xz':
+        import lzma
+        return lzma.open(raw, 'rt', encoding='utf-8', errors='replace')
+    if suffix == '.zst':
+        return parser_utils.open_zstd(raw, 'utf-8')
+    return io.TextIOWrapper(raw, encoding='utf-8', errors='replace')
+
+
+def budget_error(name: str, size: int, budget: Optional[MemoryBudget]) -> Optional[str]:
+    """Return why a member of size bytes is skipped under the budget's hard cap, or None if it is within it."""
+    if budget is None:
+        return None
+    try:
+        budget.check_size(size, name)
+    except BudgetExceeded as e:
+        return f"{SKIPPED}{e}"
+    return None
+
+
+def member_sizes(archive_path: str) -> Optional[dict[str, int]]:
+    """Return {member name: size} of the profile members of a ZIP archive, as iter_members yields them.
+
+    Returns None for TAR archives, which are streamed and cannot be listed without reading them.
+    """
+    if not zipfile.is_zipfile(archive_path):
+        return None
+    with zipfile.ZipFile(archive_path) as archive:
+        return {info.filename: info.file_size for info in archive.infolist()
+                if not info.is_dir() and parser_utils.is_profile_file(info.filename)}
+
+
+def iter_members(archive_path: str, read: bool = True, budget: Optional[MemoryBudget] = None
+                 ) -> Iterator[tuple[str, Union[bytes, BinaryIO, None], Optional[str]]]:
+    """Yield (member name, content, skip reason) for every profile member of a ZIP or TAR archive.
+
+    content is the member's bytes, or an open stream of a member that budget streams
+    (see MemoryBudget.streams), valid until the next member is yielded. With
+    read=False only the names are listed (content is None), which is used to let
+    workers read ZIP members on their own. Members larger than the hard cap of
+    budget are not read: their content is None and the skip reason is set.
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not parser_utils.is_profile_file(info.filename):
+                    continue
+                error = budget_error(info.filename, info.file_size, budget)
+                if error or not read:
+                    yield info.filename, None, error
+                elif budget is not None and budget.streams(info.filename, info.file_size):
+                    with archive.open(info) as stream:
+                        yield info.filename, stream, None
+                else:
+                    yield info.filename, archive.read(info), None
+    else:
+        # Stream mode: members are read in order, without seeking back
+        with tarfile.open(archive_path, 'r|*') as archive:
+            for member in archive:
+                if not member.isfile() or not parser_utils.is_profile_file(member.name):
+                    continue
+                error = budget_error(member.name, member.size, budget)
+                if error:
+                    yield member.name, None, error
+                elif budget is not None and budget.streams(member.name, member.size):
+                    yield member.name, archive.extractfile(member), None
+                else:
+                    yield member.name, archive.extractfile(member).read(), None
+
+
+_worker_zip: dict[str, zipfile.ZipFile] = {}
+
+
+def convert_member(archive_path: Optional[str], name: str, data: Union[bytes, BinaryIO, None], delimiter: str,
+                   excluded_properties: Optional[Set[str]], sections: Optional[Set[str]] = None,
+                   header_only: bool = False, budget: Optional[MemoryBudget] = None,
+                   typed: bool = False,
+                   output_format: str = DEFAULT_FORMAT) -> tuple[str, Optional[bytes], Optional[str]]:
+    """Parse one archive member and return (name, serialized output, error message).
+
+    data is the member's bytes or an open stream of it (see iter_members). When data
+    is None the member is read from the ZIP archive at archive_path, or streamed when
+    budget streams it. With header_only only the basic information is extracted (see
+    parser_api.parse_header_lines). Members whose decompressed content is over the
+    byte/line budget are not parsed.
+    """
+    try:
+        if data is None:
+            archive = _worker_zip.get(archive_path)
+            if archive is None:
+                archive = _worker_zip[archive_path] = zipfile.ZipFile(archive_path)
+            info = archive.getinfo(name)
+            if budget is not None and budget.streams(name, info.file_size):
+                data = archive.open(info)
+            else:
+                data = archive.read(info)
+        if not isinstance(data, bytes):
+            # Streamed: decompressed and parsed group by group within the byte/line budget
+            with data, open_member(name, data) as f:
+                lines = budget.limit(f, name)
+                if header_only:
+                    result = parser_api.parse_header_lines(lines, delimiter=delimiter, name=name,
+                                                           excluded_properties=excluded_properties)
+                else:
+                    _, result = parse_lines(name, lines, True, delimiter, excluded_properties, sections, typed)
+            return name, serialize_output(result, output_format), None
+        data = decompress_member(name, data)
+        if budget is not None:
+            budget.check_content(data, name)
+        if header_only:
+            lines = data.decode('utf-8', errors='replace').splitlines()
+            result = parser_api.parse_header_lines(lines, delimiter=delimiter, name=name,
+                                                   excluded_properties=excluded_properties)
+            return name, serialize_output(result, output_format), None
+        result = parser_api.parse_bytes(data, delimiter=delimiter, name=name,
+                                        excluded_properties=excluded_properties, sections=sections, typed=typed)
+        return name, serialize_output(result, output_format), None
+    except BudgetExceeded as e:
+        return name, None, f"{SKIPPED}{e}"
+    except Exception as e:
+        return name, None, f"{type(e).__name__}: {e}"
+
+
+class ArchiveOutput:
+    """Writes outputs into an output archive, or a mirrored folder tree when output is a folder.
+
+    An output archive is built under a temporary name and renamed into place on close,
+    or discarded by abort, so a failed or interrupted run never leaves a truncated
+    archive behind.
+    """
+
+    def __init__(self, output_path: Path, durability: str = DEFAULT_DURABILITY):
+        self.output_path = output_path
+        self.durability = durability
+        suffix = archive_suffix(output_path)
+        self.zip = None
+        self.tar = None
+        self.writer = None
+        self.tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+        if suffix == '.zip':
+            self.zip = zipfile.ZipFile(self.tmp_path, 'w', compression=zipfile.ZIP_DEFLATED)
+        elif suffix:
+            self.tar = tarfile.open(self.tmp_path, TAR_WRITE_MODES[suffix])
+        else:
+            output_path.mkdir(parents=True, exist_ok=True)
+            self.writer = OutputWriter(durability)
+
+    def write(self, rel_path: PurePosixPath, content: bytes,
+              on_commit: Optional[Callable[[Path], None]] = None) -> Path:
+        """Write one output; on_commit(path) is called once it is written, see OutputWriter.write_bytes."""
+        if self.zip is not None:
+            self.zip.writestr(str(rel_path), content)
+        elif self.tar is not None:
+            info = tarfile.TarInfo(str(rel_path))
+            info.size = len(content)
+            self.tar.addfile(info, io.BytesIO(content))
+        else:
+            out_path = self.output_path.joinpath(*rel_path.parts)
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            return self.writer.write_bytes(out_path, content, on_commit)
+        if on_commit:
+            on_commit(Path(rel_path))
+        return Path(rel_path)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            return
+        (self.zip or self.tar).close()
+        if self.durability in ('batch', 'full'):
+            with open(self.tmp_path, 'rb') as f:
+                os.fsync(f.fileno())
+        os.replace(self.tmp_path, self.output_path)
+        if self.durability in ('batch', 'full'):
+            fsync_directory(self.output_path.parent)
+
+    def abort(self) -> None:
+        """Discard a partially written output archive; outputs written to a folder are complete and kept."""
+        if self.writer is not None:
+            self.writer.close()
+            return
+        try:
+            (self.zip or self.tar).close()
+        finally:
+            self.tmp_path.unlink(missing_ok=True)
+
+
+def process_archive(archive_path: str, output: Optional[str] = None, delimiter: str = ';',
+                    excluded_properties: Optional[Set[str]] = None, jobs: int = 1,
+                    durability: str = DEFAULT_DURABILITY, sections: Optional[Set[str]] = None,
+                    header_only: bool = False, budget: Optional[MemoryBudget] = None,
+                    typed: bool = False, output_format: str = DEFAULT_FORMAT,
+                    progress: Optional["Progress"] = None,
+                    on_file_done: Optional[Callable[[str, Optional[Path], Optional[str]], None]] = None) -> list[Path]:
+    """Process all CSV profiles in a ZIP/TAR archive without extracting it.
+
+    Args:
+        archive_path: Path to the source archive
+        output: Output folder, or output archive path (.zip/.tar/.tar.gz/...);
+            default: archive name + '_parsed' folder in current directory
+        delimiter: CSV delimiter character
+        excluded_properties: Set of property names to exclude from output
+        jobs: Number of worker processes used to parse members
+        durability: Output durability level ('none', 'atomic', 'batch' or 'full'), see output_writer
+        sections: Section names or patterns to keep besides "Basic information" (default: all)
+        header_only: Output just the basic information of each member
+        budget: Optional per-member MemoryBudget; members above its streaming threshold are
+            parsed while they are read, members over its caps are skipped (and reported to
+            on_file_done) and the number of workers is limited by the available memory
+        typed: Output typed records where the parser supports it (TPM)
+        output_format: 'json' or 'msgpack' (schema-versioned MessagePack, see binary_format)
+        progress: Optional Progress reporting finished members; the totals (and ETA) are known
+            for ZIP archives only
+        on_file_done: Called after each member as on_file_done(member name, out_path, error),
+            see main.process_files
+
+    Returns a list of written output Paths (member paths when writing into an output archive).
+    """
+    source = Path(archive_path).resolve()
+    if not is_archive(source):
+        logger.error(f"Not a ZIP/TAR archive: {source}")
+        return []
+
+    if output:
+        output_path = Path(output).resolve()
+    else:
+        stem = source.name[:-len(archive_suffix(source))] if archive_suffix(source) else source.stem
+        output_path = Path.cwd() / f"{stem}_parsed"
+
+    logger.info(f"Source archive: {source}")
+    logger.info(f"Output: {output_path}")
+
+    # Compiled once here, not per member
+    if excluded_properties:
+        excluded_properties = parser_utils.name_matcher(excluded_properties)
+    if sections is not None:
+        sections = parser_utils.name_matcher(sections)
+    if budget is not None:
+        jobs = limit_jobs(jobs, budget)
+    suffix = OUTPUT_FORMATS[output_format]
+    sizes: dict[str, int] = {}
+    if progress is not None:
+        sizes = member_sizes(str(source)) or {}
+        if sizes:
+            progress.add_inputs(sizes)
+    writer = ArchiveOutput(output_path, durability)
+    outputs: list[Path] = []
+    try:
+        for name, content, error in convert_members(str(source), delimiter, excluded_properties, jobs, sections,
+                                                       header_only, budget, typed, output_format):
+            # Results of the workers arrive here in archive order, one at a time
+            if progress is not None:
+                progress.advance(sizes.get(name, 0), error is not None)
+            rel_path = safe_member_path(name)
+            if rel_path is None:
+                logger.warning(f"Skipping unsafe archive member: {name}", extra={"input": name})
+                error = "unsafe member path"
+            elif error and error.startswith(SKIPPED):
+                logger.warning(f"Skipping {name}: {error[len(SKIPPED):]}", extra={"input": name})
+            elif error:
+                logger.error(f"Failed to process {name}: {error}", extra={"input": name})
+            if error:
+                if on_file_done:
+                    on_file_done(name, None, error)
+                continue
+            rel_path = PurePosixPath(parser_utils.strip_compression_suffix(rel_path).with_suffix(suffix).as_posix())
+
+            # Reported done once the output is written (see ArchiveOutput.write)
+            def committed(path: Path, name: str = name) -> None:
+                if on_file_done:
+                    on_file_done(name, path, None)
+
+            outputs.append(writer.write(rel_path, content, committed))
+            logger.info("Result saved to %s", rel_path, extra=parser_utils.PER_FILE)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+    logger.info(f"Processing complete. {len(outputs)} file(s) converted.")
+    return outputs
+
+
+def convert_members(archive_path: str, delimiter: str, excluded_properties: Optional[Set[str]],
+                    jobs: int, sections: Optional[Set[str]] = None, header_only: bool = False,
+                    budget: Optional[MemoryBudget] = None, typed: bool = False,
+                    output_format: str = DEFAULT_FORMAT) -> Iterator[tuple[str, Optional[bytes], Optional[str]]]:
+    """Convert all profile members of an archive, yielding results in archive order.
+
+    Members skipped under budget are yielded with their skip reason.
+    """
+    if jobs <= 1:
+        for name, data, error in iter_members(archive_path, budget=budget):
+            yield (name, None, error) if error else convert_member(
+                archive_path, name, data, delimiter, excluded_properties, sections, header_only, budget, typed,
+                output_format)
+        return
+
+    # ZIP members are read by the workers, TAR members have to be read here in order
+    read_here = not zipfile.is_zipfile(archive_path)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for name, data, error in iter_members(archive_path, read=read_here, budget=budget):
+            if error or not (data is None or isinstance(data, bytes)):
+                # Skipped members, and streamed TAR members that cannot be handed to a worker,
+                # are handled here once the members before them are done
+                while pending:
+                    yield pending.popleft().result()
+                yield (name, None, error) if error else convert_member(
+                    archive_path, name, data, delimiter, excluded_properties, sections, header_only, budget, typed,
+                    output_format)
+                continue
+            pending.append(executor.submit(convert_member, archive_path, name, data,
+                                           delimiter, excluded_properties, sections, header_only, budget, typed,
+                                           output_format))
+            if len(pending) >= jobs * IN_FLIGHT_PER_JOB:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,81 @@
+"""Per-file logging overhead benchmark.
+
+Converts copies of small profiles with process_files, once with the default
+INFO logging (written to a log file) and once in quiet mode (see
+run_logging), and reports the time per file the per-file log lines cost.
+Also compares f-string and lazy %-formatted log calls at a disabled level.
+
+Usage:
+    python benchmarks/bench_logging.py [--files 2000] [--runs 3]
+"""
+import argparse
+import logging
+import shutil
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import run_logging  # noqa: E402
+from bench_tokenizer import best_of  # noqa: E402
+from main import process_files  # noqa: E402
+
+PROFILE = "Manufacturer; INTC\nFirmware version; 11.0\n\nTPM2_Create\n\nKey parameters:;RSA 1024\n" \
+          "operation stats (ms/op):;avg op:;100.00;min op:;90.00;max op:;110.00\n"
+
+
+def configure(mode: str, log_path: Path) -> None:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    handler = logging.FileHandler(log_path, mode='w')
+    handler.setFormatter(logging.Formatter('[%(levelname)s] %(name)s: %(message)s'))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    if mode == 'quiet':
+        run_logging.configure_quiet()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Measure the per-file cost of INFO logging in process_files.')
+    parser.add_argument('--files', type=int, default=2000, help='Number of profiles converted per run')
+    parser.add_argument('--runs', type=int, default=3, help='Repetitions per measurement, the fastest is kept')
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        source, output = tmp / 'profiles', tmp / 'parsed'
+        source.mkdir()
+        for i in range(args.files):
+            (source / f'tpm_{i}.csv').write_text(PROFILE)
+        files = [str(path) for path in sorted(source.iterdir())]
+
+        results = {}
+        for mode in ('info', 'quiet'):
+            configure(mode, tmp / f'{mode}.log')
+            results[mode] = best_of(args.runs, process_files, files, ';', None, output, source)
+            lines = sum(1 for _ in open(tmp / f'{mode}.log'))
+            print(f"{mode:<6} {results[mode]:9.1f} ms  {results[mode] * 1000 / args.files:7.1f} us/file  "
+                  f"{lines // args.runs} log line(s) per run")
+        saved = (results['info'] - results['quiet']) * 1000 / args.files
+        print(f"per-file logging overhead removed: {saved:.1f} us/file "
+              f"({(results['info'] - results['quiet']) / results['info']:.1%})")
+
+        logger = logging.getLogger('bench')
+        logger.setLevel(logging.WARNING)
+        path = str(source / 'tpm_0.csv')
+        eager = min(timeit.repeat(lambda: logger.info(f"Processing file: {path}"), number=100000, repeat=3))
+        lazy = min(timeit.repeat(lambda: logger.info("Processing file: %s", path), number=100000, repeat=3))
+        print(f"disabled INFO call: f-string {eager * 10:.3f} us, lazy %-format {lazy * 10:.3f} us")
+    finally:
+        logging.getLogger().handlers.clear()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""Output format benchmark: size and encode/decode time of JSON vs MessagePack.
+
+Converts a synthetic JCPerf profile and compares the serialized size and the
+encode/decode times of the indented JSON output with the MessagePack output of
+binary_format, using the `msgpack` package when installed and the pure-Python
+fallback otherwise.
+
+Usage:
+    python benchmarks/bench_output_format.py [--methods 5000] [--runs 5]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import binary_format  # noqa: E402
+import parser_utils  # noqa: E402
+from bench_tokenizer import best_of, synthetic_jcperf  # noqa: E402
+from output_writer import serialize_json  # noqa: E402
+from parser_api import convert_groups  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Compare JSON and MessagePack outputs of a big JCPerf profile.')
+    parser.add_argument('--methods', type=int, default=5000, help='Measured methods in the synthetic profile')
+    parser.add_argument('--runs', type=int, default=5, help='Repetitions per measurement, the fastest is kept')
+    args = parser.parse_args()
+
+    result = convert_groups(list(parser_utils.iter_groups(synthetic_jcperf(args.methods))), 'javacard-performance')
+    encoded = {'json': serialize_json(result), 'msgpack': binary_format.dumps(result)}
+    encoders = {'json': serialize_json, 'msgpack': binary_format.dumps}
+    decoders = {'json': json.loads, 'msgpack': binary_format.loads}
+    if binary_format.loads(encoded['msgpack']) != result:
+        raise SystemExit("MessagePack round trip does not match the parsed result")
+
+    implementation = 'msgpack package' if binary_format.msgpack is not None else 'pure-Python fallback'
+    print(f"{args.methods} methods, MessagePack via {implementation}:")
+    for name, data in encoded.items():
+        encode = best_of(args.runs, encoders[name], result)
+        decode = best_of(args.runs, decoders[name], data)
+        print(f"  {name:<8} {len(data) / 1024:10.1f} KiB  encode {encode:8.2f} ms  decode {decode:8.2f} ms")
+    print(f"  size ratio {len(encoded['json']) / len(encoded['msgpack']):.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Cold-start benchmark for single-file conversions.
+
+Times a fresh `python main.py` converting one small test-data profile end to
+end, and reports the cumulative import time of main.py (`python -X importtime`)
+and which parser modules were loaded by the import alone.
+
+Usage:
+    python benchmarks/bench_startup.py [--budget-ms 300] [--runs 5]
+"""
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PARSER_MODULES = {'tpm_parser', 'jcperf_parser', 'jcaid_parser', 'jcres_parser'}
+
+
+def smallest_profile() -> Path:
+    """Return the smallest CSV profile of the test data."""
+    return min((REPO_ROOT / 'tests' / 'test-data').rglob('*.csv'), key=lambda path: path.stat().st_size)
+
+
+def conversion_time(profile: Path) -> float:
+    """Convert profile with a fresh `python main.py` and return the wall-clock time (ms)."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, str(REPO_ROOT / 'main.py'), str(profile), '--quiet'],
+                   cwd=REPO_ROOT, capture_output=True, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def import_times(code: str = 'import main') -> dict[str, int]:
+    """Run code in a fresh interpreter and return cumulative import time (us) per top-level module."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        # Format: "import time:  self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Measure cold-start time of a single-file conversion.')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters to sample')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='Fail if the median end-to-end conversion time exceeds this budget')
+    args = parser.parse_args()
+
+    source = smallest_profile()
+    import_samples = []
+    conversion_samples = []
+    loaded_parsers: set[str] = set()
+    with tempfile.TemporaryDirectory() as tmp:
+        # The output is written next to the input, keep it out of the test data
+        profile = Path(shutil.copy(source, tmp))
+        for _ in range(args.runs):
+            times = import_times()
+            import_samples.append(times['main'] / 1000)
+            loaded_parsers |= PARSER_MODULES & times.keys()
+            conversion_samples.append(conversion_time(profile))
+
+    median = statistics.median(conversion_samples)
+    print(f"convert {source.name} ({source.stat().st_size} bytes): median {median:.2f} ms over {args.runs} run(s) "
+          f"(min {min(conversion_samples):.2f} ms)")
+    print(f"import main: median {statistics.median(import_samples):.2f} ms (min {min(import_samples):.2f} ms)")
+    print(f"parser modules imported at startup: {sorted(loaded_parsers) or 'none'}")
+
+    if loaded_parsers:
+        return 1
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"over budget ({args.budget_ms:.2f} ms)")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Tokenizer and parse-throughput benchmark.
+
+Compares ways of splitting profile lines into stripped fields on the lines of
+the test corpus (plus synthetic TPM and JCPerf profiles), then times the
+end-to-end conversion of each parser type. Results can be saved and compared
+against a run on another revision to show the speedup of a change.
+
+Usage:
+    python benchmarks/bench_tokenizer.py [--runs 5] [--save before.json] [--compare before.json]
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import parser_utils  # noqa: E402
+from parser_api import convert_groups  # noqa: E402
+
+TEST_DATA = REPO_ROOT / 'tests' / 'test-data'
+DELIMITER = ';'
+
+
+def synthetic_tpm(operations: int = 2000) -> list[str]:
+    """A TPM profile with the given number of operations."""
+    lines = ["Manufacturer; INTC", "Firmware version; 11.0.0.1202", ""]
+    for i in range(operations):
+        lines += [f"TPM2_Op{i % 20}", "",
+                  f"Key parameters:;RSA {1024 + i};Data length (bytes):;{i}",
+                  "operation stats (ms/op):;avg op:;100.00;min op:;90.00;max op:;110.00",
+                  "operation info:;total iterations:;100;successful:;100;failed:;0;error:;None", ""]
+    return lines
+
+
+def synthetic_jcperf(methods: int = 2000) -> list[str]:
+    """A JCPerf profile with the given number of measured methods."""
+    lines = ["Card name; Test Card", "Card ATR; 3b 00 00", "",
+             "JCSystem.getVersion()[Major.Minor];3.0;", "", "MESSAGE DIGEST", ""]
+    for i in range(methods):
+        lines += [f"method name:; ALG_SHA{i} MessageDigest_doFinal()",
+                  "measurement config:;appletPrepareINS;34;appletMeasureINS;41;config;00 15",
+                  "baseline measurements (ms):;" + ";".join(f"{7 + j}.00" for j in range(10)) + ";",
+                  "baseline stats (ms):;avg:;11.80;min:;7.00;max:;27.00",
+                  "operation raw measurements (ms):;" + ";".join(f"{49 + j},20" for j in range(10)) + ";",
+                  "operation stats (ms/op):;avg op:;1.05;min op:;0.96;max op:;1.38",
+                  "operation info:;data length;256;total iterations;250;total invocations;250", ""]
+    return lines
+
+
+def corpus() -> dict[str, list[list[str]]]:
+    """Lines of the test corpus and the synthetic profiles, keyed by parser type."""
+    profiles = {'javacard-algsupport': [], 'tpm': [synthetic_tpm()], 'javacard-performance': [synthetic_jcperf()]}
+    for path in sorted(TEST_DATA.rglob('*.csv')):
+        profiles['javacard-algsupport'].append(path.read_text(errors='replace').splitlines())
+    return profiles
+
+
+SPLIT_PATTERN = re.compile(r'\s*;\s*')
+
+
+@lru_cache(maxsize=4096)
+def cached_split(line: str) -> tuple[str, ...]:
+    return tuple(SPLIT_PATTERN.split(line.strip()))
+
+
+def split_strip(line: str, delimiter: str) -> list[str]:
+    return [field.strip() for field in line.split(delimiter)]
+
+
+# Revisions before parser_utils.tokenize get the same split inline, so --save works on them too
+tokenize = getattr(parser_utils, 'tokenize', split_strip)
+
+TOKENIZERS = {
+    'split+strip': lambda lines: [tokenize(line, DELIMITER) for line in lines],
+    're.split': lambda lines: [SPLIT_PATTERN.split(line.strip()) for line in lines],
+    'csv.reader': lambda lines: [[field.strip() for field in row]
+                                 for row in csv.reader(lines, delimiter=DELIMITER, quoting=csv.QUOTE_NONE)],
+    'lru-cached re.split': lambda lines: [cached_split(line) for line in lines],
+}
+
+
+def best_of(runs: int, function, *args, setup=None) -> float:
+    """Fastest of runs timings of function(*args), in milliseconds. setup() runs untimed before each one."""
+    samples = []
+    for _ in range(runs):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples)
+
+
+def convert_all(parser_type: str, profiles: list[list[str]]) -> None:
+    for lines in profiles:
+        convert_groups(list(parser_utils.iter_groups(lines)), parser_type, DELIMITER, None, None)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Compare line tokenizers and time profile conversion.')
+    parser.add_argument('--runs', type=int, default=5, help='Repetitions per measurement, the fastest is kept')
+    parser.add_argument('--save', help='Write the timings to this JSON file')
+    parser.add_argument('--compare', help='Print speedups against timings saved with --save')
+    args = parser.parse_args()
+
+    profiles = corpus()
+    lines = [line for group in profiles.values() for profile in group for line in profile]
+    results: dict[str, float] = {}
+
+    print(f"tokenizing {len(lines)} lines:")
+    for name, tokenizer in TOKENIZERS.items():
+        # A warm cache from the previous repeat would only measure lookups
+        results[f"tokenize/{name}"] = best_of(args.runs, tokenizer, lines, setup=cached_split.cache_clear)
+        print(f"  {name:<22} {results[f'tokenize/{name}']:8.2f} ms")
+
+    print("converting profiles:")
+    for parser_type, group in profiles.items():
+        results[f"convert/{parser_type}"] = best_of(args.runs, convert_all, parser_type, group)
+        print(f"  {parser_type:<22} {results[f'convert/{parser_type}']:8.2f} ms ({len(group)} profile(s))")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+        print(f"speedup against {args.compare}:")
+        for key, value in results.items():
+            if key.startswith('convert/') and before.get(key):
+                print(f"  {key[len('convert/'):]:<22} {before[key] / value:6.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""Schema-versioned MessagePack outputs for machine consumers.
+
+A binary output holds the same structure as the JSON output, as a MessagePack
+map whose first key is "_schema" with the SCHEMA_VERSION it was written with.
+Encoding and decoding use the optional `msgpack` package (C accelerated) when
+it is installed, and a pure-Python implementation of the same subset of the
+format otherwise; both produce identical bytes.
+
+Example:
+    import binary_format
+    result = binary_format.load('parsed/card.msgpack')
+"""
+import struct
+from pathlib import Path
+from typing import Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+SCHEMA_VERSION = 1
+SCHEMA_KEY = "_schema"
+SUFFIX = ".msgpack"
+
+
+class SchemaError(ValueError):
+    """Raised when a binary output is not a mapper result or has an unsupported schema version."""
+
+
+def _pack(obj, out: list) -> None:
+    """Append the MessagePack encoding of obj to out (smallest encoding of each value, like msgpack)."""
+    if obj is None:
+        out.append(b'\xc0')
+    elif obj is True:
+        out.append(b'\xc3')
+    elif obj is False:
+        out.append(b'\xc2')
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        size = len(data)
+        if size < 32:
+            out.append(bytes((0xa0 | size,)))
+        elif size < 0x100:
+            out.append(b'\xd9' + bytes((size,)))
+        elif size < 0x10000:
+            out.append(struct.pack('>BH', 0xda, size))
+        else:
+            out.append(struct.pack('>BI', 0xdb, size))
+        out.append(data)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(bytes((obj,)))
+        elif -32 <= obj < 0:
+            out.append(struct.pack('b', obj))
+        elif obj >= 0:
+            if obj < 0x100:
+                out.append(struct.pack('>BB', 0xcc, obj))
+            elif obj < 0x10000:
+                out.append(struct.pack('>BH', 0xcd, obj))
+            elif obj < 0x100000000:
+                out.append(struct.pack('>BI', 0xce, obj))
+            else:
+                out.append(struct.pack('>BQ', 0xcf, obj))
+        elif obj >= -0x80:
+            out.append(struct.pack('>Bb', 0xd0, obj))
+        elif obj >= -0x8000:
+            out.append(struct.pack('>Bh', 0xd1, obj))
+        elif obj >= -0x80000000:
+            out.append(struct.pack('>Bi', 0xd2, obj))
+        else:
+            out.append(struct.pack('>Bq', 0xd3, obj))
+    elif isinstance(obj, float):
+        out.append(struct.pack('>Bd', 0xcb, obj))
+    elif isinstance(obj, dict):
+        size = len(obj)
+        if size < 16:
+            out.append(bytes((0x80 | size,)))
+        elif size < 0x10000:
+            out.append(struct.pack('>BH', 0xde, size))
+        else:
+            out.append(struct.pack('>BI', 0xdf, size))
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    elif isinstance(obj, (list, tuple)):
+        size = len(obj)
+        if size < 16:
+            out.append(bytes((0x90 | size,)))
+        elif size < 0x10000:
+            out.append(struct.pack('>BH', 0xdc, size))
+        else:
+            out.append(struct.pack('>BI', 0xdd, size))
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, (bytes, bytearray)):
+        size = len(obj)
+        if size < 0x100:
+            out.append(struct.pack('>BB', 0xc4, size))
+        elif size < 0x10000:
+            out.append(struct.pack('>BH', 0xc5, size))
+        else:
+            out.append(struct.pack('>BI', 0xc6, size))
+        out.append(bytes(obj))
+    else:
+        raise TypeError(f"Cannot serialize {type(obj).__name__} to MessagePack")
+
+
+# Fixed-size values: type byte -> (struct format, size)
+_FIXED = {
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+}
+# Length-prefixed values: type byte -> (length format, length size, kind)
+_SIZED = {
+    0xd9: ('>B', 1, 'str'), 0xda: ('>H', 2, 'str'), 0xdb: ('>I', 4, 'str'),
+    0xc4: ('>B', 1, 'bin'), 0xc5: ('>H', 2, 'bin'), 0xc6: ('>I', 4, 'bin'),
+    0xdc: ('>H', 2, 'array'), 0xdd: ('>I', 4, 'array'),
+    0xde: ('>H', 2, 'map'), 0xdf: ('>I', 4, 'map'),
+}
+_CONSTANTS = {0xc0: None, 0xc2: False, 0xc3: True}
+
+
+def _unpack(data: bytes, pos: int) -> tuple:
+    """Decode the value starting at data[pos], returning (value, position after it)."""
+    code = data[pos]
+    pos += 1
+    if code < 0x80:
+        return code, pos
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if code >= 0xa0 and code < 0xc0:
+        end = pos + (code & 0x1f)
+        return data[pos:end].decode('utf-8'), end
+    if code < 0x90:
+        size, kind = code & 0x0f, 'map'
+    elif code < 0xa0:
+        size, kind = code & 0x0f, 'array'
+    elif code in _CONSTANTS:
+        return _CONSTANTS[code], pos
+    elif code in _FIXED:
+        fmt, length = _FIXED[code]
+        return struct.unpack_from(fmt, data, pos)[0], pos + length
+    elif code in _SIZED:
+        fmt, length, kind = _SIZED[code]
+        size = struct.unpack_from(fmt, data, pos)[0]
+        pos += length
+    else:
+        raise ValueError(f"Unsupported MessagePack type 0x{code:02x} at offset {pos - 1}")
+
+    if kind == 'str':
+        return data[pos:pos + size].decode('utf-8'), pos + size
+    if kind == 'bin':
+        return bytes(data[pos:pos + size]), pos + size
+    if kind == 'array':
+        items = []
+        for _ in range(size):
+            item, pos = _unpack(data, pos)
+            items.append(item)
+        return items, pos
+    result = {}
+    for _ in range(size):
+        key, pos = _unpack(data, pos)
+        result[key], pos = _unpack(data, pos)
+    return result, pos
+
+
+def packb(obj) -> bytes:
+    """Encode obj as MessagePack (with msgpack when installed)."""
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True)
+    out: list[bytes] = []
+    _pack(obj, out)
+    return b''.join(out)
+
+
+def unpackb(data: bytes):
+    """Decode a single MessagePack value (with msgpack when installed)."""
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    value, end = _unpack(data, 0)
+    if end != len(data):
+        raise ValueError(f"Trailing data after MessagePack value at offset {end}")
+    return value
+
+
+def dumps(result: dict) -> bytes:
+    """Serialize a parsed result with the schema version as its first key."""
+    return packb({SCHEMA_KEY: SCHEMA_VERSION, **result})
+
+
+def loads(data: bytes) -> dict:
+    """Deserialize a binary output, returning the result without the schema version key.
+
+    Raises SchemaError if data is not a result map or was written with a newer schema.
+    """
+    try:
+        result = unpackb(data)
+    except (ValueError, IndexError, struct.error) as e:
+        raise SchemaError(f"Invalid MessagePack data: {e}") from e
+    if not isinstance(result, dict) or SCHEMA_KEY not in result:
+        raise SchemaError("Not a schema-versioned result")
+    version = result.pop(SCHEMA_KEY)
+    if not isinstance(version, int) or version > SCHEMA_VERSION:
+        raise SchemaError(f"Unsupported schema version {version!r} (supported up to {SCHEMA_VERSION})")
+    return result
+
+
+def load(path: Union[str, Path]) -> dict:
+    """Load a binary output file. See loads."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
@@ -0,0 +1,169 @@
+"""Persistent index of card ATRs, names and CPLC data across a corpus of profiles.
+
+Entries are kept sorted by normalized ATR (lower-case hex digits without
+separators), so exact and prefix lookups are two binary searches and masked
+lookups only scan the range sharing the fixed leading digits. CPLC fields are
+looked up through a hash table built when the index is loaded.
+
+ATR queries ignore spaces, ':' and '-'. In masked queries '.', '?' and 'x'
+match any hex digit (e.g. '3b 8x 80 01 ..'), a trailing '*' makes the query
+a prefix (e.g. '3b 88 80*').
+"""
+import json
+import logging
+import re
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Iterable, Optional
+import parser_api
+from output_writer import OutputWriter, DEFAULT_DURABILITY
+from perf_report import iter_profile_paths
+
+logger = logging.getLogger(__name__)
+
+BASIC_INFO = "Basic information"
+INDEX_VERSION = 1
+
+ATR_ATTRIBUTE = "Card ATR"
+NAME_ATTRIBUTE = "Card name"
+CPLC_PREFIX = "CPLC."
+
+# Characters matching any single hex digit in masked ATR queries
+WILDCARDS = ('.', '?', 'x')
+
+
+def normalize_atr(value: str) -> str:
+    """Return the ATR as lower-case hex digits without separators ('3B:6D:00' -> '3b6d00')."""
+    return re.sub(r'[^0-9a-f]', '', value.lower())
+
+
+def card_entry(source: str, profile: dict, output: Optional[str] = None) -> Optional[dict]:
+    """Extract the index entry (ATR, name, CPLC fields) of a parsed profile, None if it has no ATR."""
+    attributes = list(profile.get(BASIC_INFO, []))
+    cplc_section = profile.get("CPLC")
+    if isinstance(cplc_section, list):
+        attributes.extend(cplc_section)
+
+    atr = name = None
+    cplc = {}
+    for attr in attributes:
+        if not isinstance(attr, dict):
+            continue
+        attr_name = str(attr.get("name", "")).strip()
+        value = str(attr.get("value", "")).strip()
+        if attr_name == ATR_ATTRIBUTE and atr is None:
+            atr = value
+        elif attr_name.startswith(ATR_ATTRIBUTE + ":") and atr is None:
+            # Older profiles write the ATR into the name ('Card ATR: 3B:7D:94:...')
+            atr = attr_name[len(ATR_ATTRIBUTE) + 1:].strip() or value
+        elif attr_name == NAME_ATTRIBUTE and name is None:
+            name = value
+        elif attr_name.startswith(CPLC_PREFIX):
+            cplc.setdefault(attr_name[len(CPLC_PREFIX):], value.split(';')[0].strip())
+    if not atr or not normalize_atr(atr):
+        return None
+    entry = {"atr": normalize_atr(atr), "atr_raw": atr, "name": name, "cplc": cplc,
+             "type": profile.get("_type"), "source": source}
+    if output is not None:
+        entry["output"] = output
+    return entry
+
+
+class CardIndex:
+    """Sorted ATR index with a CPLC hash table. Use load/save for the persistent index file."""
+
+    def __init__(self, entries: Iterable[dict] = ()):
+        self._by_source: dict[str, dict] = {}
+        for entry in entries:
+            self._by_source[entry["source"]] = entry
+        self._sorted: Optional[list[dict]] = None
+        self._atrs: list[str] = []
+        self._cplc: Optional[dict[tuple[str, str], list[dict]]] = None
+
+    def __len__(self) -> int:
+        return len(self._by_source)
+
+    @classmethod
+    def load(cls, path: str) -> "CardIndex":
+        """Load an index file; a missing file gives an empty index."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported card index version in {path}: {data.get('version')}")
+        return cls(data["entries"])
+
+    def save(self, path: str, durability: str = DEFAULT_DURABILITY) -> None:
+        """Write the index file, entries sorted by ATR."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with OutputWriter(durability) as writer:
+            writer.write_json(path, {"version": INDEX_VERSION, "entries": self._entries()})
+        logger.info(f"Card index with {len(self)} profile(s) saved to {path}")
+
+    def add(self, source: str, profile: dict, output: Optional[str] = None) -> bool:
+        """Add (or replace) the entry of a parsed profile. Returns False if the profile has no ATR."""
+        entry = card_entry(source, profile, output)
+        if entry is None:
+            return False
+        self._by_source[source] = entry
+        self._sorted = None
+        self._cplc = None
+        return True
+
+    def on_result(self, file_path: str, out_path: Path, result: dict) -> None:
+        """process_files callback indexing each converted profile."""
+        self.add(str(Path(file_path).resolve()), result, str(out_path))
+
+    def _entries(self) -> list[dict]:
+        if self._sorted is None:
+            self._sorted = sorted(self._by_source.values(), key=lambda e: (e["atr"], e["source"]))
+            self._atrs = [entry["atr"] for entry in self._sorted]
+        return self._sorted
+
+    def lookup_atr(self, query: str) -> list[dict]:
+        """Return the entries matching an exact, prefix ('3b88*') or masked ('3b 8x 80') ATR query."""
+        entries = self._entries()
+        query = re.sub(r'[\s:\-]', '', query.lower())
+        prefix = query.endswith('*')
+        query = query.rstrip('*')
+        # Leading digits before the first wildcard narrow the binary search range
+        fixed = re.split(r'[.?x]', query, maxsplit=1)[0]
+        low = bisect_left(self._atrs, fixed)
+        if fixed == query and not prefix:
+            return entries[low:bisect_right(self._atrs, query)]
+        high = bisect_left(self._atrs, fixed + 'g')  # 'g' sorts after every hex digit
+        if fixed == query:
+            return entries[low:high]
+        pattern = re.compile(''.join('[0-9a-f]' if char in WILDCARDS else re.escape(char) for char in query)
+                             + ('' if prefix else r'\Z'))
+        return [entry for entry in entries[low:high] if pattern.match(entry["atr"])]
+
+    def lookup_cplc(self, field: str, value: str) -> list[dict]:
+        """Return the entries whose CPLC field (e.g. 'ICFabricator', with or without 'CPLC.') equals value."""
+        if self._cplc is None:
+            self._cplc = {}
+            for entry in self._entries():
+                for key, val in entry["cplc"].items():
+                    self._cplc.setdefault((key.lower(), val.lower()), []).append(entry)
+        if field.startswith(CPLC_PREFIX):
+            field = field[len(CPLC_PREFIX):]
+        return self._cplc.get((field.lower(), value.strip().lower()), [])
+
+
+def build_index(paths: Iterable[str], delimiter: str = ';', index: Optional[CardIndex] = None) -> CardIndex:
+    """Index profiles from paths (files or folders); CSV profiles are read header-only."""
+    index = index if index is not None else CardIndex()
+    for path in iter_profile_paths(paths):
+        try:
+            if path.suffix.lower() in ('.json', '.msgpack'):
+                profile = parser_api.load_result(str(path), delimiter)
+            else:
+                profile = parser_api.parse_header(str(path), delimiter=delimiter)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping {path}: {e}")
+            continue
+        if profile is None or not index.add(str(path.resolve()), profile):
+            logger.debug("No ATR found in %s", path)
+    return index
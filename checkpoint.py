@@ -0,0 +1,152 @@
+"""Checkpoint journal for resumable folder runs.
+
+The outcome of every input is appended to a JSON-lines journal in the output
+folder, and the journal is flushed and fsynced every few files. A later run
+with resume enabled skips inputs that completed with an unchanged fingerprint
+(size and modification time) and whose output still exists, and retries failed
+inputs until their retry budget is used up.
+"""
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+from output_writer import OutputWriter
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_NAME = ".mapper-journal"
+
+DEFAULT_CHECKPOINT_EVERY = 25
+DEFAULT_CHECKPOINT_SECONDS = 30.0
+DEFAULT_MAX_RETRIES = 2
+
+
+def fingerprint(path) -> str:
+    """Cheap fingerprint of an input file: size and modification time."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class Checkpoint:
+    """Journal of completed and failed inputs of a folder run.
+
+    Args:
+        output_dir: Output folder the journal is written to
+        source_base: Source folder, journal entries use paths relative to it
+        shard: Optional (index, count), sharded runs keep separate journals
+        every: Flush the journal after this many new entries
+        seconds: ... or when this many seconds passed since the last flush
+    """
+
+    def __init__(self, output_dir: Path, source_base: Path, shard: Optional[tuple[int, int]] = None,
+                 every: int = DEFAULT_CHECKPOINT_EVERY, seconds: float = DEFAULT_CHECKPOINT_SECONDS):
+        suffix = f"-shard-{shard[0]}-of-{shard[1]}" if shard else ""
+        self.path = output_dir / f"{JOURNAL_NAME}{suffix}.jsonl"
+        self.output_dir = output_dir
+        self.source_base = source_base
+        self.every = max(1, every)
+        self.seconds = seconds
+        # relative input path -> latest journal entry
+        self.entries: dict[str, dict] = {}
+        self._pending: list[dict] = []
+        self._last_flush = time.monotonic()
+
+    def rel(self, file_path) -> str:
+        return Path(file_path).relative_to(self.source_base).as_posix()
+
+    def load(self) -> None:
+        """Load the journal of a previous run, ignoring a torn last line."""
+        self.entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.entries[entry["input"]] = entry
+        except FileNotFoundError:
+            return
+        logger.info(f"Loaded checkpoint with {len(self.entries)} input(s) from {self.path}")
+
+    def reset(self) -> None:
+        """Start a fresh journal, discarding a previous one."""
+        self.entries = {}
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def partition(self, files: Iterable[Path], max_retries: int = DEFAULT_MAX_RETRIES) -> tuple[list, list, list]:
+        """Split files into (to process, already completed, out of retry budget).
+
+        Completed entries are returned as (file, output path) pairs.
+        """
+        todo, completed, exhausted = [], [], []
+        for file in files:
+            entry = self.entries.get(self.rel(file))
+            if entry is None:
+                todo.append(file)
+                continue
+            try:
+                unchanged = entry["fingerprint"] == fingerprint(file)
+            except OSError:
+                unchanged = False
+            if not unchanged:
+                todo.append(file)
+            elif entry["status"] == "done":
+                out_path = self.output_dir / entry["output"]
+                if out_path.exists():
+                    completed.append((file, out_path))
+                else:
+                    todo.append(file)
+            elif entry.get("attempts", 1) > max_retries:
+                exhausted.append(file)
+            else:
+                todo.append(file)
+        return todo, completed, exhausted
+
+    def on_file_done(self, file_path: str, out_path: Optional[Path], error: Optional[str]) -> None:
+        """process_files callback recording the outcome of one input."""
+        rel_input = self.rel(file_path)
+        try:
+            file_fingerprint = fingerprint(file_path)
+        except OSError:
+            file_fingerprint = None
+        entry = {"input": rel_input, "fingerprint": file_fingerprint}
+        if out_path is None:
+            previous = self.entries.get(rel_input)
+            retried = previous is not None and previous["status"] == "failed" \
+                and previous["fingerprint"] == file_fingerprint
+            attempts = previous.get("attempts", 1) + 1 if retried else 1
+            entry.update(status="failed", attempts=attempts, error=error)
+        else:
+            entry.update(status="done", output=out_path.relative_to(self.output_dir).as_posix())
+        self.entries[rel_input] = entry
+        self._pending.append(entry)
+        if len(self._pending) >= self.every or time.monotonic() - self._last_flush >= self.seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append pending entries to the journal and make them durable."""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for entry in self._pending:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending = []
+
+    def close(self) -> None:
+        """Flush pending entries and compact the journal to one line per input."""
+        self.flush()
+        if not self.entries:
+            return
+        content = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in self.entries.values())
+        with OutputWriter('full') as writer:
+            writer.write_bytes(self.path, content.encode('utf-8'))
@@ -0,0 +1,206 @@
+"""Deduplication of identical profiles in folder runs.
+
+Inputs are grouped by content hash before parsing. Only files whose size
+collides with another file are hashed at all. The first input of every group
+is parsed; the outputs of the other inputs are hardlinked to its output (or
+copied where hardlinks are not supported) once the run is done.
+
+Converted results are additionally grouped by a semantic hash: the hash of
+the parsed content without volatile basic information such as the execution
+date or the contributor. Groups with more than one input, i.e. the same card
+profile submitted by several contributors, are listed in a report written
+to the output folder.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+from output_writer import OutputWriter
+
+logger = logging.getLogger(__name__)
+
+REPORT_NAME = "_dedup.json"
+BASIC_INFO = "Basic information"
+
+# Basic information ignored by the semantic hash
+VOLATILE_ATTRIBUTES = frozenset({
+    "Execution date/time",
+    "Provided by",
+    "Tested and provided by",
+})
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def content_hash(path) -> str:
+    """SHA-256 of the raw bytes of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def semantic_hash(result: dict) -> str:
+    """SHA-256 of a parsed result without its volatile basic information."""
+    basic = result.get(BASIC_INFO)
+    if isinstance(basic, list):
+        result = dict(result)
+        result[BASIC_INFO] = [attr for attr in basic
+                              if not (isinstance(attr, dict) and str(attr.get("name", "")).strip() in VOLATILE_ATTRIBUTES)]
+    canonical = json.dumps(result, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def link_output(source: Path, target: Path) -> str:
+    """Make target a hardlink of source (a copy where linking fails), replacing target atomically.
+
+    Returns 'linked' or 'copied'.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        os.link(source, tmp_path)
+        how = 'linked'
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+        how = 'copied'
+    os.replace(tmp_path, target)
+    return how
+
+
+class DedupRun:
+    """Content and semantic deduplication of one folder run.
+
+    Args:
+        source_base: Source folder, the report uses paths relative to it
+        output_dir: Output folder the report is written to
+        output_for: Returns the output path of an input file
+    """
+
+    def __init__(self, source_base: Path, output_dir: Path, output_for: Callable[[Path], Path]):
+        self.source_base = source_base
+        self.output_dir = output_dir
+        self.output_for = output_for
+        # primary input -> inputs with identical content
+        self.duplicates: dict[Path, list[Path]] = {}
+        self.hashes: dict[Path, str] = {}
+        # semantic hash -> inputs
+        self.semantic: dict[str, list[Path]] = {}
+        self.outputs: dict[Path, Path] = {}
+        self.linked = 0
+        self.copied = 0
+        self.saved_bytes = 0
+
+    def rel(self, file_path) -> str:
+        return Path(file_path).relative_to(self.source_base).as_posix()
+
+    def partition(self, files: Iterable[Path]) -> list[Path]:
+        """Group files by content and return the files to parse, one per group, in input order."""
+        files = list(files)
+        by_size: dict[int, list[Path]] = {}
+        for file in files:
+            try:
+                by_size.setdefault(file.stat().st_size, []).append(file)
+            except OSError:
+                continue
+
+        primary_of: dict[Path, Path] = {}
+        for candidates in by_size.values():
+            if len(candidates) < 2:
+                continue
+            first_by_hash: dict[str, Path] = {}
+            # The first path in sorted order is parsed, independent of the directory listing order
+            for file in sorted(candidates):
+                try:
+                    digest = content_hash(file)
+                except OSError:
+                    continue
+                primary = first_by_hash.setdefault(digest, file)
+                if primary is not file:
+                    primary_of[file] = primary
+                    self.duplicates.setdefault(primary, []).append(file)
+                    self.hashes[primary] = digest
+
+        if primary_of:
+            logger.info(f"Deduplication: {len(primary_of)} file(s) identical to another input are not parsed")
+        return [file for file in files if file not in primary_of]
+
+    def wrap_on_result(self, on_result: Optional[Callable[[str, Path, dict], None]] = None) -> Callable:
+        """Return a process_files on_result callback recording semantic hashes, then calling on_result.
+
+        on_result is also called for the content duplicates of each input, with their own output paths.
+        """
+        def record(file_path: str, out_path: Path, result: dict) -> None:
+            file = Path(file_path)
+            group = self.semantic.setdefault(semantic_hash(result), [])
+            group.append(file)
+            group.extend(self.duplicates.get(file, ()))
+            self.outputs[file] = out_path
+            if on_result:
+                on_result(file_path, out_path, result)
+                for duplicate in self.duplicates.get(file, ()):
+                    on_result(str(duplicate), self.output_for(duplicate), result)
+        return record
+
+    def link_duplicates(self, on_file_done: Optional[Callable] = None) -> list[Path]:
+        """Create the outputs of content duplicates from the outputs of their parsed inputs.
+
+        Must run after the outputs are committed. on_file_done is called for every duplicate
+        like for a processed input. Returns the created output paths.
+        """
+        outputs = []
+        for primary, duplicates in self.duplicates.items():
+            source = self.outputs.get(primary)
+            for duplicate in duplicates:
+                if source is None:
+                    if on_file_done:
+                        on_file_done(str(duplicate), None, f"duplicate of failed input {self.rel(primary)}")
+                    continue
+                target = self.output_for(duplicate)
+                try:
+                    how = link_output(source, target)
+                except OSError as e:
+                    logger.error(f"Failed to link output for {duplicate}: {e}")
+                    if on_file_done:
+                        on_file_done(str(duplicate), None, f"link error: {e}")
+                    continue
+                if how == 'linked':
+                    self.linked += 1
+                    self.saved_bytes += source.stat().st_size
+                else:
+                    self.copied += 1
+                outputs.append(target)
+                if on_file_done:
+                    on_file_done(str(duplicate), target, None)
+        return outputs
+
+    def report(self) -> dict:
+        content_groups = [
+            {"sha256": self.hashes[primary], "parsed": self.rel(primary),
+             "duplicates": [self.rel(file) for file in duplicates]}
+            for primary, duplicates in self.duplicates.items()
+        ]
+        semantic_groups = [
+            {"semantic_hash": digest, "inputs": sorted(self.rel(file) for file in files)}
+            for digest, files in self.semantic.items() if len(files) > 1
+        ]
+        return {
+            "content_duplicates": sum(len(group["duplicates"]) for group in content_groups),
+            "linked": self.linked,
+            "copied": self.copied,
+            "saved_bytes": self.saved_bytes,
+            "content_groups": content_groups,
+            "semantic_groups": sorted(semantic_groups, key=lambda group: group["inputs"]),
+        }
+
+    def write_report(self) -> Path:
+        """Write the deduplication report into the output folder."""
+        path = self.output_dir / REPORT_NAME
+        with OutputWriter('atomic') as writer:
+            writer.write_json(path, self.report())
+        logger.info(f"Deduplication report saved to {path}")
+        return path
@@ -0,0 +1,109 @@
+"""Per-file CPU and memory profiling of conversion runs.
+
+Each file's parse is wrapped in cProfile and/or tracemalloc. The profiler keeps
+the wall time, the hottest functions and the peak traced allocation of every
+input, and reports the slowest and most memory-hungry inputs with their parser
+type, so a single pathological profile can be pinpointed in a large run.
+
+Both profilers slow parsing down noticeably, tracemalloc in particular, so the
+numbers are meant for ranking inputs against each other.
+"""
+import cProfile
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+# Hot functions kept per file and inputs listed per ranking
+DEFAULT_TOP_FUNCTIONS = 10
+DEFAULT_TOP_FILES = 20
+
+
+def format_function(key: tuple) -> str:
+    """Format a pstats function key (file, line, name) as 'module.py:123(name)'."""
+    filename, line, name = key
+    if filename == '~':
+        return name  # built-in
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def hot_functions(profile: cProfile.Profile, top: int) -> list[dict]:
+    """Return the top functions of a profile by own time, with call counts and cumulative time."""
+    stats = pstats.Stats(profile).stats
+    ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    return [
+        {"function": format_function(key), "calls": calls, "own_seconds": round(own, 6),
+         "cumulative_seconds": round(cumulative, 6)}
+        for key, (primitive_calls, calls, own, cumulative, callers) in ranked
+    ]
+
+
+class FileProfiler:
+    """Collects CPU and/or memory profiles of individual files. Pass it to process_files.
+
+    Args:
+        cpu: Profile each file with cProfile and keep its hottest functions
+        mem: Trace allocations with tracemalloc and keep the peak of each file
+        top_functions: Number of hot functions kept per file
+    """
+
+    def __init__(self, cpu: bool = True, mem: bool = False, top_functions: int = DEFAULT_TOP_FUNCTIONS):
+        self.cpu = cpu
+        self.mem = mem
+        self.top_functions = top_functions
+        self.samples: list[dict] = []
+        self._started_tracing = False
+
+    @contextmanager
+    def measure(self, file_path: str) -> Iterator[dict]:
+        """Profile the enclosed block as the parse of file_path.
+
+        Yields the sample dict, the caller may add "parser_type" to it.
+        """
+        sample = {"input": str(file_path), "parser_type": None}
+        if self.mem:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        profile = cProfile.Profile() if self.cpu else None
+        start = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            yield sample
+        finally:
+            if profile:
+                profile.disable()
+            sample["seconds"] = round(time.perf_counter() - start, 6)
+            if self.mem:
+                sample["peak_bytes"] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            if profile:
+                sample["hot_functions"] = hot_functions(profile, self.top_functions)
+            self.samples.append(sample)
+
+    def close(self) -> None:
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self, top: int = DEFAULT_TOP_FILES) -> dict:
+        """Return the slowest and (with mem) the most memory-hungry inputs, ranked."""
+        report = {
+            "files": len(self.samples),
+            "total_seconds": round(sum(sample["seconds"] for sample in self.samples), 6),
+            "slowest": sorted(self.samples, key=lambda sample: sample["seconds"], reverse=True)[:top],
+        }
+        if self.mem:
+            report["memory"] = [
+                {key: sample[key] for key in ("input", "parser_type", "peak_bytes", "seconds")}
+                for sample in sorted(self.samples, key=lambda sample: sample["peak_bytes"], reverse=True)[:top]
+            ]
+        return report
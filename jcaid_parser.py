@@ -1,5 +1,6 @@
-from typing import Optional
-from parser_utils import create_attribute
+from itertools import chain, takewhile
+from typing import Iterable, Optional
+from parser_utils import create_attribute, tokenize, intern_name, NameMatcher, NO_EXCLUSIONS
 
 BASIC_INFO = "Basic information"
 
@@ -10,6 +11,9 @@ SECTION_KEY_INFO = "***** KEY INFO"
 SECTION_PACKAGE_AID = "PACKAGE AID;"
 SECTION_FULL_PACKAGE_AID = "FULL PACKAGE AID;"
 
+# Sections that end the header read by header-only extraction
+HEADER_END_SECTIONS = ("Key info", "Package AID", "Full package AID support")
+
 
 def is_section_marker(line: str) -> Optional[str]:
     """Check if a line is a section marker and return the section name.
@@ -32,7 +36,7 @@ def is_section_marker(line: str) -> Optional[str]:
     return None
 
 
-def parse_basic_info(lines: list[str], delimiter: str) -> list[dict]:
+def parse_basic_info(lines: list[str], delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS) -> list[dict]:
     """Parse basic information lines into name-value pairs."""
     attributes = []
 
@@ -45,20 +49,20 @@ def parse_basic_info(lines: list[str], delimiter: str) -> list[dict]:
         if line.startswith("PACKAGE AID;") or line.startswith("FULL PACKAGE AID;"):
             break
 
-        parts = line.split(delimiter)
+        parts = tokenize(line, delimiter)
+        name = parts[0]
+        if not name or name in excluded:
+            continue
         if len(parts) >= 2:
-            name = parts[0].strip()
-            value = parts[1].strip()
-            if name:
-                attributes.append(create_attribute(name, value))
-        elif len(parts) == 1 and parts[0].strip():
+            attributes.append(create_attribute(name, parts[1]))
+        else:
             # Single value line (like "NO CPLC")
-            attributes.append(create_attribute(parts[0].strip(), ""))
+            attributes.append(create_attribute(name, ""))
 
     return attributes
 
 
-def parse_key_info(lines: list[str], delimiter: str) -> list[dict]:
+def parse_key_info(lines: list[str], delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS) -> list[dict]:
     """Parse key info section.
 
     Example lines:
@@ -80,9 +84,9 @@ def parse_key_info(lines: list[str], delimiter: str) -> list[dict]:
             pairs = line.split(" ")
             for pair in pairs:
                 if ";" in pair:
-                    parts = pair.split(";")
-                    if len(parts) == 2:
-                        key_info[parts[0].strip()] = parts[1].strip()
+                    parts = tokenize(pair, ";")
+                    if len(parts) == 2 and parts[0] not in excluded:
+                        key_info[intern_name(parts[0])] = parts[1]
             if key_info:
                 keys.append(key_info)
         elif line.startswith("*****") or line.startswith("PACKAGE AID"):
@@ -91,14 +95,24 @@ def parse_key_info(lines: list[str], delimiter: str) -> list[dict]:
             # Note lines like "Key version suggests factory keys"
             notes.append(line)
 
-    result = {"keys": keys}
-    if notes:
+    result = {}
+    if "keys" not in excluded:
+        result["keys"] = keys
+    if notes and "notes" not in excluded:
         result["notes"] = notes
 
     return result
 
 
-def parse_package_aid_table(lines: list[str], delimiter: str) -> list[dict]:
+def exclude_keys(record: dict, excluded: NameMatcher) -> dict:
+    """Drop excluded columns from a table row (rows share their few fixed column names)."""
+    if not excluded:
+        return record
+    return {key: value for key, value in record.items() if key not in excluded}
+
+
+def parse_package_aid_table(lines: list[str], delimiter: str,
+                            excluded: NameMatcher = NO_EXCLUSIONS) -> list[dict]:
     """Parse the package AID table.
 
     Header: PACKAGE AID; MAJOR VERSION; MINOR VERSION; PACKAGE NAME; INTRODUCING JC API VERSION;
@@ -122,20 +136,21 @@ def parse_package_aid_table(lines: list[str], delimiter: str) -> list[dict]:
             break
 
         if header_found:
-            parts = [p.strip() for p in line.split(delimiter)]
+            parts = tokenize(line, delimiter)
             if len(parts) >= 5:
-                packages.append({
+                packages.append(exclude_keys({
                     "package_aid": parts[0],
                     "major_version": parts[1],
                     "minor_version": parts[2],
                     "package_name": parts[3],
                     "jc_api_version": parts[4]
-                })
+                }, excluded))
 
     return packages
 
 
-def parse_full_package_aid_table(lines: list[str], delimiter: str) -> list[dict]:
+def parse_full_package_aid_table(lines: list[str], delimiter: str,
+                                 excluded: NameMatcher = NO_EXCLUSIONS) -> list[dict]:
     """Parse the full package AID support table.
 
     Header: FULL PACKAGE AID; IS SUPPORTED?; PACKAGE NAME WITH VERSION;
@@ -155,19 +170,20 @@ def parse_full_package_aid_table(lines: list[str], delimiter: str) -> list[dict]
             continue
 
         if header_found:
-            parts = [p.strip() for p in line.split(delimiter)]
+            parts = tokenize(line, delimiter)
             if len(parts) >= 3:
                 is_supported = parts[1].lower() == "yes"
-                packages.append({
+                packages.append(exclude_keys({
                     "full_package_aid": parts[0],
                     "supported": is_supported,
                     "package_name_version": parts[2]
-                })
+                }, excluded))
 
     return packages
 
 
-def convert_to_map_aid(groups: list[list[str]], delimiter: str) -> dict:
+def convert_to_map_aid(groups: Iterable[list[str]], delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS,
+                       sections: Optional[NameMatcher] = None) -> dict:
     """Convert JavaCard AID support CSV data to a structured JSON-compatible dictionary.
 
     The output structure:
@@ -176,14 +192,11 @@ def convert_to_map_aid(groups: list[list[str]], delimiter: str) -> dict:
     - "Key info": {keys: [...], notes: [...]}
     - "Package AID": array of package info objects
     - "Full package AID support": array of support status objects
+
+    Properties whose name is in excluded are skipped while parsing. When sections is
+    given, lines of other sections are neither collected nor parsed.
     """
     result = {"_type": "javacard-aid"}
-
-    # Flatten all groups into a single list of lines for easier processing
-    all_lines = []
-    for group in groups:
-        all_lines.extend(group)
-
     # Find section boundaries
     basic_info_lines = []
     key_info_lines = []
@@ -192,7 +205,8 @@ def convert_to_map_aid(groups: list[list[str]], delimiter: str) -> dict:
 
     current_section = "basic"
 
-    for line in all_lines:
+    # All groups as one stream of lines; groups can be a lazy iterator
+    for line in chain.from_iterable(groups):
         stripped = line.strip()
 
         # Check for section markers
@@ -202,6 +216,8 @@ def convert_to_map_aid(groups: list[list[str]], delimiter: str) -> dict:
                 current_section = "card_info"
             elif section == "Card data":
                 current_section = "card_data"
+            elif sections is not None and section not in sections:
+                current_section = "skipped"
             elif section == "Key info":
                 current_section = "key_info"
             elif section == "Package AID":
@@ -221,20 +237,31 @@ def convert_to_map_aid(groups: list[list[str]], delimiter: str) -> dict:
             full_package_aid_lines.append(line)
 
     # Parse each section
-    result[BASIC_INFO] = parse_basic_info(basic_info_lines, delimiter)
+    result[BASIC_INFO] = parse_basic_info(basic_info_lines, delimiter, excluded)
 
     if key_info_lines:
-        result["Key info"] = parse_key_info(key_info_lines, delimiter)
+        result["Key info"] = parse_key_info(key_info_lines, delimiter, excluded)
 
     if package_aid_lines:
         result["Package AID"] = parse_package_aid_table(
-            [SECTION_PACKAGE_AID] + package_aid_lines, delimiter
+            [SECTION_PACKAGE_AID] + package_aid_lines, delimiter, excluded
         )
 
     if full_package_aid_lines:
         result["Full package AID support"] = parse_full_package_aid_table(
-            [SECTION_FULL_PACKAGE_AID] + full_package_aid_lines, delimiter
+            [SECTION_FULL_PACKAGE_AID] + full_package_aid_lines, delimiter, excluded
         )
 
     return result
 
+
+def convert_header_to_map_aid(groups: Iterable[list[str]], delimiter: str,
+                              excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
+    """Header-only conversion: basic information including card info and CPLC data.
+
+    groups can be a lazy iterator; it is consumed only up to the KEY INFO or
+    PACKAGE AID section, whichever comes first.
+    """
+    header_lines = takewhile(lambda line: is_section_marker(line) not in HEADER_END_SECTIONS,
+                             chain.from_iterable(groups))
+    return convert_to_map_aid([list(header_lines)], delimiter, excluded)
@@ -1,4 +1,7 @@
-from parser_utils import create_attribute
+from itertools import chain, islice
+from typing import Iterable, Optional
+from parser_utils import (create_attribute, tokenize, labelled_pairs, intern_name, intern_names, NameMatcher,
+                          NO_EXCLUSIONS)
 
 BASIC_INFO = "Basic information"
 END_OF_BASIC_INFO = "JCSystem.getVersion()"
@@ -33,6 +36,8 @@ KEY_SECTIONS = [
     "RSAPublicKey",
 ]
 
+intern_names(SECTION_MARKERS + KEY_SECTIONS)
+
 
 def is_section_header(line: str) -> bool:
     """Check if a line is a section header.
@@ -79,7 +84,8 @@ def is_method_name_line(line: str) -> bool:
     return line.startswith("method name:")
 
 
-def parse_basic_info(groups: list[list[str]], delimiter: str) -> tuple[list[dict], int]:
+def parse_basic_info(groups: list[list[str]], delimiter: str,
+                     excluded: NameMatcher = NO_EXCLUSIONS) -> tuple[list[dict], int]:
     """Parse the basic information section at the start of the file.
 
     Returns:
@@ -101,53 +107,43 @@ def parse_basic_info(groups: list[list[str]], delimiter: str) -> tuple[list[dict
                 end_index = i
                 break
 
-            content = line.split(delimiter)
-            if content:
-                name = content[0].strip()
-                value = content[1].strip() if len(content) > 1 else ''
-                attributes.append(create_attribute(name, value))
+            content = tokenize(line, delimiter)
+            name = content[0]
+            if name in excluded:
+                continue
+            attributes.append(create_attribute(name, content[1] if len(content) > 1 else ''))
 
     return attributes, end_index
 
 
-def parse_measurement_config(line: str, delimiter: str) -> dict:
-    """Parse measurement config line.
+def parse_pairs(line: str, delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
+    """Parse a 'label;key;value;key;value;...' line into a dictionary of the pairs after the label.
 
-    Example: 'measurement config:;appletPrepareINS;34;appletMeasureINS;41;config;00 15 00 01...'
-    Returns: {'appletPrepareINS': '34', 'appletMeasureINS': '41', 'config': '00 15 00 01...'}
+    Pairs with an empty key or value are skipped, as is a trailing unpaired field.
     """
     parts = line.split(delimiter)
+    filtering = bool(excluded)
     result = {}
-
-    # Skip "measurement config:" prefix
-    i = 1
-    while i < len(parts) - 1:
+    for i in range(1, len(parts) - 1, 2):
         key = parts[i].strip()
-        value = parts[i + 1].strip() if i + 1 < len(parts) else ''
-        if key and value:
-            result[key] = value
-        i += 2
-
+        value = parts[i + 1].strip()
+        if key and value and not (filtering and key in excluded):
+            result[intern_name(key)] = value
     return result
 
 
-def parse_key_value_pairs(line: str, delimiter: str) -> dict:
-    """Parse a line with format 'name:;value;name:;value;...' into a dictionary."""
-    parts = line.split(delimiter)
-    result = {}
+def parse_measurement_config(line: str, delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
+    """Parse measurement config line.
 
-    i = 0
-    while i < len(parts):
-        part = parts[i].strip()
-        if part.endswith(':'):
-            key = part[:-1]
-            value = parts[i + 1].strip() if i + 1 < len(parts) else ''
-            result[key] = value
-            i += 2
-        else:
-            i += 1
+    Example: 'measurement config:;appletPrepareINS;34;appletMeasureINS;41;config;00 15 00 01...'
+    Returns: {'appletPrepareINS': '34', 'appletMeasureINS': '41', 'config': '00 15 00 01...'}
+    """
+    return parse_pairs(line, delimiter, excluded)
 
-    return result
+
+def parse_key_value_pairs(line: str, delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
+    """Parse a line with format 'name:;value;name:;value;...' into a dictionary."""
+    return labelled_pairs(line, delimiter, 0, excluded)
 
 
 def parse_measurements(line: str, delimiter: str) -> list[str]:
@@ -160,13 +156,11 @@ def parse_measurements(line: str, delimiter: str) -> list[str]:
     Example: 'baseline measurements (ms):;103,00;115,00;101,00;'
     Returns: ['103.00', '115.00', '101.00']
     """
-    parts = line.split(delimiter)
     values = []
 
     # Skip the first part (label) and collect numeric values
-    for part in parts[1:]:
-        part = part.strip()
-        if part and part not in ['CHECK', '']:
+    for part in tokenize(line, delimiter)[1:]:
+        if part and part != 'CHECK':
             # Convert comma to dot for European decimal format
             normalized = part.replace(',', '.')
             try:
@@ -179,7 +173,7 @@ def parse_measurements(line: str, delimiter: str) -> list[str]:
     return values
 
 
-def parse_stats(line: str, delimiter: str) -> dict:
+def parse_stats(line: str, delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
     """Parse a stats line into a dictionary.
 
     Example: 'baseline stats (ms):;avg:;11.80;min:;7.00;max:;27.00;;;CHECK'
@@ -191,6 +185,7 @@ def parse_stats(line: str, delimiter: str) -> dict:
     Also handles European format with comma as decimal separator.
     """
     parts = line.split(delimiter)
+    filtering = bool(excluded)
     result = {}
 
     i = 1  # Skip the label
@@ -199,9 +194,9 @@ def parse_stats(line: str, delimiter: str) -> dict:
         if part.endswith(':'):
             key = part[:-1]
             value = parts[i + 1].strip() if i + 1 < len(parts) else ''
-            if value and value not in ['CHECK', '']:
+            if value and value != 'CHECK' and not (filtering and key in excluded):
                 # Convert comma to dot for European decimal format
-                result[key] = value.replace(',', '.')
+                result[intern_name(key)] = value.replace(',', '.')
             i += 2
         else:
             i += 1
@@ -209,35 +204,27 @@ def parse_stats(line: str, delimiter: str) -> dict:
     return result
 
 
-def parse_operation_info(line: str, delimiter: str) -> dict:
+def parse_operation_info(line: str, delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
     """Parse operation info line.
 
     Example: 'operation info:;data length;256;total iterations;250;total invocations;250;'
     Returns: {'data length': '256', 'total iterations': '250', 'total invocations': '250'}
     """
-    parts = line.split(delimiter)
-    result = {}
-
-    i = 1  # Skip "operation info:"
-    while i < len(parts) - 1:
-        key = parts[i].strip()
-        value = parts[i + 1].strip() if i + 1 < len(parts) else ''
-        if key and value:
-            result[key] = value
-        i += 2
-
-    return result
+    return parse_pairs(line, delimiter, excluded)
 
 
-def parse_method_block(lines: list[str], delimiter: str) -> dict:
+def parse_method_block(lines: list[str], delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
     """Parse a method block into a structured object.
 
     A method block consists of:
     - method name line
     - measurement config line
     - Either NO_SUCH_ALGORITHM or measurement data
+
+    Lines of excluded properties are skipped without being tokenized.
     """
     result = {}
+    measured = False
 
     for line in lines:
         line = line.strip()
@@ -246,53 +233,60 @@ def parse_method_block(lines: list[str], delimiter: str) -> dict:
             # Extract method name
             # Fixed format: "method name:; ALG_NAME MethodName()"
             # Variable format: "method name:; ALG_NAME MethodName();16;"
-            parts = line.split(delimiter)
+            parts = tokenize(line, delimiter)
             if len(parts) > 1:
-                method_name = parts[1].strip()
-                result["method name"] = method_name
+                if "method name" not in excluded:
+                    result["method name"] = intern_name(parts[1])
 
                 # Check for data length in variable format (third part after method name)
-                if len(parts) > 2 and parts[2].strip():
-                    data_length = parts[2].strip()
+                if len(parts) > 2 and parts[2]:
+                    data_length = parts[2]
                     # Only add if it looks like a number
-                    if data_length.isdigit():
+                    if data_length.isdigit() and "data length" not in excluded:
                         result["data length"] = data_length
 
         elif line.startswith("measurement config:"):
             # Parse measurement config
-            config = parse_measurement_config(line, delimiter)
-            if config:
-                result["measurement config"] = config
+            if "measurement config" not in excluded:
+                config = parse_measurement_config(line, delimiter, excluded)
+                if config:
+                    result["measurement config"] = config
 
         elif line == "NO_SUCH_ALGORITHM":
-            result["supported"] = False
+            if "supported" not in excluded:
+                result["supported"] = False
 
         elif line.startswith("baseline measurements"):
-            result["baseline measurements"] = parse_measurements(line, delimiter)
+            measured = True
+            if "baseline measurements" not in excluded:
+                result["baseline measurements"] = parse_measurements(line, delimiter)
 
         elif line.startswith("baseline stats"):
-            stats = parse_stats(line, delimiter)
-            result["baseline stats"] = stats
+            if "baseline stats" not in excluded:
+                result["baseline stats"] = parse_stats(line, delimiter, excluded)
 
         elif line.startswith("operation raw measurements"):
-            result["operation raw measurements"] = parse_measurements(line, delimiter)
+            if "operation raw measurements" not in excluded:
+                result["operation raw measurements"] = parse_measurements(line, delimiter)
 
         elif line.startswith("operation stats"):
-            stats = parse_stats(line, delimiter)
-            result["operation stats"] = stats
+            measured = True
+            if "operation stats" not in excluded:
+                result["operation stats"] = parse_stats(line, delimiter, excluded)
 
         elif line.startswith("operation info:"):
-            info = parse_operation_info(line, delimiter)
-            result["operation info"] = info
+            if "operation info" not in excluded:
+                result["operation info"] = parse_operation_info(line, delimiter, excluded)
 
     # If we got measurement data, mark as supported
-    if "baseline measurements" in result or "operation stats" in result:
+    if measured and "supported" not in excluded:
         result["supported"] = True
 
     return result
 
 
-def convert_to_map_jcperf(groups: list[list[str]], delimiter: str) -> dict:
+def convert_to_map_jcperf(groups: Iterable[list[str]], delimiter: str,
+                          excluded: NameMatcher = NO_EXCLUSIONS, sections: Optional[NameMatcher] = None) -> dict:
     """Convert JavaCard performance CSV data to a structured JSON-compatible dictionary.
 
     The output structure:
@@ -311,18 +305,33 @@ def convert_to_map_jcperf(groups: list[list[str]], delimiter: str) -> dict:
     - "operation raw measurements": array of operation timing values
     - "operation stats": {avg op, min op, max op}
     - "operation info": {data length, total iterations, total invocations}
+
+    Properties whose name is in excluded are skipped while parsing. When sections is
+    given, lines of other sections are skipped without being tokenized.
+
+    groups can be a lazy iterator (streaming); only the basic information groups are buffered.
     """
     result = {"_type": "javacard-performance"}
 
+    # Buffer the basic info groups, plus the one group parse_basic_info looks past its end
+    groups = iter(groups)
+    head = []
+    for group in groups:
+        head.append(group)
+        if any(END_OF_BASIC_INFO in line or is_section_header(line) for line in group):
+            head.extend(islice(groups, 1))
+            break
+
     # Parse basic info
-    basic_info, start_index = parse_basic_info(groups, delimiter)
+    basic_info, start_index = parse_basic_info(head, delimiter, excluded)
     result[BASIC_INFO] = basic_info
 
     current_section = None
     current_method_lines = []
+    # Inside a section that is not selected
+    skipping = False
 
-    for i in range(start_index, len(groups)):
-        group = groups[i]
+    for group in chain(head[start_index:], groups):
         if not group:
             continue
 
@@ -333,13 +342,16 @@ def convert_to_map_jcperf(groups: list[list[str]], delimiter: str) -> dict:
             if is_section_header(line_stripped):
                 # Save previous method if exists
                 if current_method_lines and current_section:
-                    method_result = parse_method_block(current_method_lines, delimiter)
+                    method_result = parse_method_block(current_method_lines, delimiter, excluded)
                     if method_result:
                         result[current_section].append(method_result)
                     current_method_lines = []
 
-                current_section = extract_section_name(line_stripped)
-                if current_section not in result:
+                current_section = intern_name(extract_section_name(line_stripped))
+                skipping = sections is not None and current_section not in sections
+                if skipping:
+                    current_section = None
+                elif current_section not in result:
                     result[current_section] = []
                 continue
 
@@ -347,20 +359,20 @@ def convert_to_map_jcperf(groups: list[list[str]], delimiter: str) -> dict:
             if is_section_end(line_stripped):
                 # Save previous method if exists
                 if current_method_lines and current_section:
-                    method_result = parse_method_block(current_method_lines, delimiter)
+                    method_result = parse_method_block(current_method_lines, delimiter, excluded)
                     if method_result:
                         result[current_section].append(method_result)
                     current_method_lines = []
                 continue
 
-            # Skip empty lines within groups
-            if not line_stripped:
+            # Skip empty lines within groups and lines of unselected sections
+            if not line_stripped or skipping:
                 continue
 
             # If we hit a new method name, save the previous one
             if is_method_name_line(line_stripped):
                 if current_method_lines and current_section:
-                    method_result = parse_method_block(current_method_lines, delimiter)
+                    method_result = parse_method_block(current_method_lines, delimiter, excluded)
                     if method_result:
                         result[current_section].append(method_result)
                 current_method_lines = [line_stripped]
@@ -370,9 +382,18 @@ def convert_to_map_jcperf(groups: list[list[str]], delimiter: str) -> dict:
 
     # Don't forget the last method
     if current_method_lines and current_section:
-        method_result = parse_method_block(current_method_lines, delimiter)
+        method_result = parse_method_block(current_method_lines, delimiter, excluded)
         if method_result:
             result[current_section].append(method_result)
 
     return result
 
+
+def convert_header_to_map_jcperf(groups: Iterable[list[str]], delimiter: str,
+                                 excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
+    """Header-only conversion: the basic information up to the JavaCard version or first section.
+
+    groups can be a lazy iterator; at most one group past the basic information is read.
+    """
+    basic_info, _ = parse_basic_info(groups, delimiter, excluded)
+    return {"_type": "javacard-performance", BASIC_INFO: basic_info}
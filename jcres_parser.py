@@ -1,49 +1,66 @@
-from parser_utils import create_attribute
+from typing import Iterable, Iterator, Optional
+from parser_utils import create_attribute, intern_name, intern_names, NameMatcher, NO_EXCLUSIONS
 
 BASIC_INFO = "Basic information"
 END_OF_BASIC_INFO = "JavaCard support version"
 ATTRIBUTE_NAMES = ["algorithm_name","is_supported", "time_elapsed", "persistent_mem_allocated", "ram_deselect_allocated", "ram_reset_allocated"]
+intern_names(ATTRIBUTE_NAMES)
+
+# Sections returned by header-only extraction
+HEADER_SECTIONS = [BASIC_INFO, END_OF_BASIC_INFO, "JCSystem", "CPLC"]
+
+# Name of a group after the basic info, taken from its first line
+def extract_group_name(line: str, delimiter: str) -> str:
+    return group_name_of(line.split(delimiter, 1)[0], delimiter in line)
+
+# Group name from the first field of a group's first line (the whole line when it has no delimiter)
+def group_name_of(first_field: str, delimited: bool = True) -> str:
+    if delimited and '.' in first_field:
+        return first_field.split('.')[0].strip()
+    return first_field.strip()
 
 # Parse a group of lines into a name, attributes, and whether basic info is finished
-def parse_group(group: list[str], finished_basic_info, delimiter: str):
+# Attributes whose name is in excluded are skipped; attributes are None for a group
+# not in sections, whose remaining lines are not tokenized
+def parse_group(group: list[str], finished_basic_info, delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS,
+                sections: Optional[NameMatcher] = None):
     finished = finished_basic_info
     attributes = []
     group_name = None if finished else BASIC_INFO
+    # Checked once per group instead of once per table cell
+    filtering = bool(excluded)
 
-    for index, line in enumerate(group):
+    for line in group:
+        # Fields keep their surrounding whitespace, the line is split exactly once
+        content = line.split(delimiter)
         if not finished:
             if END_OF_BASIC_INFO in line:
                 finished = True
         else:
             if group_name is None:
-                if delimiter not in line:
-                    group_name = line.strip()
-                else:
-                    name, _ = line.split(delimiter, 1)
-                    if '.' in name:
-                        group_name = name.split('.')[0].strip()
-                    else:
-                        group_name = name.strip()
+                group_name = intern_name(group_name_of(content[0], len(content) > 1))
+                if sections is not None and group_name not in sections:
+                    return group_name, None, finished
 
-        content = line.split(delimiter)
         if len(content) < 2:
             continue
         if group_name == "JCSystem" or group_name == "CPLC" or not finished or content[0] == "JavaCard support version":
-            attributes.append(create_attribute(content[0], content[1]))
+            if content[0] not in excluded:
+                attributes.append(create_attribute(content[0], content[1]))
             continue
 
-        alg_values = []
-        for i, val in enumerate(content):
-            if val == group_name:
-                continue
-            alg_values.append(create_attribute(ATTRIBUTE_NAMES[i], content[i]))
-        if len(alg_values) != 0:
+        # The algorithm name repeats across profiles, so like the attribute names it is shared
+        content[0] = intern_name(content[0])
+        alg_values = [create_attribute(ATTRIBUTE_NAMES[i], val) for i, val in enumerate(content)
+                      if val != group_name and not (filtering and ATTRIBUTE_NAMES[i] in excluded)]
+        if alg_values:
             attributes.append(alg_values)
 
     return group_name, attributes, finished
 
 # Convert the list of groups into a dictionary mapping group names to their attributes
-def convert_to_map(groups: list[list[str]], delimiter: str):
+def convert_to_map(groups: Iterable[list[str]], delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS,
+                   sections: Optional[NameMatcher] = None):
     finished_basic_info = False
     result = {"_type": "javacard"}
     first = True
@@ -52,14 +69,34 @@ def convert_to_map(groups: list[list[str]], delimiter: str):
         if len(group) < 2 and finished_basic_info:
             continue
 
-        key, attributes, finished = parse_group(group, finished_basic_info, delimiter)
+        key, attributes, finished = parse_group(group, finished_basic_info, delimiter, excluded, sections)
         if first:
             finished_basic_info = True
             first = False
         else:
             finished_basic_info = finished
+        if attributes is None:
+            continue
         if key in result:
             result[key].extend(attributes)
         else:
             result[key] = attributes
     return result
+
+# Check if a group is an algorithm table (or the column header preceding the tables)
+def is_algorithm_table(group: list[str]) -> bool:
+    return group[0].startswith(ATTRIBUTE_NAMES[0]) or (len(group) > 1 and group[1].startswith(("ALG_", "TYPE_")))
+
+# Yield the leading groups up to CPLC or the first algorithm table, without reading any further group
+def iter_header_groups(groups: Iterable[list[str]], delimiter: str) -> Iterator[list[str]]:
+    for index, group in enumerate(groups):
+        if index > 0 and is_algorithm_table(group):
+            return
+        yield group
+        if index > 0 and extract_group_name(group[0], delimiter) == "CPLC":
+            return
+
+# Header-only conversion: basic info, JavaCard version, JCSystem and CPLC attributes
+# groups can be a lazy iterator, it is consumed only up to the end of the CPLC group
+def convert_header_to_map(groups: Iterable[list[str]], delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS):
+    return convert_to_map(iter_header_groups(groups, delimiter), delimiter, excluded, NameMatcher(HEADER_SECTIONS))
@@ -1,44 +1,49 @@
-import json, argparse
+import json
+from contextlib import nullcontext
+from itertools import chain
 from pathlib import Path
 import logging
-import shutil
-from typing import Optional, Set
+from typing import TYPE_CHECKING, Callable, Optional, Set
 import parser_utils
-from jcres_parser import convert_to_map
-from tpm_parser import convert_to_map_tpm
-from jcperf_parser import convert_to_map_jcperf
-from jcaid_parser import convert_to_map_aid
+import parser_registry
+from parser_api import detect_parser_type, convert_groups, parse_header, RAW_MEASUREMENT_PROPERTIES
+from output_writer import OutputWriter, DEFAULT_DURABILITY, DURABILITY_LEVELS, DEFAULT_FORMAT, OUTPUT_FORMATS
+from checkpoint import Checkpoint, DEFAULT_MAX_RETRIES
+import memory_governor
+
+if TYPE_CHECKING:
+    # cProfile/tracemalloc are only imported when profiling is requested
+    from file_profiler import FileProfiler
+    from progress import Progress
 
 logger = logging.getLogger(__name__)
 
 
-def detect_parser_type(file_path: str) -> str:
-    """Detect which parser to use based on file path and content.
+def output_path_for(file_path: str, output_dir: Optional[Path] = None, source_base: Optional[Path] = None,
+                    suffix: str = '.json') -> Path:
+    """Return the output path (with the given suffix, JSON by default) for an input file.
 
-    Returns:
-        str: 'tpm', 'javacard-performance', 'javacard-aid', or 'javacard-algsupport'
+    With output_dir and source_base the relative structure below source_base is
+    mirrored into output_dir, otherwise the output is written next to the input.
     """
-    file_path_lower = file_path.lower()
-
-    # Check for TPM files
-    if 'tpm' in file_path_lower:
-        return 'tpm'
-
-    # Check for JavaCard AID support files
-    if '/aid/' in file_path_lower or '\\aid\\' in file_path_lower or 'aidsupport' in file_path_lower:
-        return 'javacard-aid'
-
-    # Check for JavaCard performance files
-    if 'performance' in file_path_lower:
-        return 'javacard-performance'
-
-    # Default to JavaCard algorithm support parser
-    return 'javacard-algsupport'
+    if output_dir and source_base:
+        # Calculate relative path from source base and create in output dir
+        rel_path = parser_utils.strip_compression_suffix(Path(file_path).relative_to(source_base))
+        return (output_dir / rel_path).with_suffix(suffix)
+    # Default: write next to input file
+    return parser_utils.strip_compression_suffix(file_path).with_suffix(suffix)
 
 
 def process_files(file_paths: list[str], delimiter: str = ';', excluded_properties: Optional[Set[str]] = None,
-                  output_dir: Optional[Path] = None, source_base: Optional[Path] = None) -> list[Path]:
-    """Process given files and write JSON outputs.
+                  output_dir: Optional[Path] = None, source_base: Optional[Path] = None,
+                  durability: str = DEFAULT_DURABILITY,
+                  on_file_done: Optional[Callable[[str, Optional[Path], Optional[str]], None]] = None,
+                  sections: Optional[Set[str]] = None, header_only: bool = False,
+                  on_result: Optional[Callable[[str, Path, dict], None]] = None,
+                  profiler: Optional["FileProfiler"] = None,
+                  budget: Optional[memory_governor.MemoryBudget] = None, typed: bool = False,
+                  output_format: str = DEFAULT_FORMAT, prefetch_files: int = 0) -> list[Path]:
+    """Process given files and write JSON (or MessagePack) outputs.
 
     Args:
         file_paths: List of file paths to process
@@ -46,63 +51,169 @@ def process_files(file_paths: list[str], delimiter: str = ';', excluded_properti
         excluded_properties: Set of property names to exclude from output
         output_dir: If provided, write outputs to this directory preserving relative structure
         source_base: Base path for calculating relative paths (used with output_dir)
+        durability: Output durability level ('none', 'atomic', 'batch' or 'full'), see output_writer
+        on_file_done: Called after each input as on_file_done(file_path, out_path, error);
+            out_path is None and error holds the reason when the input failed. Converted
+            inputs are reported once their output is in place, with durability 'batch'
+            when their batch is committed
+        sections: Section names or patterns to keep besides "Basic information" (default: all)
+        header_only: Stream only the leading lines of each file and output just its basic
+            information (ATR, card name, JavaCard version, CPLC, ...), see parser_api.parse_header
+        on_result: Called after each written output as on_result(file_path, out_path, result),
+            e.g. CardIndex.on_result to index the converted profiles
+        profiler: Optional FileProfiler wrapping each file's parse in cProfile/tracemalloc
+        budget: Optional MemoryBudget; files above its streaming threshold are streamed
+            through the parser, files over its byte/line caps are skipped with a reason
+        typed: Output typed records (numbers, nulls, derived fields) where the parser supports it (TPM)
+        output_format: 'json' or 'msgpack' (schema-versioned MessagePack, see binary_format)
+        prefetch_files: Read up to this many of the next files in background threads while
+            the current one is parsed (0: no read-ahead), for inputs on network filesystems
 
     Returns a list of written output Paths.
     """
     outputs: list[Path] = []
-    for file_path in file_paths:
-        logger.info(f"Processing file: {file_path}")
-        groups = parser_utils.load_file(file_path)
-        if groups is None:
-            logger.warning(f"Skipping {file_path} due to previous error.")
-            continue
-
-        parser_type = detect_parser_type(file_path)
-        logger.info(f"Detected parser type: {parser_type}")
-
-        if parser_type == 'tpm':
-            final_result = convert_to_map_tpm(groups, delimiter)
-        elif parser_type == 'javacard-performance':
-            final_result = convert_to_map_jcperf(groups, delimiter)
-        elif parser_type == 'javacard-aid':
-            final_result = convert_to_map_aid(groups, delimiter)
-        else:
-            final_result = convert_to_map(groups, delimiter)
-
-        if excluded_properties:
-            final_result = parser_utils.apply_exclusions(final_result, excluded_properties)
-        logger.info("Processing completed.")
-
-        # Determine output path
-        if output_dir and source_base:
-            # Calculate relative path from source base and create in output dir
-            rel_path = Path(file_path).relative_to(source_base)
-            out_path = (output_dir / rel_path).with_suffix('.json')
-            # Ensure parent directories exist
-            out_path.parent.mkdir(parents=True, exist_ok=True)
-        else:
-            # Default: write next to input file
-            out_path = Path(file_path).with_suffix('.json')
-
-        try:
-            with open(out_path, "w", encoding='utf-8') as f:
-                json.dump(final_result, f, indent=4, ensure_ascii=False)
-            logger.info(f"Result saved to {out_path}")
-            outputs.append(out_path)
-        except Exception as e:
-            logger.exception(f"Failed to write output for {file_path}: {e}")
+    suffix = OUTPUT_FORMATS[output_format]
+    if prefetch_files > 0 and not header_only:
+        import prefetch
+        inputs = prefetch.prefetch(file_paths, lambda path: prefetch.read_ahead(path, budget), prefetch_files)
+    else:
+        inputs = ((file_path, None) for file_path in file_paths)
+    # Compiled once, the parsers skip excluded properties while parsing
+    excluded = parser_utils.name_matcher(excluded_properties) if excluded_properties else None
+    selected = parser_utils.name_matcher(sections) if sections is not None else None
+    with OutputWriter(durability) as writer:
+        # content is the text of the file when it was read ahead, otherwise None
+        for file_path, content in inputs:
+            logger.info("Processing file: %s", file_path, extra=parser_utils.PER_FILE)
+            # Profiles the parse only, without writing the output
+            with profiler.measure(file_path) if profiler else nullcontext({}) as sample:
+                if header_only:
+                    try:
+                        final_result = parse_header(file_path, delimiter=delimiter, excluded_properties=excluded)
+                    except Exception as e:
+                        logger.exception(f"Failed to read header of {file_path}: {e}", extra={"input": file_path})
+                        if on_file_done:
+                            on_file_done(file_path, None, f"header error: {e}")
+                        continue
+                    sample["parser_type"] = final_result.get("_type")
+                elif budget is not None:
+                    try:
+                        parser_type, final_result = memory_governor.parse_file(file_path, budget, delimiter,
+                                                                               excluded, selected, typed, content)
+                    except memory_governor.BudgetExceeded as e:
+                        logger.warning(f"Skipping {file_path}: {e}", extra={"input": file_path})
+                        if on_file_done:
+                            on_file_done(file_path, None, f"skipped: {e}")
+                        continue
+                    except Exception as e:
+                        logger.exception(f"Failed to parse {file_path}: {e}", extra={"input": file_path})
+                        if on_file_done:
+                            on_file_done(file_path, None, f"parse error: {e}")
+                        continue
+                    sample["parser_type"] = parser_type
+                else:
+                    groups = parser_utils.load_file(file_path, content)
+                    if groups is None:
+                        logger.warning(f"Skipping {file_path} due to previous error.", extra={"input": file_path})
+                        if on_file_done:
+                            on_file_done(file_path, None, "failed to load file")
+                        continue
+
+                    # Path hints first, then the leading lines of the already loaded content
+                    parser_type = parser_registry.detect(file_path, chain.from_iterable(groups))
+                    logger.info("Detected parser type: %s", parser_type, extra=parser_utils.PER_FILE)
+                    sample["parser_type"] = parser_type
+
+                    try:
+                        final_result = convert_groups(groups, parser_type, delimiter, excluded, selected, typed)
+                    except Exception as e:
+                        logger.exception(f"Failed to parse {file_path}: {e}", extra={"input": file_path})
+                        if on_file_done:
+                            on_file_done(file_path, None, f"parse error: {e}")
+                        continue
+
+            logger.info("Processing completed.", extra=parser_utils.PER_FILE)
+
+            out_path = output_path_for(file_path, output_dir, source_base, suffix)
+
+            # Reported done once the output is in place (with durability 'batch' when its batch is committed)
+            def committed(path: Path, file_path: str = file_path) -> None:
+                if on_file_done:
+                    on_file_done(file_path, path, None)
+
+            try:
+                # Ensure parent directories exist
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                writer.write_output(out_path, final_result, output_format, on_commit=committed)
+                logger.info("Result saved to %s", out_path, extra=parser_utils.PER_FILE)
+                outputs.append(out_path)
+            except Exception as e:
+                logger.exception(f"Failed to write output for {file_path}: {e}", extra={"input": file_path})
+                if on_file_done:
+                    on_file_done(file_path, None, f"write error: {e}")
+                continue
+            if on_result:
+                on_result(file_path, out_path, final_result)
     return outputs
 
 
+def chain_callbacks(callbacks: list[Callable]) -> Callable:
+    """Combine several on_file_done callbacks into one."""
+    def on_file_done(file_path: str, out_path: Optional[Path], error: Optional[str]) -> None:
+        for callback in callbacks:
+            callback(file_path, out_path, error)
+    return on_file_done
+
+
 def process_folder(folder_path: str, output_folder: Optional[str] = None,
-                   delimiter: str = ';', excluded_properties: Optional[Set[str]] = None) -> list[Path]:
-    """Process all CSV files in a folder and create mirrored structure with JSON outputs.
+                   delimiter: str = ';', excluded_properties: Optional[Set[str]] = None,
+                   durability: str = DEFAULT_DURABILITY, shard: Optional[tuple[int, int]] = None,
+                   resume: bool = False, max_retries: int = DEFAULT_MAX_RETRIES,
+                   sections: Optional[Set[str]] = None, header_only: bool = False,
+                   on_result: Optional[Callable[[str, Path, dict], None]] = None,
+                   dedup: bool = False, profiler: Optional["FileProfiler"] = None,
+                   budget: Optional[memory_governor.MemoryBudget] = None, typed: bool = False,
+                   output_format: str = DEFAULT_FORMAT, prefetch_files: int = 0,
+                   progress: Optional["Progress"] = None,
+                   on_file_done: Optional[Callable[[str, Optional[Path], Optional[str]], None]] = None) -> list[Path]:
+    """Process all CSV files in a folder and create mirrored structure with JSON (or MessagePack) outputs.
+
+    Compressed profiles (*.csv.gz, *.csv.bz2, *.csv.xz, *.csv.zst) are included and
+    decompressed on the fly; their outputs are named after the inner file.
+    The folder tree is listed by a pool of threads (see prefetch.scan_profiles) and the
+    files are processed in the order of the tree.
+
+    With shard=(i, N) only the files whose relative path hashes to shard i are
+    processed, and a completion manifest is written to <output>/_shards/.
+
+    The outcome of every input is checkpointed to a journal in the output folder.
+    With resume=True inputs completed by a previous run are skipped and failed
+    inputs are retried at most max_retries times.
+
+    With dedup=True byte-identical inputs are parsed once and the outputs of the
+    others are hardlinked to its output; inputs with the same parsed content apart
+    from execution date and contributor are grouped in <output>/_dedup.json.
 
     Args:
         folder_path: Path to the source folder containing CSV files
         output_folder: Path to output folder (default: folder name + '_parsed' in current directory)
         delimiter: CSV delimiter character
         excluded_properties: Set of property names to exclude from output
+        durability: Output durability level ('none', 'atomic', 'batch' or 'full'), see output_writer
+        shard: Optional (index, count) pair selecting a deterministic subset of the files, see sharding
+        resume: Skip inputs completed by a previous run according to the checkpoint journal
+        max_retries: Number of times a failed input is retried when resuming
+        sections: Section names or patterns to keep besides "Basic information" (default: all)
+        header_only: Output just the basic information of each file, see process_files
+        on_result: Called after each written output, see process_files
+        dedup: Parse identical inputs once and report semantically identical ones, see dedup
+        profiler: Optional FileProfiler, see process_files
+        budget: Optional per-file MemoryBudget, see process_files
+        typed: Output typed records where the parser supports it, see process_files
+        output_format: 'json' or 'msgpack', see process_files
+        prefetch_files: Number of files read ahead in background threads, see process_files
+        progress: Optional Progress to which the files to process are added and reported when done
+        on_file_done: Called after each input, see process_files (e.g. run_logging.RunSummary.on_file_done)
 
     Returns a list of written output Paths.
     """
@@ -126,8 +237,10 @@ def process_folder(folder_path: str, output_folder: Optional[str] = None,
     logger.info(f"Source folder: {source_path}")
     logger.info(f"Output folder: {output_path}")
 
-    # Find all CSV files recursively
-    csv_files = list(source_path.rglob('*.csv'))
+    # Find all CSV files recursively, including compressed ones (*.csv.gz, *.csv.zst, ...),
+    # listing directories concurrently since each listing is a round trip on network filesystems
+    import prefetch
+    csv_files = prefetch.scan_profiles(source_path)
 
     if not csv_files:
         logger.warning(f"No CSV files found in {source_path}")
@@ -135,24 +248,99 @@ def process_folder(folder_path: str, output_folder: Optional[str] = None,
 
     logger.info(f"Found {len(csv_files)} CSV file(s) to process")
 
+    shard_run = None
+    if shard:
+        import sharding
+        index, count = shard
+        csv_files = sharding.select_shard(csv_files, source_path, index, count)
+        shard_run = sharding.ShardRun(index, count, source_path, output_path)
+        logger.info(f"Shard {index}/{count}: {len(csv_files)} CSV file(s) selected")
+
     # Create output folder structure
     output_path.mkdir(parents=True, exist_ok=True)
 
+    journal = Checkpoint(output_path, source_path, shard=shard)
+    if resume:
+        journal.load()
+        csv_files, completed, exhausted = journal.partition(csv_files, max_retries)
+        logger.info(f"Resuming: {len(completed)} file(s) already done, {len(exhausted)} out of retries, "
+                    f"{len(csv_files)} to process")
+        if shard_run:
+            for file, out_path in completed:
+                shard_run.on_file_done(str(file), out_path, None)
+    else:
+        journal.reset()
+
+    callbacks = [journal.on_file_done]
+    if shard_run:
+        callbacks.append(shard_run.on_file_done)
+    if progress is not None:
+        from progress import file_sizes
+        # Before dedup, whose duplicates are reported when their outputs are linked
+        progress.add_inputs(file_sizes(csv_files))
+        callbacks.append(progress.on_file_done)
+    if on_file_done:
+        callbacks.append(on_file_done)
+    on_file_done = chain_callbacks(callbacks)
+
+    dedup_run = None
+    if dedup:
+        import dedup as dedup_module
+        dedup_run = dedup_module.DedupRun(source_path, output_path,
+                                          lambda file: output_path_for(str(file), output_path, source_path,
+                                                                       OUTPUT_FORMATS[output_format]))
+        csv_files = dedup_run.partition(csv_files)
+        on_result = dedup_run.wrap_on_result(on_result)
+
     # Process all files
     file_paths = [str(f) for f in csv_files]
-    outputs = process_files(
-        file_paths,
-        delimiter=delimiter,
-        excluded_properties=excluded_properties,
-        output_dir=output_path,
-        source_base=source_path
-    )
+    try:
+        outputs = process_files(
+            file_paths,
+            delimiter=delimiter,
+            excluded_properties=excluded_properties,
+            output_dir=output_path,
+            source_base=source_path,
+            durability=durability,
+            on_file_done=on_file_done,
+            sections=sections,
+            header_only=header_only,
+            on_result=on_result,
+            profiler=profiler,
+            budget=budget,
+            typed=typed,
+            output_format=output_format,
+            prefetch_files=prefetch_files
+        )
+        if dedup_run:
+            # Outputs are committed once process_files returns, so they can be linked now
+            outputs.extend(dedup_run.link_duplicates(on_file_done))
+    finally:
+        journal.close()
+    if dedup_run:
+        dedup_run.write_report()
+    if shard_run:
+        shard_run.write_manifest()
 
     logger.info(f"Processing complete. {len(outputs)} file(s) converted.")
     return outputs
 
 
+def write_report(report: dict, output_path: Optional[str] = None) -> None:
+    """Write a JSON report to output_path, or print it to stdout."""
+    if output_path:
+        with open(output_path, "w", encoding='utf-8') as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        logger.info(f"Report saved to {output_path}")
+    else:
+        print(json.dumps(report, indent=4, ensure_ascii=False))
+
+
 if __name__ == '__main__':
+    # Imported here so that library users of main.py don't pay for it
+    import argparse
+    from progress import PROGRESS_MODES, file_sizes, make_progress, throttle_per_file_logs
+
     logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(name)s: %(message)s')
 
     parser = argparse.ArgumentParser(
@@ -168,6 +356,30 @@ Examples:
 
   # Process folder with custom output location:
   python main.py --folder /path/to/csv/folder --output /path/to/output
+
+  # Process one of four shards of a folder on each node, then merge the manifests:
+  python main.py --folder /shared/results --output /shared/parsed --shard 0/4
+  python main.py --merge-shards /shared/parsed
+
+  # Process a ZIP/TAR archive straight into a compressed output archive:
+  python main.py --archive results.zip --output parsed.tar.gz --jobs 4
+
+  # Write compact MessagePack outputs for machine consumers:
+  python main.py --folder /path/to/csv/folder --format msgpack
+
+  # Diff two runs of the same card (CSV or JSON outputs):
+  python main.py --diff old.json new.json --diff-threshold 0.2
+
+  # Index cards while converting, then find profiles by (masked) ATR or CPLC field:
+  python main.py --folder /path/to/csv/folder --index cards.json
+  python main.py --index cards.json --lookup-atr "3B 8x 80 01*"
+  python main.py --index cards.json --lookup-cplc ICFabricator=4790
+
+  # List performance outliers across a corpus of jcperf/TPM profiles:
+  python main.py --perf-report parsed-results/ --output report.json
+
+  # Compare TPM operations across devices in a CSV or SQLite table:
+  python main.py --tpm-compare tpm-results/ --output tpm.sqlite
         '''
     )
 
@@ -175,32 +387,269 @@ Examples:
     parser.add_argument('file_paths', nargs='*', default=[],
                         help='Path(s) to CSV file(s) to process')
     parser.add_argument('-f', '--folder', dest='folder_path',
-                        help='Path to folder containing CSV files (processes recursively)')
+                        help='Path to folder containing CSV files (processes recursively), or a ZIP/TAR archive')
+    parser.add_argument('-a', '--archive', dest='archive_path',
+                        help='Path to a ZIP/TAR archive of CSV files (processed without extracting)')
 
     # Output options
     parser.add_argument('-o', '--output', dest='output_path',
-                        help='Output folder path (only used with --folder)')
+                        help='Output folder path (--folder), output folder or archive (--archive), '
+                             'or report file (--diff, --perf-report, --tpm-compare)')
 
     # Processing options
     parser.add_argument('-d', '--delimiter', default=';',
                         help='Delimiter to use (default: ;)')
     parser.add_argument('-x', '--exclude-file', default=None,
                         help='Path to a file with property names to exclude')
+    parser.add_argument('--only-sections', nargs='+', metavar='SECTION', default=None,
+                        help='Keep only these sections (names or globs such as "KEY PAIR*") besides '
+                             'Basic information; other sections are skipped while parsing')
+    parser.add_argument('--drop-raw-measurements', action='store_true',
+                        help='Leave out the raw baseline/operation measurement arrays of jcperf profiles')
+    parser.add_argument('--header-only', action='store_true',
+                        help='Read only the leading lines of each profile and output just its basic information '
+                             '(ATR, card name, JavaCard version, CPLC), e.g. for fleet inventories')
+    parser.add_argument('--typed', action='store_true',
+                        help='Output typed TPM records: numbers and nulls instead of strings, parsed hex ids, '
+                             'success ratio and throughput (ops/s)')
+    parser.add_argument('--format', dest='output_format', choices=list(OUTPUT_FORMATS), default=DEFAULT_FORMAT,
+                        help='Output format of converted profiles: json, or msgpack for compact schema-versioned '
+                             'MessagePack read with binary_format.load (default: json)')
+    parser.add_argument('--stream-above', type=memory_governor.parse_size, metavar='SIZE',
+                        default=memory_governor.DEFAULT_STREAM_BYTES,
+                        help='Stream files larger than SIZE through the parser instead of loading them whole '
+                             '(e.g. 64M, the default)')
+    parser.add_argument('--max-file-size', type=memory_governor.parse_size, metavar='SIZE', default=None,
+                        help='Skip inputs larger than SIZE (e.g. 2G) with a reason instead of parsing them')
+    parser.add_argument('--max-lines', type=int, metavar='N', default=None,
+                        help='Skip inputs with more than N lines with a reason instead of parsing them')
+    parser.add_argument('--prefetch', type=int, metavar='K', default=0,
+                        help='Read up to K of the next files in background threads while parsing, to hide the '
+                             'latency of network filesystems (default: 0, no read-ahead)')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Bulk logging mode: log only warnings and errors, as JSON lines, and a summary of '
+                             'the run instead of per-file lines')
+    parser.add_argument('--progress', choices=PROGRESS_MODES, default='auto',
+                        help='Progress with files/s, MB/s, ETA and errors: a bar, JSON lines on stderr, or none; '
+                             'auto shows a bar on a terminal. Per-file INFO logs are throttled while shown '
+                             '(default: auto)')
+    parser.add_argument('--progress-interval', type=float, metavar='SECONDS', default=None,
+                        help='Seconds between progress updates (default: 0.5 for the bar, 5 for JSON lines)')
+    parser.add_argument('--durability', choices=DURABILITY_LEVELS, default=DEFAULT_DURABILITY,
+                        help='Output durability: none, atomic (temp file + rename), batch (batched fsync) '
+                             'or full (fsync per file) (default: atomic)')
+    parser.add_argument('--shard', metavar='I/N', default=None,
+                        help='Process only shard I of N (0-based) of the --folder files, for multi-node runs')
+    parser.add_argument('--merge-shards', metavar='OUTPUT_FOLDER', default=None,
+                        help='Merge the shard manifests written to OUTPUT_FOLDER by --shard runs')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip --folder inputs completed by a previous run (uses the checkpoint journal)')
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f'Number of times a failed input is retried with --resume (default: {DEFAULT_MAX_RETRIES})')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Parse byte-identical --folder inputs once (hardlinking their outputs) and report '
+                             'profiles identical apart from execution date and contributor')
+    parser.add_argument('--profile-cpu', action='store_true',
+                        help='Profile each file (file and folder modes) with cProfile and report the slowest inputs '
+                             'and their hot functions')
+    parser.add_argument('--profile-mem', action='store_true',
+                        help='Trace allocations of each file with tracemalloc and report the peak per input')
+    parser.add_argument('--profile-report', metavar='REPORT_FILE', default=None,
+                        help='Write the --profile-cpu/--profile-mem report to REPORT_FILE instead of stdout')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of worker processes for archive members (default: 1)')
+
+    # Analysis options
+    parser.add_argument('--index', metavar='INDEX_FILE', default=None,
+                        help='Card index (ATR, card name, CPLC) updated while converting files or folders, '
+                             'written by --build-index and read by --lookup-atr/--lookup-cplc')
+    parser.add_argument('--build-index', nargs='+', metavar='PATH', default=None,
+                        help='Add profiles (CSV/JSON files or folders) to the --index file without converting them')
+    parser.add_argument('--lookup-atr', metavar='ATR', default=None,
+                        help='Print the --index entries matching an ATR; "." or "x" match any hex digit, '
+                             'a trailing "*" matches a prefix')
+    parser.add_argument('--lookup-cplc', metavar='FIELD=VALUE', default=None,
+                        help='Print the --index entries with the given CPLC field value, e.g. ICFabricator=4790')
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'), default=None,
+                        help='Structurally diff two profiles (CSV or JSON) and print the changes as JSON')
+    parser.add_argument('--diff-threshold', type=float, default=None,
+                        help='Relative timing change reported by --diff (default: 0.1)')
+    parser.add_argument('--perf-report', nargs='+', metavar='PATH', default=None,
+                        help='Report avg op outliers across jcperf/TPM profiles (CSV/JSON files or folders)')
+    parser.add_argument('--z-threshold', type=float, default=3.0,
+                        help='Minimum leave-one-out z-score of an outlier for --perf-report (default: 3.0)')
+    parser.add_argument('--min-ratio', type=float, default=2.0,
+                        help='Minimum slowdown/speedup factor of an outlier for --perf-report (default: 2.0)')
+    parser.add_argument('--tpm-compare', nargs='+', metavar='PATH', default=None,
+                        help='Build a per-device stats table of TPM operations from TPM profiles (CSV/JSON files '
+                             'or folders), written as SQLite (.sqlite/.db output) or CSV')
 
     args = parser.parse_args()
+    summary = None
+    if args.quiet:
+        import run_logging
+        run_logging.configure_quiet()
+        summary = run_logging.RunSummary()
     delimiter = args.delimiter
     excluded = parser_utils.load_exclusions(args.exclude_file) if args.exclude_file else None
+    if args.drop_raw_measurements:
+        excluded = (excluded or set()) | set(RAW_MEASUREMENT_PROPERTIES)
+    sections = set(args.only_sections) if args.only_sections else None
 
-    if args.folder_path:
+    shard = None
+    if args.shard:
+        import sharding
+        try:
+            shard = sharding.parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+
+    card_index = None
+    if args.index:
+        import card_index as card_index_module
+        card_index = card_index_module.CardIndex.load(args.index)
+    elif args.build_index or args.lookup_atr or args.lookup_cplc:
+        parser.error("--build-index, --lookup-atr and --lookup-cplc require --index INDEX_FILE.")
+    on_result = card_index.on_result if card_index is not None else None
+
+    budget = memory_governor.MemoryBudget(args.stream_above, args.max_file_size, args.max_lines)
+
+    profiler = None
+    if args.profile_cpu or args.profile_mem:
+        from file_profiler import FileProfiler
+        profiler = FileProfiler(cpu=args.profile_cpu, mem=args.profile_mem)
+
+    # Progress of conversion runs (file, folder and archive modes)
+    analysis = (args.lookup_atr or args.lookup_cplc or args.build_index or args.merge_shards or args.diff
+                or args.perf_report or args.tpm_compare)
+    progress = None if analysis else make_progress(args.progress, interval=args.progress_interval)
+    if progress is not None:
+        throttle_per_file_logs()
+    if args.output_format == 'msgpack' and not analysis:
+        import binary_format
+        if binary_format.msgpack is None:
+            logger.warning("msgpack is not installed: --format msgpack falls back to the pure-Python encoder, "
+                           "which is several times slower (pip install msgpack)")
+
+    if args.lookup_atr or args.lookup_cplc:
+        # Lookup mode: query the card index
+        if args.lookup_atr:
+            query, matches = args.lookup_atr, card_index.lookup_atr(args.lookup_atr)
+        else:
+            field, sep, value = args.lookup_cplc.partition('=')
+            if not sep:
+                parser.error("--lookup-cplc expects FIELD=VALUE.")
+            query, matches = args.lookup_cplc, card_index.lookup_cplc(field, value)
+        write_report({"query": query, "count": len(matches), "matches": matches}, args.output_path)
+    elif args.build_index:
+        # Index mode: add profiles to the card index without converting them
+        import card_index as card_index_module
+        card_index_module.build_index(args.build_index, delimiter, card_index)
+        card_index.save(args.index, args.durability)
+    elif args.merge_shards:
+        # Merge mode: combine shard manifests and metrics of a sharded run
+        import sharding
+        try:
+            merged = sharding.merge_manifests(args.merge_shards)
+        except (OSError, ValueError) as e:
+            # Missing, unreadable or inconsistent shard manifests
+            parser.error(str(e))
+        write_report(merged, args.output_path)
+    elif args.diff:
+        # Diff mode: compare two profiles and print (or write) the changes
+        import profile_diff
+        import parser_api
+        try:
+            old_profile, new_profile = (parser_api.load_result(path, delimiter) for path in args.diff)
+        except (OSError, ValueError) as e:
+            parser.error(f"Could not load profiles to diff: {e}")
+        if old_profile is None or new_profile is None:
+            parser.error("Could not load profiles to diff.")
+        threshold = args.diff_threshold if args.diff_threshold is not None else profile_diff.DEFAULT_THRESHOLD
+        try:
+            report = profile_diff.diff_profiles(old_profile, new_profile, threshold)
+        except ValueError as e:
+            # Profiles of different or unsupported types
+            parser.error(str(e))
+        write_report(report, args.output_path)
+    elif args.perf_report:
+        # Report mode: stream profiles and list avg op outliers per method
+        import perf_report
+        report = perf_report.build_report(args.perf_report, delimiter, z_threshold=args.z_threshold,
+                                          min_ratio=args.min_ratio)
+        write_report(report, args.output_path)
+    elif args.tpm_compare:
+        # Comparison mode: stream TPM profiles into a per-device table
+        import tpm_compare
+        tpm_compare.export_table(tpm_compare.build_table(args.tpm_compare, delimiter), args.output_path)
+    elif args.archive_path or (args.folder_path and Path(args.folder_path).is_file()):
+        # Archive mode: stream members of a ZIP/TAR archive into the parsers
+        unsupported = [option for option, value in (
+            ('--index', args.index), ('--profile-cpu', args.profile_cpu), ('--profile-mem', args.profile_mem),
+            ('--dedup', args.dedup), ('--prefetch', args.prefetch), ('--shard', args.shard),
+            ('--resume', args.resume)) if value]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} cannot be used with archive inputs.")
+        import archive_io
+        archive_io.process_archive(
+            args.archive_path or args.folder_path,
+            output=args.output_path,
+            delimiter=delimiter,
+            excluded_properties=excluded,
+            jobs=args.jobs,
+            durability=args.durability,
+            sections=sections,
+            header_only=args.header_only,
+            budget=budget,
+            typed=args.typed,
+            output_format=args.output_format,
+            progress=progress,
+            on_file_done=summary.on_file_done if summary is not None else None
+        )
+    elif args.folder_path:
         # Folder mode: process all CSV files in folder
         process_folder(
             args.folder_path,
             output_folder=args.output_path,
             delimiter=delimiter,
-            excluded_properties=excluded
+            excluded_properties=excluded,
+            durability=args.durability,
+            shard=shard,
+            resume=args.resume,
+            max_retries=args.max_retries,
+            sections=sections,
+            header_only=args.header_only,
+            on_result=on_result,
+            dedup=args.dedup,
+            profiler=profiler,
+            budget=budget,
+            typed=args.typed,
+            output_format=args.output_format,
+            prefetch_files=args.prefetch,
+            progress=progress,
+            on_file_done=summary.on_file_done if summary is not None else None
         )
+        if card_index is not None:
+            card_index.save(args.index, args.durability)
     elif args.file_paths:
         # File mode: process individual files
-        process_files(args.file_paths, delimiter, excluded_properties=excluded)
+        if progress is not None:
+            progress.add_inputs(file_sizes(args.file_paths))
+        callbacks = [callback.on_file_done for callback in (progress, summary) if callback is not None]
+        process_files(args.file_paths, delimiter, excluded_properties=excluded, durability=args.durability,
+                      sections=sections, header_only=args.header_only, on_result=on_result, profiler=profiler,
+                      budget=budget, typed=args.typed, output_format=args.output_format,
+                      prefetch_files=args.prefetch,
+                      on_file_done=chain_callbacks(callbacks) if callbacks else None)
+        if card_index is not None:
+            card_index.save(args.index, args.durability)
     else:
         parser.error("Please provide either file paths or use --folder option.")
+
+    if progress is not None:
+        progress.close()
+    if summary is not None and not analysis:
+        summary.log()
+    if profiler is not None:
+        profiler.close()
+        write_report(profiler.report(), args.profile_report)
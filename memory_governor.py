@@ -0,0 +1,179 @@
+"""Memory governor: per-file size budgets and memory-bounded concurrency.
+
+Files up to the streaming threshold are loaded whole, as before. Larger and
+compressed files are streamed through the parser group by group, so only the
+current group and the result are held in memory. Files above the hard byte cap, or with more lines
+than the line budget, are skipped with a reason instead of being parsed.
+The on-disk size is checked before opening a file, and the budget is also
+enforced while reading, which covers compressed inputs and files that are still
+growing. Sizes count decoded characters, i.e. bytes for ASCII profiles.
+
+For parallel runs, limit_jobs caps the number of workers by the memory that is
+currently available.
+"""
+import logging
+import os
+import re
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import parser_utils
+import parser_registry
+from parser_api import convert_groups
+
+logger = logging.getLogger(__name__)
+
+# Files larger than this are streamed instead of loaded whole
+DEFAULT_STREAM_BYTES = 64 * 1024 * 1024
+
+# Peak memory of parsing a loaded profile, as a multiple of its size
+# (text, stripped lines, groups and the result)
+PARSE_MEMORY_FACTOR = 6
+
+# Share of the available memory parallel workers may use
+MEMORY_HEADROOM = 0.75
+
+SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+
+
+class BudgetExceeded(Exception):
+    """Raised when an input exceeds its byte or line budget."""
+
+
+def parse_size(text: str) -> int:
+    """Parse a size such as '512', '64M' or '2GiB' into bytes."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*', text.lower())
+    if not match:
+        raise ValueError(f"Invalid size '{text}', expected a number with an optional K/M/G/T suffix")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def available_memory() -> Optional[int]:
+    """Return the currently available memory in bytes, or None where it cannot be determined."""
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class MemoryBudget:
+    """Per-file memory budget.
+
+    Args:
+        stream_bytes: Files larger than this are streamed instead of loaded whole
+        max_bytes: Hard cap, larger files are skipped (no cap when None)
+        max_lines: Files with more lines are skipped (no limit when None)
+    """
+
+    def __init__(self, stream_bytes: int = DEFAULT_STREAM_BYTES, max_bytes: Optional[int] = None,
+                 max_lines: Optional[int] = None):
+        self.stream_bytes = stream_bytes
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+
+    def check_size(self, size: int, name: str) -> None:
+        """Raise BudgetExceeded if an input of size bytes is over the hard cap."""
+        if self.max_bytes is not None and size > self.max_bytes:
+            raise BudgetExceeded(f"{name} has {size} bytes, more than the budget of {self.max_bytes}")
+
+    def streams(self, file_path: str, size: int) -> bool:
+        """Whether an input with size bytes on disk is streamed instead of loaded whole."""
+        # The decompressed size of compressed inputs is unknown up front, so they are always streamed
+        return size > self.stream_bytes or bool(parser_utils.compression_suffix(file_path))
+
+    def check_content(self, data: bytes, name: str) -> None:
+        """Raise BudgetExceeded if in-memory content is over the byte or line budget."""
+        self.check_size(len(data), name)
+        if self.max_lines is not None and data.count(b'\n') >= self.max_lines + 1:
+            raise BudgetExceeded(f"{name} exceeds the budget of {self.max_lines} lines")
+
+    def limit(self, lines: Iterable[str], name: str) -> Iterator[str]:
+        """Yield lines, raising BudgetExceeded as soon as the byte or line budget is exceeded.
+
+        Line ends are counted as part of the size, so lines must keep them (as read from a file).
+        """
+        if self.max_bytes is None and self.max_lines is None:
+            yield from lines
+            return
+        max_bytes = self.max_bytes if self.max_bytes is not None else float('inf')
+        max_lines = self.max_lines if self.max_lines is not None else float('inf')
+        size = 0
+        for count, line in enumerate(lines, 1):
+            size += len(line)
+            if size > max_bytes:
+                raise BudgetExceeded(f"{name} exceeds the budget of {self.max_bytes} bytes")
+            if count > max_lines:
+                raise BudgetExceeded(f"{name} exceeds the budget of {self.max_lines} lines")
+            yield line
+
+    def worker_bytes(self) -> int:
+        """Estimated peak memory of one worker parsing a whole profile within this budget."""
+        largest = self.max_bytes if self.max_bytes is not None else self.stream_bytes
+        # At least one byte, when everything is streamed (stream_bytes of 0)
+        return max(1, largest) * PARSE_MEMORY_FACTOR
+
+
+def parse_file(file_path: str, budget: MemoryBudget, delimiter: str = ';',
+               excluded: Optional[parser_utils.NameMatcher] = None,
+               sections: Optional[parser_utils.NameMatcher] = None, typed: bool = False,
+               content: Optional[str] = None) -> tuple[str, dict]:
+    """Parse a (possibly compressed) profile within budget, returning (parser type, result).
+
+    With typed, parsers supporting it return typed records (see parser_api.convert_groups).
+    content is the text of the file when it was already read whole (see prefetch.read_ahead),
+    it is parsed like a loaded file within the line and byte budget.
+
+    Raises BudgetExceeded when the file is over the hard cap or line budget, and
+    OSError/UnicodeDecodeError when it cannot be read.
+    """
+    name = Path(file_path).name
+    # Loaded lines keep their line ends like streamed ones, so both count the same characters against the budget
+    if content is not None:
+        return parse_lines(file_path, budget.limit(content.splitlines(keepends=True), name), False, delimiter,
+                           excluded, sections, typed)
+    size = os.path.getsize(file_path)
+    budget.check_size(size, name)
+    streaming = budget.streams(file_path, size)
+    if streaming:
+        logger.info("Streaming %s (%d bytes)", file_path, size, extra=parser_utils.PER_FILE)
+    with parser_utils.open_text(file_path) as f:
+        # Loaded whole like parser_utils.load_file, so line splitting is the same
+        lines = budget.limit(f if streaming else f.read().splitlines(keepends=True), name)
+        return parse_lines(file_path, lines, streaming, delimiter, excluded, sections, typed)
+
+
+def parse_lines(file_path: str, lines: Iterator[str], streaming: bool, delimiter: str,
+                excluded: Optional[parser_utils.NameMatcher], sections: Optional[parser_utils.NameMatcher],
+                typed: bool) -> tuple[str, dict]:
+    """Detect the parser type of the lines of file_path and convert them, see parse_file."""
+    # Path hints first, then the leading lines, which are replayed to the parser
+    sniffed = list(islice(lines, parser_registry.SNIFF_LINES))
+    parser_type = parser_registry.detect(file_path, sniffed)
+    logger.info("Detected parser type: %s", parser_type, extra=parser_utils.PER_FILE)
+    groups = parser_utils.iter_groups(chain(sniffed, lines))
+    if not streaming:
+        groups = list(groups)
+    return parser_type, convert_groups(groups, parser_type, delimiter, excluded, sections, typed)
+
+
+def limit_jobs(jobs: int, budget: MemoryBudget, available: Optional[int] = None) -> int:
+    """Cap the number of parallel workers so that their estimated peak memory fits the available memory."""
+    if jobs <= 1:
+        return jobs
+    if available is None:
+        available = available_memory()
+    if available is None:
+        return jobs
+    allowed = max(1, int(available * MEMORY_HEADROOM) // budget.worker_bytes())
+    if allowed < jobs:
+        logger.warning(f"Limiting workers from {jobs} to {allowed}: {available // (1024 * 1024)} MiB available, "
+                       f"up to {budget.worker_bytes() // (1024 * 1024)} MiB per worker")
+        return allowed
+    return jobs
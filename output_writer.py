@@ -0,0 +1,165 @@
+"""Atomic, buffered output writer with configurable durability.
+
+Every output is serialized to an in-memory buffer first and written in a
+single call, so a serialization error never leaves a partial file behind.
+
+Durability levels:
+    'none'   - write the final file directly (fastest, may leave partial files on crash)
+    'atomic' - write a temp file next to the output and rename it over the output (default)
+    'batch'  - like 'atomic', but temp files are fsynced and renamed in batches,
+               followed by one fsync per output directory
+    'full'   - like 'atomic', with fsync of every file and its directory before rename returns
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_LEVELS = ('none', 'atomic', 'batch', 'full')
+DEFAULT_DURABILITY = 'atomic'
+
+# Output formats and the suffix of their files, see binary_format for 'msgpack'
+OUTPUT_FORMATS = {'json': '.json', 'msgpack': '.msgpack'}
+DEFAULT_FORMAT = 'json'
+
+# Number of files committed together with durability 'batch'
+DEFAULT_BATCH_SIZE = 64
+
+
+def serialize_json(data) -> bytes:
+    """Serialize data to indented UTF-8 JSON, the default output format."""
+    return json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8')
+
+
+def serialize_output(data, output_format: str = DEFAULT_FORMAT) -> bytes:
+    """Serialize a parsed result in one of OUTPUT_FORMATS."""
+    if output_format == 'json':
+        return serialize_json(data)
+    if output_format == 'msgpack':
+        # Only imported when binary outputs are requested
+        import binary_format
+        return binary_format.dumps(data)
+    raise ValueError(f"Unknown output format: {output_format} (expected one of {tuple(OUTPUT_FORMATS)})")
+
+
+def fsync_directory(path: Path) -> None:
+    """fsync a directory so that renames inside it are durable (no-op where unsupported)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class OutputWriter:
+    """Writes output files according to a durability level. Use as a context manager."""
+
+    def __init__(self, durability: str = DEFAULT_DURABILITY, batch_size: int = DEFAULT_BATCH_SIZE):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability level: {durability} (expected one of {DURABILITY_LEVELS})")
+        self.durability = durability
+        self.batch_size = max(1, batch_size)
+        # (open temp file descriptor, temp path, final path, on_commit) waiting for the next batch commit
+        self._pending: list[tuple[int, Path, Path, Optional[Callable[[Path], None]]]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write_json(self, path: Union[str, Path], data, on_commit: Optional[Callable[[Path], None]] = None) -> Path:
+        """Serialize data as indented JSON and write it to path."""
+        return self.write_bytes(path, serialize_json(data), on_commit)
+
+    def write_output(self, path: Union[str, Path], data, output_format: str = DEFAULT_FORMAT,
+                     on_commit: Optional[Callable[[Path], None]] = None) -> Path:
+        """Serialize a parsed result in output_format (see OUTPUT_FORMATS) and write it to path."""
+        return self.write_bytes(path, serialize_output(data, output_format), on_commit)
+
+    def write_bytes(self, path: Union[str, Path], content: bytes,
+                    on_commit: Optional[Callable[[Path], None]] = None) -> Path:
+        """Write content to path according to the durability level.
+
+        on_commit(path) is called once the output is in place; with durability 'batch'
+        that is when its batch is committed, which may be during a later write or close().
+        """
+        path = Path(path)
+        if self.durability == 'none':
+            with open(path, 'wb') as f:
+                f.write(content)
+            if on_commit:
+                on_commit(path)
+            return path
+
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            view = memoryview(content)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        except BaseException:
+            os.close(fd)
+            os.unlink(tmp_path)
+            raise
+
+        if self.durability == 'batch':
+            self._pending.append((fd, tmp_path, path, on_commit))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            return path
+
+        try:
+            if self.durability == 'full':
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+        if self.durability == 'full':
+            fsync_directory(path.parent)
+        if on_commit:
+            on_commit(path)
+        return path
+
+    def flush(self) -> None:
+        """Commit pending batched outputs: fsync all temp files, rename them, fsync their directories.
+
+        The on_commit callbacks of the batch run afterwards. If an fsync fails, nothing of
+        the batch is committed and its temp files are removed.
+        """
+        pending, self._pending = self._pending, []
+        try:
+            try:
+                for fd, tmp_path, path, on_commit in pending:
+                    os.fsync(fd)
+            finally:
+                for fd, tmp_path, path, on_commit in pending:
+                    os.close(fd)
+        except BaseException:
+            for fd, tmp_path, path, on_commit in pending:
+                tmp_path.unlink(missing_ok=True)
+            raise
+        directories = set()
+        for fd, tmp_path, path, on_commit in pending:
+            os.replace(tmp_path, path)
+            directories.add(path.parent)
+        for directory in directories:
+            fsync_directory(directory)
+        if pending:
+            logger.debug(f"Committed batch of {len(pending)} output(s)")
+        for fd, tmp_path, path, on_commit in pending:
+            if on_commit:
+                on_commit(path)
+
+    def close(self) -> None:
+        """Commit any pending outputs."""
+        self.flush()
@@ -0,0 +1,196 @@
+"""In-memory library API for parsing profiles without touching disk.
+
+Example:
+    import parser_api
+    result = parser_api.parse_text(csv_text)                 # auto-detected
+    result = parser_api.parse_bytes(data, parser_type='tpm')
+    header = parser_api.parse_header('card.csv')             # basic information only
+    for result in parser_api.parse_many([data1, data2]):
+        ...
+"""
+import io
+import json
+from itertools import chain
+from typing import BinaryIO, Iterable, Iterator, Optional, TextIO, Union
+import parser_utils
+import parser_registry
+
+# Raw timing arrays of jcperf method records, dropped by --drop-raw-measurements
+RAW_MEASUREMENT_PROPERTIES = ("baseline measurements", "operation raw measurements")
+
+Patterns = Union[parser_utils.NameMatcher, Iterable[str], None]
+
+
+def detect_parser_type(file_path: str) -> str:
+    """Detect which parser to use based on file path.
+
+    Returns:
+        str: 'tpm', 'javacard-performance', 'javacard-aid', 'javacard-algsupport'
+        or the name of a registered plugin parser
+    """
+    return parser_registry.detect(path=file_path)
+
+
+def sniff_parser_type(lines: list[str]) -> str:
+    """Detect which parser to use based on the leading content lines.
+
+    Used when no file name is available (e.g. profiles held in memory).
+    """
+    return parser_registry.detect(lines=lines)
+
+
+def convert_groups(groups: list[list[str]], parser_type: str, delimiter: str = ';',
+                   excluded: Patterns = None, sections: Patterns = None, typed: bool = False) -> dict:
+    """Run the parser selected by parser_type over already grouped lines.
+
+    Excluded properties and selected sections (names or patterns, see
+    parser_utils.NameMatcher) are applied by the parser itself while parsing
+    where it supports it, or to its result. Without sections all sections are kept;
+    "Basic information" is always kept. With typed, parsers supporting it (TPM)
+    return numbers and nulls instead of strings.
+    """
+    spec = parser_registry.get_spec(parser_type)
+    converter = spec.load()
+    options = {'typed': True} if typed and spec.typed else {}
+    if not excluded and sections is None:
+        return converter(groups, delimiter, **options)
+    excluded = parser_utils.name_matcher(excluded)
+    if sections is not None:
+        sections = parser_utils.name_matcher(sections)
+    if spec.filters:
+        return converter(groups, delimiter, excluded=excluded, sections=sections, **options)
+    result = converter(groups, delimiter, **options)
+    if sections is not None:
+        result = parser_utils.select_sections(result, sections)
+    return parser_utils.apply_exclusions(result, excluded)
+
+
+def parse_text(text: str, parser_type: Optional[str] = None, delimiter: str = ';',
+               name: Optional[str] = None, excluded_properties: Patterns = None,
+               sections: Patterns = None, typed: bool = False) -> dict:
+    """Parse profile content given as a string.
+
+    Args:
+        text: Full CSV content of the profile
+        parser_type: Parser to use; auto-detected when None
+        delimiter: CSV delimiter character
+        name: Optional original file name, used for path-based detection
+        excluded_properties: Property names or patterns to exclude from output,
+            or a compiled parser_utils.NameMatcher
+        sections: Section names or patterns to keep (besides "Basic information"); all when None
+        typed: Typed records (numbers, nulls, derived fields) where the parser supports it (TPM)
+    """
+    lines = text.splitlines()
+    if parser_type is None:
+        parser_type = parser_registry.detect(name, lines)
+    return convert_groups(parser_utils.prepare_lines(lines), parser_type, delimiter, excluded_properties, sections,
+                          typed)
+
+
+def parse_bytes(data: bytes, parser_type: Optional[str] = None, delimiter: str = ';',
+                name: Optional[str] = None, excluded_properties: Patterns = None,
+                encoding: str = 'utf-8', sections: Patterns = None, typed: bool = False) -> dict:
+    """Parse profile content given as raw bytes. See parse_text for arguments."""
+    text = data.decode(encoding, errors='replace')
+    return parse_text(text, parser_type, delimiter, name=name, excluded_properties=excluded_properties,
+                      sections=sections, typed=typed)
+
+
+def parse_stream(stream: Union[TextIO, BinaryIO], parser_type: Optional[str] = None, delimiter: str = ';',
+                 name: Optional[str] = None, excluded_properties: Patterns = None,
+                 encoding: str = 'utf-8', sections: Patterns = None, typed: bool = False) -> dict:
+    """Parse profile content from an open text or binary stream. See parse_text for arguments."""
+    content = stream.read()
+    if isinstance(content, bytes):
+        return parse_bytes(content, parser_type, delimiter, name=name, excluded_properties=excluded_properties,
+                           encoding=encoding, sections=sections, typed=typed)
+    return parse_text(content, parser_type, delimiter, name=name, excluded_properties=excluded_properties,
+                      sections=sections, typed=typed)
+
+
+def parse_many(buffers: Iterable[Union[str, bytes, io.IOBase]], parser_type: Optional[str] = None,
+               delimiter: str = ';', excluded_properties: Patterns = None,
+               encoding: str = 'utf-8', sections: Patterns = None, typed: bool = False) -> Iterator[dict]:
+    """Parse an iterable of in-memory profiles, yielding one result per buffer.
+
+    Each buffer can be a str, bytes or an open stream. Results are yielded lazily,
+    so only one parsed profile needs to be held in memory at a time.
+    """
+    # Compile the patterns once for all buffers
+    if excluded_properties:
+        excluded_properties = parser_utils.name_matcher(excluded_properties)
+    if sections is not None:
+        sections = parser_utils.name_matcher(sections)
+    for buffer in buffers:
+        if isinstance(buffer, str):
+            yield parse_text(buffer, parser_type, delimiter, excluded_properties=excluded_properties,
+                             sections=sections, typed=typed)
+        elif isinstance(buffer, (bytes, bytearray, memoryview)):
+            yield parse_bytes(bytes(buffer), parser_type, delimiter, excluded_properties=excluded_properties,
+                              encoding=encoding, sections=sections, typed=typed)
+        else:
+            yield parse_stream(buffer, parser_type, delimiter, excluded_properties=excluded_properties,
+                               encoding=encoding, sections=sections, typed=typed)
+
+
+def _recorded(lines: Iterator[str], record: list[str]) -> Iterator[str]:
+    """Yield lines, appending each one to record (lets detection sniff a stream without losing lines)."""
+    for line in lines:
+        record.append(line)
+        yield line
+
+
+def parse_header_lines(lines: Iterable[str], parser_type: Optional[str] = None, delimiter: str = ';',
+                       name: Optional[str] = None, excluded_properties: Patterns = None) -> dict:
+    """Header-only extraction: return just "_type" and the basic information of a profile.
+
+    lines can be an open file or any other lazy iterable; it is consumed only up to
+    the end of the header (e.g. the CPLC group of algorithm support profiles), plus
+    the leading lines needed for detection when parser_type is None and name gives
+    no hint. See parse_text for arguments.
+    """
+    lines = iter(lines)
+    if parser_type is None:
+        sniffed: list[str] = []
+        parser_type = parser_registry.detect(name, _recorded(lines, sniffed))
+        lines = chain(sniffed, lines)
+    spec = parser_registry.get_spec(parser_type)
+    header_converter = spec.load_header()
+    groups = parser_utils.iter_groups(lines)
+    if header_converter is None:
+        # Full conversion, reduced to the basic information
+        return convert_groups(list(groups), parser_type, delimiter, excluded_properties, sections=())
+    if not excluded_properties:
+        return header_converter(groups, delimiter)
+    excluded = parser_utils.name_matcher(excluded_properties)
+    if spec.filters:
+        return header_converter(groups, delimiter, excluded=excluded)
+    return parser_utils.apply_exclusions(header_converter(groups, delimiter), excluded)
+
+
+def parse_header(path: str, parser_type: Optional[str] = None, delimiter: str = ';',
+                 excluded_properties: Patterns = None, encoding: Optional[str] = None) -> dict:
+    """Header-only extraction from a (possibly compressed) file, streaming only its first lines.
+
+    See parse_header_lines.
+    """
+    with parser_utils.open_text(path, encoding) as f:
+        return parse_header_lines(f, parser_type, delimiter, name=path, excluded_properties=excluded_properties)
+
+
+def load_result(path: str, delimiter: str = ';') -> Optional[dict]:
+    """Load a parsed profile from a JSON or MessagePack output, or parse a CSV profile.
+
+    Returns None if the file could not be read.
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    if path.lower().endswith('.msgpack'):
+        import binary_format
+        return binary_format.load(path)
+    groups = parser_utils.load_file(path)
+    if groups is None:
+        return None
+    parser_type = parser_registry.detect(path, chain.from_iterable(groups))
+    return convert_groups(groups, parser_type, delimiter)
@@ -0,0 +1,234 @@
+"""Registry of available parsers, imported lazily on first use.
+
+Parser modules are only imported once a profile of their type is converted,
+which keeps CLI startup cheap for single-file invocations.
+
+Additional parsers can be added without forking, either explicitly:
+
+    import parser_registry
+    parser_registry.register_parser(
+        'rsa-keygen', 'my_parsers:convert_to_map_keygen',
+        path_detector=lambda path: 'keygen' in path,
+        header_detector=lambda line: line.startswith('RSA key generation'))
+
+or through the 'mapper.parsers' entry point group, where each entry point
+resolves to a ParserSpec (or a callable returning one). Scanning installed
+packages for entry points is slow, so it only happens when a profile matches
+no registered parser or an unknown parser type is requested.
+"""
+import importlib
+import logging
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'mapper.parsers'
+
+# Parser used when no detector matches
+DEFAULT_PARSER = 'javacard-algsupport'
+
+# Number of leading lines inspected by header detectors
+SNIFF_LINES = 200
+
+
+class ParserSpec:
+    """Description of a single parser.
+
+    Args:
+        name: Parser type name (e.g. 'tpm')
+        converter: Converter function (groups, delimiter) -> dict, or a lazy
+            'module:function' reference imported on first use
+        path_detector: Cheap check on the lower-cased file path
+        header_detector: Check on a single stripped line from the start of the file
+        priority: Lower values are checked first
+        filters: The converter accepts `excluded` and `sections` NameMatcher keywords
+            and skips excluded properties and unselected sections while parsing;
+            otherwise both are applied to its result afterwards
+        header_converter: Optional header-only converter (groups, delimiter) -> dict
+            returning just the basic information, or a lazy 'module:function'
+            reference; groups is a lazy iterator it should stop consuming early.
+            With filters it also accepts the `excluded` keyword
+        typed: The converter accepts a `typed` keyword and then returns numbers and
+            nulls instead of strings; typed conversions of other parsers are untyped
+    """
+
+    def __init__(self, name: str, converter: Union[str, Callable],
+                 path_detector: Optional[Callable[[str], bool]] = None,
+                 header_detector: Optional[Callable[[str], bool]] = None,
+                 priority: int = 100, filters: bool = False,
+                 header_converter: Union[str, Callable, None] = None, typed: bool = False):
+        self.name = name
+        self.converter = converter
+        self.path_detector = path_detector
+        self.header_detector = header_detector
+        self.priority = priority
+        self.filters = filters
+        self.header_converter = header_converter
+        self.typed = typed
+
+    def load(self) -> Callable:
+        """Return the converter function, importing its module if needed."""
+        self.converter = _resolve(self.converter)
+        return self.converter
+
+    def load_header(self) -> Optional[Callable]:
+        """Return the header-only converter function (None if there is none), importing its module if needed."""
+        if self.header_converter is not None:
+            self.header_converter = _resolve(self.header_converter)
+        return self.header_converter
+
+
+def _resolve(reference: Union[str, Callable]) -> Callable:
+    """Import a 'module:function' reference; callables are returned as they are."""
+    if isinstance(reference, str):
+        module_name, function_name = reference.split(':')
+        return getattr(importlib.import_module(module_name), function_name)
+    return reference
+
+
+def _is_aid_path(path: str) -> bool:
+    return '/aid/' in path or '\\aid\\' in path or 'aidsupport' in path
+
+
+def _is_aid_header(line: str) -> bool:
+    return line.startswith("jcAIDScan") or line.startswith("PACKAGE AID;") or line.startswith("FULL PACKAGE AID;")
+
+
+_registry: dict[str, ParserSpec] = {}
+_ordered: list[ParserSpec] = []
+_entry_points_loaded = False
+
+
+def register_parser(name: Union[str, ParserSpec], converter: Union[str, Callable, None] = None,
+                    path_detector: Optional[Callable[[str], bool]] = None,
+                    header_detector: Optional[Callable[[str], bool]] = None,
+                    priority: int = 100, filters: bool = False,
+                    header_converter: Union[str, Callable, None] = None, typed: bool = False) -> ParserSpec:
+    """Register (or replace) a parser. Accepts a ParserSpec or its constructor arguments."""
+    if isinstance(name, ParserSpec):
+        spec = name
+    else:
+        if converter is None:
+            raise ValueError(f"Parser {name} needs a converter")
+        spec = ParserSpec(name, converter, path_detector, header_detector, priority, filters, header_converter,
+                          typed)
+    _registry[spec.name] = spec
+    # Stable sort keeps registration order between equal priorities
+    _ordered[:] = sorted(_registry.values(), key=lambda s: s.priority)
+    return spec
+
+
+def unregister_parser(name: str) -> None:
+    """Remove a previously registered parser."""
+    spec = _registry.pop(name, None)
+    if spec is not None:
+        _ordered.remove(spec)
+
+
+def load_entry_points() -> None:
+    """Register parsers exposed by installed packages under ENTRY_POINT_GROUP (once)."""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    # Imported here, importlib.metadata is comparatively slow to import
+    from importlib import metadata
+    eps = metadata.entry_points()
+    if hasattr(eps, 'select'):
+        eps = eps.select(group=ENTRY_POINT_GROUP)
+    else:
+        # Python < 3.10 returns a dict of group -> entry points
+        eps = eps.get(ENTRY_POINT_GROUP, [])
+    for ep in eps:
+        # A broken plugin must not break the conversion of every other profile
+        try:
+            spec = ep.load()
+            if not isinstance(spec, ParserSpec):
+                spec = spec()
+        except Exception as e:
+            logger.warning(f"Skipping parser entry point {ep.name}: {e}")
+            continue
+        register_parser(spec)
+
+
+def parser_types() -> list[str]:
+    """Return registered parser type names in detection order."""
+    load_entry_points()
+    return [spec.name for spec in _ordered]
+
+
+def get_spec(parser_type: str) -> ParserSpec:
+    """Return the ParserSpec registered for parser_type."""
+    spec = _registry.get(parser_type)
+    if spec is None:
+        load_entry_points()
+        spec = _registry.get(parser_type)
+    if spec is None:
+        raise ValueError(f"Unknown parser type: {parser_type}")
+    return spec
+
+
+def get_converter(parser_type: str) -> Callable:
+    """Return the converter function for parser_type, importing its module on first use."""
+    return get_spec(parser_type).load()
+
+
+def _match(path: Optional[str], lines: Optional[Iterable[str]]) -> Optional[str]:
+    """Return the first registered parser whose path or header detector matches, None if none does."""
+    if path:
+        path_lower = path.lower()
+        for spec in _ordered:
+            if spec.path_detector is not None and spec.path_detector(path_lower):
+                return spec.name
+    if lines is not None:
+        header_specs = [spec for spec in _ordered if spec.header_detector is not None]
+        for index, line in enumerate(lines):
+            if index >= SNIFF_LINES:
+                break
+            stripped = line.strip()
+            for spec in header_specs:
+                if spec.header_detector(stripped):
+                    return spec.name
+    return None
+
+
+def detect(path: Optional[str] = None, lines: Optional[Iterable[str]] = None) -> str:
+    """Detect the parser type in a single ordered pass, cheapest checks first.
+
+    Path detectors of all parsers run first (in priority order), then the leading
+    lines are scanned once with every header detector. Entry points are only
+    looked up when no registered parser matches, the sniffed lines are then
+    checked again with the plugins added. Falls back to DEFAULT_PARSER.
+    """
+    if _entry_points_loaded:
+        return _match(path, lines) or DEFAULT_PARSER
+    sniffed: list[str] = []
+    if lines is not None:
+        lines = _recorded(lines, sniffed)
+    parser_type = _match(path, lines)
+    if parser_type is None:
+        load_entry_points()
+        parser_type = _match(path, sniffed if lines is not None else None)
+    return parser_type or DEFAULT_PARSER
+
+
+def _recorded(lines: Iterable[str], record: list[str]) -> Iterator[str]:
+    """Yield lines, appending each one to record."""
+    for line in lines:
+        record.append(line)
+        yield line
+
+register_parser('tpm', 'tpm_parser:convert_to_map_tpm',
+                path_detector=lambda path: 'tpm' in path,
+                header_detector=lambda line: line.startswith("TPM2_"),
+                priority=10, filters=True, header_converter='tpm_parser:convert_header_to_map_tpm', typed=True)
+register_parser('javacard-aid', 'jcaid_parser:convert_to_map_aid',
+                path_detector=_is_aid_path,
+                header_detector=_is_aid_header,
+                priority=20, filters=True, header_converter='jcaid_parser:convert_header_to_map_aid')
+register_parser('javacard-performance', 'jcperf_parser:convert_to_map_jcperf',
+                path_detector=lambda path: 'performance' in path,
+                header_detector=lambda line: line.startswith("method name:"),
+                priority=30, filters=True, header_converter='jcperf_parser:convert_header_to_map_jcperf')
+register_parser(DEFAULT_PARSER, 'jcres_parser:convert_to_map', priority=1000, filters=True,
+                header_converter='jcres_parser:convert_header_to_map')
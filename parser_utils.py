@@ -1,42 +1,154 @@
+import fnmatch
 import logging
+import re
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+BASIC_INFO = "Basic information"
 
-def load_file(path: str):
+# Result keys kept regardless of the selected sections
+ALWAYS_SELECTED = ("_type", BASIC_INFO)
+
+# Fields added to TPM records in typed mode (see tpm_parser), defined here so that
+# consumers such as profile_diff do not have to import the parser
+SUCCESS_RATIO = "success ratio"
+THROUGHPUT = "throughput (ops/s)"
+PARSED_IDS = "parsed ids"
+DERIVED_FIELDS = (SUCCESS_RATIO, THROUGHPUT, PARSED_IDS)
+
+# Compressed file suffixes that are decompressed transparently while reading
+COMPRESSION_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst')
+
+
+def compression_suffix(path) -> str:
+    """Return the compression suffix of path ('.gz', ...) or '' for uncompressed files."""
+    suffix = Path(path).suffix.lower()
+    return suffix if suffix in COMPRESSION_SUFFIXES else ''
+
+
+def strip_compression_suffix(path) -> Path:
+    """Return path without its compression suffix, e.g. 'card.csv.gz' -> 'card.csv'."""
+    path = Path(path)
+    return path.with_suffix('') if compression_suffix(path) else path
+
+
+def is_profile_file(path) -> bool:
+    """Check if path is a CSV profile, possibly compressed (e.g. 'card.csv.gz')."""
+    return strip_compression_suffix(path).suffix.lower() == '.csv'
+
+
+def open_text(path: str, encoding=None):
+    """Open path for reading text, decompressing gzip/bz2/xz/zstd files on the fly."""
+    suffix = compression_suffix(path)
+    if suffix == '.gz':
+        import gzip
+        return gzip.open(path, 'rt', encoding=encoding)
+    if suffix == '.bz2':
+        import bz2
+        return bz2.open(path, 'rt', encoding=encoding)
+    if suffix == '.xz':
+        import lzma
+        return lzma.open(path, 'rt', encoding=encoding)
+    if suffix == '.zst':
+        return open_zstd(path, encoding)
+    return open(path, 'r', encoding=encoding)
+
+
+def open_zstd(path, encoding=None):
+    """Open a zstd compressed file (path or binary file object) as text.
+
+    Uses compression.zstd (Python 3.14+) or the optional zstandard package.
+    """
     try:
-        logger.info(f"Loading file: {path}")
-        with open(path, 'r') as file:
-            content = file.read()
+        from compression import zstd
+        return zstd.open(path, 'rt', encoding=encoding)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(f"Reading {path} requires the 'zstandard' package (pip install zstandard)")
+    import io
+    raw = open(path, 'rb') if isinstance(path, (str, Path)) else path
+    return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True), encoding=encoding)
+
+
+# extra= of the INFO log records repeated for every input, throttled while progress is shown (see progress)
+PER_FILE = {"per_file": True}
+
+# Load a profile into groups of lines; content is the file's text when it was already read (see prefetch)
+def load_file(path: str, content: Optional[str] = None):
+    try:
+        logger.info("Loading file: %s", path, extra=PER_FILE)
+        if content is None:
+            with open_text(path) as file:
+                content = file.read()
         return prepare_lines(content.splitlines())
 
     except FileNotFoundError:
-        logger.error(f"File not found: {path}")
+        logger.error(f"File not found: {path}", extra={"input": path})
     except Exception as e:
-        logger.exception(f"An error occurred while reading {path}: {e}")
+        logger.exception(f"An error occurred while reading {path}: {e}", extra={"input": path})
 
 # Prepare lines by splitting them into groups based on empty lines
 def prepare_lines(lines: list[str]) -> list[list[str]]:
-    result = []
+    return list(iter_groups(lines))
+
+# Lazily split lines (e.g. an open file) into groups of stripped lines separated by empty lines
+def iter_groups(lines: Iterable[str]) -> Iterator[list[str]]:
     current = []
     for line in lines:
-        if line.strip() == "":
+        stripped = line.strip()
+        if stripped == "":
             if current:
-                result.append(current)
+                yield current
                 current = []
         else:
-            current.append(line.strip())
+            current.append(stripped)
     if current:
-        result.append(current)
-    return result
+        yield current
+
+# Split a delimited line into fields with surrounding whitespace stripped, for lines whose fields are
+# all used. On the benchmark corpus (benchmarks/bench_tokenizer.py) str.split plus a list comprehension
+# beats a precompiled re.split and the csv module, while a per-line lru cache is faster still because
+# the corpus repeats many lines; whole conversions show no measurable difference, so no cache is kept
+def tokenize(line: str, delimiter: str) -> list[str]:
+    return [field.strip() for field in line.split(delimiter)]
+
+# Shared names: property keys and algorithm, method, operation and section names. Profiles parsed
+# in one run (e.g. many of them held by an aggregate report) then reference one copy of each name
+# instead of a copy per profile and row. Names go through sys.intern, whose table drops a name once
+# no parsed profile refers to it, so the table never outlives the results of a run; data values
+# (support status, configuration values, package names) are not interned
+def intern_name(name: str) -> str:
+    return sys.intern(name)
+
+# Known vocabulary of the parsers, kept interned for the lifetime of the process
+VOCABULARY: set[str] = set()
+
+# Add known vocabulary to the table, so that parsed names share the parser's constants
+def intern_names(names: Iterable[str]) -> None:
+    VOCABULARY.update(intern_name(name) for name in names)
 
 # create an attribute dictionary from name and value
 def create_attribute(name: str, value: str):
     return {
-        "name": name,
+        "name": intern_name(name),
         "value": value
     }
 
+# convert a parsed value to float, None for empty or non-numeric values
+def to_float(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(str(value).replace(',', '.'))
+    except ValueError:
+        return None
+
 def load_exclusions(path: str) -> set[str]:
     """Load exclusion property names from a file, ignoring empty and comment lines (#...)."""
     excluded: set[str] = set()
@@ -55,19 +167,131 @@ def load_exclusions(path: str) -> set[str]:
     return excluded
 
 
-def apply_exclusions(result: dict, excluded: set[str]) -> dict:
-    """Return a new result dict with attributes filtered by excluded property names."""
+class NameMatcher:
+    """Property or section names and patterns, compiled once into a single matcher.
+
+    Used for excluded properties and selected sections. Each pattern is either a
+    plain name (exact match), a glob containing
+    '*', '?' or '[' (e.g. 'ram_*'), or a regular expression prefixed with 're:'
+    (e.g. 're:^(min|max) op$'). Globs also match their own text exactly, as property
+    names may contain these characters (e.g. 'JCSystem.getVersion()[Major.Minor]').
+    Use as `name in matcher`; results are cached per name.
+    """
+
+    GLOB_CHARS = ('*', '?', '[')
+    CACHE_SIZE = 4096
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.patterns = tuple(patterns)
+        self.names = set()
+        alternatives = []
+        for pattern in self.patterns:
+            if pattern.startswith('re:'):
+                alternatives.append(f"(?:{pattern[3:]})\\Z")
+            else:
+                self.names.add(pattern)
+                if any(char in pattern for char in self.GLOB_CHARS):
+                    alternatives.append(fnmatch.translate(pattern))
+        self.regex = re.compile('|'.join(alternatives)) if alternatives else None
+        self._cache: dict[str, bool] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def __contains__(self, name) -> bool:
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        except TypeError:
+            return False
+        matched = name in self.names or (self.regex is not None and self.regex.match(name) is not None)
+        if len(self._cache) < self.CACHE_SIZE:
+            self._cache[name] = matched
+        return matched
+
+
+# Matcher excluding nothing, default of the parsers' `excluded` argument
+NO_EXCLUSIONS = NameMatcher()
+
+
+def labelled_pairs(line: str, delimiter: str, start: int = 0, excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
+    """Parse 'key:;value;key:;value;...' fields from field index start into a dictionary.
+
+    Keys are returned without the colon and interned, fields that are not keys are skipped. The
+    line is split once and only keys and values are stripped; the exclusion matcher
+    is consulted only when it holds patterns.
+    """
+    parts = line.split(delimiter)
+    count = len(parts)
+    filtering = bool(excluded)
+    result = {}
+    i = start
+    while i < count:
+        part = parts[i].strip()
+        if part.endswith(':'):
+            key = part[:-1]
+            if not (filtering and key in excluded):
+                result[intern_name(key)] = parts[i + 1].strip() if i + 1 < count else ''
+            i += 2
+        else:
+            i += 1
+    return result
+
+
+def name_matcher(patterns: Union[NameMatcher, Iterable[str], None]) -> NameMatcher:
+    """Return patterns as a NameMatcher, compiling names/patterns if needed."""
+    if isinstance(patterns, NameMatcher):
+        return patterns
+    return NameMatcher(patterns or ())
+
+
+def apply_exclusions(result: dict, excluded: Union[NameMatcher, Iterable[str]]) -> dict:
+    """Return a new result dict with excluded properties removed at any nesting level.
+
+    Removes {name, value} attributes by name and keys of record dicts (TPM, jcperf
+    and AID records). Used for parsers that do not filter while parsing and for
+    already converted results.
+    """
+    excluded = name_matcher(excluded)
     if not excluded:
         return result
-    filtered: dict = {}
     removed_count = 0
-    for group, attrs in result.items():
-        kept_attrs = []
-        for attr in attrs:
-            if attr.get('name') in excluded:
-                removed_count += 1
-                continue
-            kept_attrs.append(attr)
-        filtered[group] = kept_attrs
-    logger.info(f"Excluded {removed_count} attribute(s) by name")
-    return filtered
\ No newline at end of file
+
+    def prune(value):
+        nonlocal removed_count
+        if isinstance(value, list):
+            kept = []
+            for item in value:
+                if isinstance(item, dict) and 'name' in item and item.get('name') in excluded:
+                    removed_count += 1
+                    continue
+                kept.append(prune(item))
+            return kept
+        if isinstance(value, dict):
+            if 'name' in value and 'value' in value:
+                return value
+            kept = {}
+            for key, item in value.items():
+                if key in excluded:
+                    removed_count += 1
+                    continue
+                kept[key] = prune(item)
+            return kept
+        return value
+
+    # Top-level keys are sections and "_type", not properties
+    filtered = {group: prune(attrs) for group, attrs in result.items()}
+    logger.info(f"Excluded {removed_count} propertie(s)")
+    return filtered
+
+
+def select_sections(result: dict, sections: Union[NameMatcher, Iterable[str]]) -> dict:
+    """Return a new result dict with only the selected sections (names or patterns).
+
+    "_type" and "Basic information" are always kept. Used for parsers that do not
+    skip unselected sections while parsing and for already converted results.
+    """
+    sections = name_matcher(sections)
+    return {key: value for key, value in result.items()
+            if key in ALWAYS_SELECTED or key in sections}
@@ -0,0 +1,193 @@
+"""Performance-regression report across a corpus of jcperf and TPM profiles.
+
+Profiles are streamed one at a time. For every (section, method, data length)
+key the population distribution of `avg op` is accumulated with Welford's
+online mean/variance in log space, alongside a compact array of the observed
+values. Parsed profiles are never held in memory; after the single pass each
+value is compared against the rest of its population (leave-one-out) and
+strong deviations are listed as outliers.
+"""
+import logging
+import math
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import parser_api
+import parser_utils
+from parser_utils import to_float
+from profile_diff import TPM_RESULT_FIELDS, method_key
+
+BASIC_INFO = "Basic information"
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_Z_THRESHOLD = 3.0
+DEFAULT_MIN_RATIO = 2.0
+DEFAULT_MIN_SAMPLES = 5
+
+# Profiles read from folders: CSV inputs (possibly compressed) and JSON/MessagePack outputs, in order of preference
+PROFILE_SUFFIXES = ('.csv', '.json', '.msgpack')
+
+
+class RunningStats:
+    """Welford online mean/variance, with the observed values kept in compact arrays."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.values = array('d')
+        self.profiles = array('I')
+
+    def add(self, value: float, profile_index: int) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.values.append(value)
+        self.profiles.append(profile_index)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def without(self, value: float) -> tuple[float, float]:
+        """Return (mean, sample variance) of the population with one occurrence of value removed."""
+        n = self.count - 1
+        if n < 1:
+            return value, 0.0
+        mean = (self.mean * self.count - value) / n
+        m2 = self.m2 - (value - self.mean) * (value - mean)
+        return mean, max(m2, 0.0) / (n - 1) if n > 1 else 0.0
+
+
+def iter_measurements(profile: dict) -> Iterator[tuple[tuple, float]]:
+    """Yield ((section, method name, data length), avg op) for every measured record of a profile."""
+    profile_type = profile.get("_type")
+    for section, records in profile.items():
+        if section in ("_type", BASIC_INFO) or not isinstance(records, list):
+            continue
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+            if profile_type == "javacard-performance":
+                value = to_float(record.get("operation stats", {}).get("avg op"))
+                name, data_length = method_key(record)
+            elif profile_type == "tpm":
+                value = to_float(record.get("avg op"))
+                data_length = record.get("Data length (bytes)")
+                if data_length is not None:
+                    # Typed records hold it as a number
+                    data_length = str(data_length)
+                name = "; ".join(f"{key}={val}" for key, val in record.items()
+                                 if key not in TPM_RESULT_FIELDS and key != "Data length (bytes)")
+            else:
+                return
+            if value is not None and value > 0:
+                yield (section, name, data_length), value
+
+
+class PerformanceReport:
+    """Accumulates avg op populations over a stream of profiles and lists outliers."""
+
+    def __init__(self):
+        self.stats: dict[tuple, RunningStats] = {}
+        self.profile_names: list[str] = []
+
+    def add_profile(self, name: str, profile: dict) -> None:
+        """Add all measurements of one parsed profile to the populations."""
+        profile_index = len(self.profile_names)
+        self.profile_names.append(name)
+        for key, value in iter_measurements(profile):
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = RunningStats()
+            stats.add(math.log(value), profile_index)
+
+    def outliers(self, z_threshold: float = DEFAULT_Z_THRESHOLD, min_ratio: float = DEFAULT_MIN_RATIO,
+                 min_samples: int = DEFAULT_MIN_SAMPLES) -> list[dict]:
+        """List values deviating from the rest of their population, strongest first.
+
+        A value is an outlier when its population has at least min_samples values,
+        it is at least min_ratio times slower or faster than the geometric mean of
+        the other values, and its leave-one-out z-score (in log space) is at least
+        z_threshold. A population with zero spread only applies the ratio check.
+        """
+        min_log_ratio = math.log(min_ratio)
+        outliers = []
+        for (section, name, data_length), stats in self.stats.items():
+            if stats.count < min_samples:
+                continue
+            for value, profile_index in zip(stats.values, stats.profiles):
+                mean, variance = stats.without(value)
+                log_ratio = value - mean
+                if abs(log_ratio) < min_log_ratio:
+                    continue
+                stddev = math.sqrt(variance)
+                z = log_ratio / stddev if stddev > 0 else math.copysign(math.inf, log_ratio)
+                if abs(z) < z_threshold:
+                    continue
+                outliers.append((abs(log_ratio), {
+                    "profile": self.profile_names[profile_index],
+                    "section": section,
+                    "method name": name,
+                    "data length": data_length,
+                    "avg op": round(math.exp(value), 6),
+                    "population avg op": round(math.exp(mean), 6),
+                    "ratio": round(math.exp(log_ratio), 3),
+                    "z": round(z, 3) if math.isfinite(z) else None,
+                    "samples": stats.count,
+                }))
+        # Sorted on the unrounded ratio: a rounded one may be 0 for values thousands of times faster
+        outliers.sort(key=lambda outlier: outlier[0], reverse=True)
+        return [outlier for _, outlier in outliers]
+
+    def to_dict(self, **kwargs) -> dict:
+        return {
+            "profiles": len(self.profile_names),
+            "methods": len(self.stats),
+            "outliers": self.outliers(**kwargs),
+        }
+
+
+def iter_profile_paths(paths: Iterable[str]) -> Iterator[Path]:
+    """Expand folders into the CSV (possibly compressed), JSON and MessagePack profiles they contain (recursively).
+
+    Each profile found in a folder is yielded once: outputs written next to their
+    input (card.json or card.msgpack beside card.csv or card.csv.gz) are skipped in
+    favour of the CSV, and a MessagePack output in favour of a JSON one. Files given
+    explicitly are always yielded.
+    """
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            # (file, its name without compression suffix)
+            candidates = [(candidate, parser_utils.strip_compression_suffix(candidate))
+                          for candidate in sorted(path.rglob('*'))]
+            candidates = [(candidate, base) for candidate, base in candidates
+                          if (parser_utils.is_profile_file(candidate) or candidate.suffix.lower() in PROFILE_SUFFIXES)
+                          and candidate.is_file()]
+            found = {(base.parent, base.stem, base.suffix.lower()) for _, base in candidates}
+            for candidate, base in candidates:
+                # PROFILE_SUFFIXES lists the preferred representation first
+                preferred = PROFILE_SUFFIXES[:PROFILE_SUFFIXES.index(base.suffix.lower())]
+                if not any((base.parent, base.stem, suffix) in found for suffix in preferred):
+                    yield candidate
+        else:
+            yield path
+
+
+def build_report(paths: Iterable[str], delimiter: str = ';', z_threshold: float = DEFAULT_Z_THRESHOLD,
+                 min_ratio: float = DEFAULT_MIN_RATIO, min_samples: int = DEFAULT_MIN_SAMPLES) -> dict:
+    """Stream profiles from paths (files or folders) and return the outlier report."""
+    report = PerformanceReport()
+    for path in iter_profile_paths(paths):
+        try:
+            profile: Optional[dict] = parser_api.load_result(str(path), delimiter)
+        except Exception as e:
+            # One unreadable or unparsable profile must not abort the whole report
+            logger.warning(f"Skipping {path}: {e}", extra={"input": str(path)})
+            continue
+        if profile is not None:
+            report.add_profile(str(path), profile)
+    return report.to_dict(z_threshold=z_threshold, min_ratio=min_ratio, min_samples=min_samples)
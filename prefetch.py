@@ -0,0 +1,121 @@
+"""Concurrent folder scanning and read-ahead of inputs for network filesystems.
+
+On NFS/SMB mounts listing directories and reading files is dominated by
+round-trip latency rather than CPU. scan_profiles lists the directories of a
+folder tree with os.scandir in a thread pool, and prefetch reads the next
+inputs in background threads while the current one is parsed, so the parse
+loop finds most files already in memory. Both keep the order deterministic:
+files come out in the order of the folder tree, and prefetched inputs in the
+order they were given.
+
+Threads only overlap the waiting on I/O; parsing itself stays in the calling
+thread.
+"""
+import logging
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+import parser_utils
+
+logger = logging.getLogger(__name__)
+
+# Threads listing directories concurrently
+DEFAULT_SCAN_WORKERS = 8
+
+T = TypeVar('T')
+
+
+def list_directory(path: str) -> tuple[list[str], list[str]]:
+    """Return the (profile file names, subdirectory names) of a directory, each sorted.
+
+    Like Path.rglob, symlinked files are listed but symlinked directories are not
+    descended into, and unreadable directories are treated as empty.
+    """
+    files, directories = [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.name)
+                    elif parser_utils.is_profile_file(entry.name) and entry.is_file():
+                        files.append(entry.name)
+                except OSError:
+                    continue
+    except OSError as e:
+        logger.warning(f"Cannot list {path}: {e}")
+    return sorted(files), sorted(directories)
+
+
+def scan_profiles(root: Path, workers: int = DEFAULT_SCAN_WORKERS) -> list[Path]:
+    """Find the CSV profiles (possibly compressed) below root, listing directories concurrently.
+
+    Files are returned depth first, the files of a directory before its
+    subdirectories, by name - the same order on every run.
+    """
+    root = Path(root)
+    listings: dict[str, tuple[list[str], list[str]]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = {executor.submit(list_directory, str(root)): str(root)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                listings[path] = future.result()
+                for name in listings[path][1]:
+                    subdirectory = os.path.join(path, name)
+                    pending[executor.submit(list_directory, subdirectory)] = subdirectory
+
+    files: list[Path] = []
+    stack = [str(root)]
+    while stack:
+        path = stack.pop()
+        names, directories = listings[path]
+        files.extend(Path(path, name) for name in names)
+        stack.extend(os.path.join(path, name) for name in reversed(directories))
+    return files
+
+
+def prefetch(paths: Iterable[str], read: Callable[[str], T], depth: int) -> Iterator[tuple[str, T]]:
+    """Yield (path, read(path)) in the order of paths, with up to depth reads running ahead in threads.
+
+    read must not raise; return a marker such as None for inputs to be read by the caller.
+    Reads still running when the iteration is abandoned are cancelled or awaited.
+    """
+    paths = iter(paths)
+    in_flight: deque = deque()
+    executor = ThreadPoolExecutor(max_workers=max(1, depth))
+    try:
+        for path in paths:
+            in_flight.append((path, executor.submit(read, path)))
+            if len(in_flight) >= depth:
+                break
+        while in_flight:
+            path, future = in_flight.popleft()
+            following = next(paths, None)
+            if following is not None:
+                in_flight.append((following, executor.submit(read, following)))
+            yield path, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def read_ahead(path: str, budget=None) -> Optional[str]:
+    """Read the text of an input that the parse loop would load whole, or return None.
+
+    None is returned for inputs streamed or skipped under budget (a
+    memory_governor.MemoryBudget), see memory_governor.parse_file, and for
+    inputs that cannot be read, whose errors are then reported by the parse loop.
+    """
+    try:
+        if budget is not None:
+            size = os.path.getsize(path)
+            if budget.streams(path, size) or (budget.max_bytes is not None and size > budget.max_bytes):
+                return None
+        with parser_utils.open_text(path) as f:
+            return f.read()
+    except Exception as e:
+        logger.debug("Not prefetching %s: %s", path, e)
+        return None
@@ -0,0 +1,257 @@
+"""Structural diff between two parsed profiles of the same `_type`.
+
+Records are matched by key (algorithm name, method name and data length,
+TPM configuration, package AID) through dictionaries, so a diff runs in
+time linear in the size of both profiles.
+
+Every change is reported as a flat dict:
+    {"section": ..., "key": ..., "kind": ..., "old": ..., "new": ...}
+where kind is one of 'added', 'removed', 'value_changed', 'support_changed',
+'time_changed', 'regression', 'improvement', 'stats_changed' or 'duplicate'.
+A record whose key is already taken by an earlier record of the same profile
+and section cannot be matched; it is reported as 'duplicate' (under "old" or
+"new") instead of being compared.
+"""
+from typing import Optional
+from parser_utils import to_float, DERIVED_FIELDS as TPM_DERIVED_FIELDS
+
+BASIC_INFO = "Basic information"
+
+# Relative change of a timing value that is reported (0.1 = 10 %)
+DEFAULT_THRESHOLD = 0.1
+
+# Groups of the algorithm support profile that hold only plain name/value attributes
+JAVACARD_ATTRIBUTE_GROUPS = [BASIC_INFO, "JCSystem", "CPLC"]
+
+# TPM record fields that are results rather than configuration
+TPM_RESULT_FIELDS = {"avg op", "min op", "max op", "total iterations", "successful", "failed", "error",
+                     *TPM_DERIVED_FIELDS}
+
+
+def create_change(section: str, key, kind: str, old=None, new=None, **extra) -> dict:
+    change = {"section": section, "key": key, "kind": kind, "old": old, "new": new}
+    change.update(extra)
+    return change
+
+
+def compare_timing(section: str, key, old_value, new_value, threshold: float, kind: str = None) -> Optional[dict]:
+    """Compare two timing values and return a change if the relative delta exceeds threshold.
+
+    Without an explicit kind, slower results are reported as 'regression' and faster as 'improvement'.
+    """
+    old_time = to_float(old_value)
+    new_time = to_float(new_value)
+    if old_time is None or new_time is None or old_time == new_time:
+        return None
+    if old_time == 0:
+        ratio = float('inf')
+    else:
+        ratio = new_time / old_time
+        if abs(ratio - 1) <= threshold:
+            return None
+    if kind is None:
+        kind = "regression" if new_time > old_time else "improvement"
+    return create_change(section, key, kind, old_value, new_value,
+                         delta=round(new_time - old_time, 6), ratio=round(ratio, 6))
+
+
+def index_records(section: str, records: list, key, side: str, changes: list) -> dict:
+    """Index records by key(record), first record first.
+
+    Records whose key is already taken are appended to changes as 'duplicate',
+    with the record under side ('old' or 'new').
+    """
+    keyed = {}
+    for record in records:
+        record_key = key(record)
+        if record_key in keyed:
+            changes.append(create_change(section, record_key, "duplicate", **{side: record}))
+        else:
+            keyed[record_key] = record
+    return keyed
+
+
+def diff_keyed(section: str, old: dict, new: dict, compare) -> list[dict]:
+    """Diff two dicts of keyed records; compare(key, old_record, new_record) returns a list of changes."""
+    changes = []
+    for key, old_record in old.items():
+        new_record = new.get(key)
+        if new_record is None:
+            changes.append(create_change(section, key, "removed", old=old_record))
+        else:
+            changes.extend(compare(key, old_record, new_record))
+    for key, new_record in new.items():
+        if key not in old:
+            changes.append(create_change(section, key, "added", new=new_record))
+    return changes
+
+
+def diff_attributes(section: str, old_attrs: list, new_attrs: list) -> list[dict]:
+    """Diff two lists of {name, value} attributes by name."""
+    old = {attr["name"]: attr["value"] for attr in old_attrs if isinstance(attr, dict)}
+    new = {attr["name"]: attr["value"] for attr in new_attrs if isinstance(attr, dict)}
+
+    def compare(key, old_value, new_value):
+        if str(old_value).strip() == str(new_value).strip():
+            return []
+        return [create_change(section, key, "value_changed", old_value, new_value)]
+
+    return diff_keyed(section, old, new, compare)
+
+
+def diff_javacard(old: dict, new: dict, threshold: float) -> list[dict]:
+    """Diff algorithm support profiles: support flips and time_elapsed deltas."""
+    changes = []
+
+    def index(section: str, records: list, side: str) -> dict:
+        values = ({attr["name"]: attr["value"] for attr in record} for record in records if isinstance(record, list))
+        return index_records(section, [record for record in values if "algorithm_name" in record],
+                             lambda record: record["algorithm_name"], side, changes)
+
+    for section in sections_of(old, new):
+        old_records = old.get(section, [])
+        new_records = new.get(section, [])
+        # Name/value attributes may also sit in algorithm groups (e.g. "JavaCard support version")
+        changes.extend(diff_attributes(section, old_records, new_records))
+        if section in JAVACARD_ATTRIBUTE_GROUPS:
+            continue
+
+        def compare(key, old_values, new_values, section=section):
+            if old_values.get("is_supported") != new_values.get("is_supported"):
+                return [create_change(section, key, "support_changed",
+                                      old_values.get("is_supported"), new_values.get("is_supported"))]
+            change = compare_timing(section, key, old_values.get("time_elapsed"),
+                                    new_values.get("time_elapsed"), threshold, kind="time_changed")
+            return [change] if change else []
+
+        changes.extend(diff_keyed(section, index(section, old_records, "old"), index(section, new_records, "new"),
+                                  compare))
+    return changes
+
+
+def method_key(record: dict) -> tuple:
+    """Key of a jcperf method record: (method name, data length)."""
+    data_length = record.get("data length") or record.get("operation info", {}).get("data length")
+    return record.get("method name"), data_length
+
+
+def diff_jcperf(old: dict, new: dict, threshold: float) -> list[dict]:
+    """Diff performance profiles: support flips and operation stats regressions."""
+    changes = diff_attributes(BASIC_INFO, old.get(BASIC_INFO, []), new.get(BASIC_INFO, []))
+
+    for section in sections_of(old, new):
+        if section == BASIC_INFO:
+            continue
+
+        def compare(key, old_record, new_record, section=section):
+            if old_record.get("supported") != new_record.get("supported"):
+                return [create_change(section, key, "support_changed",
+                                      old_record.get("supported"), new_record.get("supported"))]
+            change = compare_timing(section, key, old_record.get("operation stats", {}).get("avg op"),
+                                    new_record.get("operation stats", {}).get("avg op"), threshold)
+            return [change] if change else []
+
+        old_index = index_records(section, old.get(section, []), method_key, "old", changes)
+        new_index = index_records(section, new.get(section, []), method_key, "new", changes)
+        changes.extend(diff_keyed(section, old_index, new_index, compare))
+    return changes
+
+
+def tpm_key(record: dict) -> str:
+    """Key of a TPM record: its configuration parameters, e.g. 'Key parameters=RSA 1024'."""
+    return "; ".join(sorted(f"{name}={value}" for name, value in record.items() if name not in TPM_RESULT_FIELDS))
+
+
+def diff_tpm(old: dict, new: dict, threshold: float) -> list[dict]:
+    """Diff TPM profiles: added/removed operations, avg op regressions and result changes."""
+    changes = diff_attributes(BASIC_INFO, old.get(BASIC_INFO, []), new.get(BASIC_INFO, []))
+
+    for section in sections_of(old, new):
+        if section == BASIC_INFO:
+            continue
+
+        def compare(key, old_record, new_record, section=section):
+            result = []
+            change = compare_timing(section, key, old_record.get("avg op"), new_record.get("avg op"), threshold)
+            if change:
+                result.append(change)
+            for field in ("successful", "failed", "error"):
+                if old_record.get(field) != new_record.get(field):
+                    result.append(create_change(section, key, "stats_changed", old_record.get(field),
+                                                new_record.get(field), field=field))
+            return result
+
+        old_index = index_records(section, old.get(section, []), tpm_key, "old", changes)
+        new_index = index_records(section, new.get(section, []), tpm_key, "new", changes)
+        changes.extend(diff_keyed(section, old_index, new_index, compare))
+    return changes
+
+
+def diff_aid(old: dict, new: dict, threshold: float) -> list[dict]:
+    """Diff AID support profiles: package support flips and package table changes."""
+    changes = diff_attributes(BASIC_INFO, old.get(BASIC_INFO, []), new.get(BASIC_INFO, []))
+
+    section = "Full package AID support"
+
+    def compare_support(key, old_record, new_record):
+        if old_record.get("supported") == new_record.get("supported"):
+            return []
+        return [create_change(section, key, "support_changed", old_record.get("supported"),
+                              new_record.get("supported"))]
+
+    # Keys may have been excluded while parsing (see --exclude-file), the package name is used instead
+    def support_key(record):
+        return record.get("full_package_aid", record.get("package_name_version"))
+
+    changes.extend(diff_keyed(section,
+                              index_records(section, old.get(section, []), support_key, "old", changes),
+                              index_records(section, new.get(section, []), support_key, "new", changes),
+                              compare_support))
+
+    def compare_package(key, old_record, new_record):
+        if old_record == new_record:
+            return []
+        return [create_change("Package AID", key, "value_changed", old_record, new_record)]
+
+    def package_key(record):
+        return record.get("package_aid", record.get("package_name"))
+
+    changes.extend(diff_keyed("Package AID",
+                              index_records("Package AID", old.get("Package AID", []), package_key, "old", changes),
+                              index_records("Package AID", new.get("Package AID", []), package_key, "new", changes),
+                              compare_package))
+    return changes
+
+
+def sections_of(old: dict, new: dict) -> list[str]:
+    """Section names of both profiles in order of appearance, without `_type`."""
+    sections = [key for key in old if key != "_type"]
+    sections.extend(key for key in new if key != "_type" and key not in old)
+    return sections
+
+
+DIFFERS = {
+    "javacard": diff_javacard,
+    "javacard-performance": diff_jcperf,
+    "tpm": diff_tpm,
+    "javacard-aid": diff_aid,
+}
+
+
+def diff_profiles(old: dict, new: dict, threshold: float = DEFAULT_THRESHOLD) -> dict:
+    """Structurally diff two parsed profiles of the same `_type`.
+
+    Returns {"_type": ..., "changes": [...], "summary": {kind: count}}.
+    """
+    profile_type = old.get("_type")
+    if profile_type != new.get("_type"):
+        raise ValueError(f"Cannot diff profiles of different types: {profile_type} vs {new.get('_type')}")
+    differ = DIFFERS.get(profile_type)
+    if differ is None:
+        raise ValueError(f"No diff available for profile type: {profile_type}")
+
+    changes = differ(old, new, threshold)
+    summary: dict[str, int] = {}
+    for change in changes:
+        summary[change["kind"]] = summary.get(change["kind"], 0) + 1
+    return {"_type": profile_type, "changes": changes, "summary": summary}
@@ -0,0 +1,223 @@
+"""Progress reporting with throughput and ETA for long conversion runs.
+
+Progress is an on_file_done callback (see main.process_files) counting the
+converted and failed inputs and their bytes on disk. Totals are registered up
+front with add_inputs, so the ETA is based on the input bytes still to go,
+which tracks large and small files better than a file count. Every interval
+seconds the current state is rendered as a bar on a terminal or as one JSON
+line for machines (see SNAPSHOT_FIELDS). Updates take a lock, so callbacks
+may come from worker threads.
+
+While progress is shown, the INFO lines logged for every input (records
+logged with extra=parser_utils.PER_FILE) are throttled to one per
+LOG_INTERVAL seconds; warnings and errors are never throttled.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_MODES = ('auto', 'bar', 'json', 'none')
+
+# Seconds between renders of a bar and of JSON lines
+BAR_INTERVAL = 0.5
+JSON_INTERVAL = 5.0
+
+# Seconds between throttled per-file log lines
+LOG_INTERVAL = 10.0
+
+BAR_WIDTH = 30
+
+# Threads stat'ing inputs to size them, a round trip each on network filesystems
+SIZE_WORKERS = 8
+
+SNAPSHOT_FIELDS = ("files_done", "files_total", "bytes_done", "bytes_total", "errors", "elapsed_s",
+                   "files_per_s", "mb_per_s", "eta_s")
+
+
+def file_sizes(paths: Iterable, workers: int = SIZE_WORKERS) -> dict[str, int]:
+    """Return {path: size in bytes} of the given files (0 for files that cannot be stat'ed)."""
+    def size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    paths = [str(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return dict(zip(paths, executor.map(size, paths)))
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Format seconds as H:MM:SS, or '?' when unknown."""
+    if seconds is None:
+        return "?"
+    minutes, secs = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
+class BarRenderer:
+    """Redraws a one-line progress bar in place on a terminal."""
+
+    def __init__(self, stream: TextIO = sys.stderr):
+        self.stream = stream
+
+    def __call__(self, snapshot: dict, final: bool = False) -> None:
+        done, total = snapshot["files_done"], snapshot["files_total"]
+        if total:
+            ratio = (snapshot["bytes_done"] / snapshot["bytes_total"] if snapshot["bytes_total"]
+                     else done / total)
+            filled = int(BAR_WIDTH * min(1.0, ratio))
+            bar = f"[{'#' * filled}{'-' * (BAR_WIDTH - filled)}] {done}/{total}"
+        else:
+            bar = f"{done} files"
+        line = (f"{bar}  {snapshot['files_per_s']:.1f} files/s  {snapshot['mb_per_s']:.2f} MB/s  "
+                f"ETA {format_duration(snapshot['eta_s'])}  errors {snapshot['errors']}")
+        # Carriage return and clear to the end of line, so a shorter line leaves no leftovers
+        self.stream.write(f"\r\x1b[K{line}" + ("\n" if final else ""))
+        self.stream.flush()
+
+
+class JsonLinesRenderer:
+    """Writes every update as one JSON object per line ("event": "progress", and "done" at the end)."""
+
+    def __init__(self, stream: TextIO = sys.stderr):
+        self.stream = stream
+
+    def __call__(self, snapshot: dict, final: bool = False) -> None:
+        self.stream.write(json.dumps({"event": "done" if final else "progress", **snapshot}) + "\n")
+        self.stream.flush()
+
+
+class Progress:
+    """Counts finished inputs and renders throughput and ETA at most every interval seconds.
+
+    Args:
+        render: Called as render(snapshot, final) with a dict of SNAPSHOT_FIELDS
+        interval: Minimum seconds between renders (the final render is always made)
+        clock: Monotonic time source, in seconds
+    """
+
+    def __init__(self, render: Callable[[dict, bool], None], interval: float = BAR_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.render = render
+        self.interval = interval
+        self.clock = clock
+        self.sizes: dict[str, int] = {}
+        self.files_total: Optional[int] = None
+        self.bytes_total = 0
+        self.files_done = 0
+        self.bytes_done = 0
+        self.errors = 0
+        self.started = clock()
+        self.last_render: Optional[float] = None
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def add_inputs(self, sizes: dict[str, int]) -> None:
+        """Register inputs to be processed, as {path: size in bytes} (see file_sizes)."""
+        with self.lock:
+            if self.files_total is None:
+                # Rates and ETA count from the first registered inputs, not from the folder scan
+                self.started = self.clock()
+            self.sizes.update(sizes)
+            self.files_total = (self.files_total or 0) + len(sizes)
+            self.bytes_total += sum(sizes.values())
+
+    def on_file_done(self, file_path: str, out_path: Optional[Path], error: Optional[str]) -> None:
+        """on_file_done callback of process_files, see main.process_files."""
+        self.advance(self.sizes.get(str(file_path), 0), error is not None)
+
+    def advance(self, nbytes: int = 0, error: bool = False) -> None:
+        """Count one finished input of nbytes, rendering if the interval has passed."""
+        with self.lock:
+            self.files_done += 1
+            self.bytes_done += nbytes
+            if error:
+                self.errors += 1
+            now = self.clock()
+            if self.last_render is None or now - self.last_render >= self.interval:
+                self.last_render = now
+                self.render(self._snapshot(now), False)
+
+    def snapshot(self) -> dict:
+        """Current counts, rates and ETA (None while unknown)."""
+        with self.lock:
+            return self._snapshot(self.clock())
+
+    def _snapshot(self, now: float) -> dict:
+        elapsed = max(now - self.started, 1e-9)
+        eta = None
+        if self.bytes_total and self.bytes_done:
+            eta = (self.bytes_total - self.bytes_done) * elapsed / self.bytes_done
+        elif self.files_total and self.files_done:
+            eta = (self.files_total - self.files_done) * elapsed / self.files_done
+        return {
+            "files_done": self.files_done,
+            "files_total": self.files_total,
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total if self.files_total is not None else None,
+            "errors": self.errors,
+            "elapsed_s": round(elapsed, 3),
+            "files_per_s": round(self.files_done / elapsed, 3),
+            "mb_per_s": round(self.bytes_done / elapsed / (1024 * 1024), 3),
+            "eta_s": round(max(eta, 0.0), 1) if eta is not None else None,
+        }
+
+    def close(self) -> None:
+        """Render the final state once."""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.render(self._snapshot(self.clock()), True)
+
+
+class LogThrottle(logging.Filter):
+    """Lets through at most one per-file INFO record per interval seconds; other records always pass."""
+
+    def __init__(self, interval: float = LOG_INTERVAL, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.interval = interval
+        self.clock = clock
+        self.last: Optional[float] = None
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not getattr(record, "per_file", False):
+            return True
+        now = self.clock()
+        if self.last is not None and now - self.last < self.interval:
+            self.suppressed += 1
+            return False
+        self.last = now
+        return True
+
+
+def throttle_per_file_logs(interval: float = LOG_INTERVAL) -> LogThrottle:
+    """Install a LogThrottle on the handlers of the root logger and return it."""
+    throttle = LogThrottle(interval)
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(throttle)
+    return throttle
+
+
+def make_progress(mode: str, stream: TextIO = sys.stderr, interval: Optional[float] = None) -> Optional[Progress]:
+    """Create the Progress of a PROGRESS_MODES mode: 'auto' shows a bar on a terminal and nothing otherwise."""
+    if mode == 'auto':
+        mode = 'bar' if stream.isatty() else 'none'
+    if mode == 'bar':
+        return Progress(BarRenderer(stream), interval if interval is not None else BAR_INTERVAL)
+    if mode == 'json':
+        return Progress(JsonLinesRenderer(stream), interval if interval is not None else JSON_INTERVAL)
+    if mode == 'none':
+        return None
+    raise ValueError(f"Unknown progress mode: {mode} (expected one of {PROGRESS_MODES})")
@@ -0,0 +1,108 @@
+"""Quiet logging for bulk conversions: errors as JSON lines and one summary per run.
+
+In quiet mode the root logger is raised to WARNING, so the INFO records logged
+for every input are rejected by the level check before their (lazily
+%-formatted) message is built or a record is created. Warnings and errors are
+written as one JSON object per line with the input they concern (records
+logged with extra={"input": path}), and instead of per-file lines a
+RunSummary, an on_file_done callback, counts the outcomes of all inputs and
+logs them once at the end of the run.
+
+Example error line:
+    {"time": "2026-10-19T12:00:00", "level": "ERROR", "logger": "main",
+     "message": "Failed to parse a.csv: ...", "input": "a.csv", "exception": "Traceback ..."}
+"""
+import json
+import logging
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Optional
+
+# Logs the run summary, kept at INFO in quiet mode
+logger = logging.getLogger(__name__)
+
+# Failed inputs listed by name in the summary
+SUMMARY_FAILED_FILES = 20
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects with structured fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "input", None) is not None:
+            entry["input"] = str(record.input)
+        if getattr(record, "summary", None) is not None:
+            entry["summary"] = record.summary
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def error_kind(error: str) -> str:
+    """Kind of an on_file_done error message: the text before its first ':' ('parse error', 'skipped', ...)."""
+    return error.split(":", 1)[0].strip()
+
+
+class RunSummary:
+    """Aggregates the outcome of every input of a run into one summary record.
+
+    Use on_file_done as (or chain it into) the on_file_done callback of process_files,
+    process_folder or archive_io.process_archive, and call log() at the end of the run.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self.converted = 0
+        self.errors: Counter = Counter()
+        self.failed_files: list[str] = []
+
+    def on_file_done(self, file_path: str, out_path: Optional[Path], error: Optional[str]) -> None:
+        if error is None:
+            self.converted += 1
+            return
+        self.errors[error_kind(error)] += 1
+        if len(self.failed_files) < SUMMARY_FAILED_FILES:
+            self.failed_files.append(str(file_path))
+
+    def to_dict(self) -> dict:
+        elapsed = self.clock() - self.started
+        failed = sum(self.errors.values())
+        return {
+            "files": self.converted + failed,
+            "converted": self.converted,
+            "failed": failed,
+            "errors": dict(self.errors.most_common()),
+            "failed_files": self.failed_files,
+            "elapsed_s": round(elapsed, 3),
+            "files_per_s": round((self.converted + failed) / elapsed, 3) if elapsed > 0 else None,
+        }
+
+    def log(self) -> dict:
+        """Log the summary as one INFO record (with the summary dict as its "summary" field) and return it."""
+        summary = self.to_dict()
+        errors = ", ".join(f"{kind} {count}" for kind, count in summary["errors"].items())
+        logger.info("Converted %d of %d file(s) in %.1f s%s", summary["converted"], summary["files"],
+                    summary["elapsed_s"], f"; failed: {errors}" if errors else "", extra={"summary": summary})
+        return summary
+
+
+def configure_quiet(level: int = logging.WARNING) -> None:
+    """Switch the root logger to quiet mode: only records at level or above, as JSON lines.
+
+    The run summary logger stays at INFO.
+    """
+    root = logging.getLogger()
+    root.setLevel(level)
+    if not root.handlers:
+        root.addHandler(logging.StreamHandler())
+    for handler in root.handlers:
+        handler.setFormatter(JsonFormatter())
+    logger.setLevel(logging.INFO)
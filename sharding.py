@@ -0,0 +1,139 @@
+"""Deterministic sharding of folder runs across several machines.
+
+Each input is assigned to a shard by a stable hash of its path relative to the
+source folder, so every node running `--shard i/N` over the same folder gets a
+disjoint subset without any coordination. Each shard writes a completion
+manifest into the output folder; `--merge-shards` combines them afterwards.
+"""
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+from output_writer import OutputWriter
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_DIR = "_shards"
+MERGED_MANIFEST = "merged.json"
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse a shard specification 'i/N' (0-based index i) into (i, N)."""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected 'i/N' such as '0/4'")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}', index must be in 0..{count - 1}")
+    return index, count
+
+
+def shard_of(rel_path: str, count: int) -> int:
+    """Return the shard of a relative path, stable across machines and Python runs."""
+    digest = hashlib.sha1(rel_path.replace('\\', '/').encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+
+def select_shard(files: Iterable[Path], source_base: Path, index: int, count: int) -> list[Path]:
+    """Return the files belonging to shard index out of count."""
+    return [f for f in files if shard_of(f.relative_to(source_base).as_posix(), count) == index]
+
+
+def manifest_path(output_dir: Path, index: int, count: int) -> Path:
+    return output_dir / MANIFEST_DIR / f"shard-{index}-of-{count}.json"
+
+
+class ShardRun:
+    """Collects per-file results of one shard and writes its completion manifest."""
+
+    def __init__(self, index: int, count: int, source_base: Path, output_dir: Path):
+        self.index = index
+        self.count = count
+        self.source_base = source_base
+        self.output_dir = output_dir
+        self.completed: list[dict] = []
+        self.failed: list[dict] = []
+        self.input_bytes = 0
+        self.started = time.time()
+
+    def on_file_done(self, file_path: str, out_path: Optional[Path], error: Optional[str]) -> None:
+        """process_files callback recording the outcome of one input."""
+        rel_input = Path(file_path).relative_to(self.source_base).as_posix()
+        if out_path is None:
+            self.failed.append({"input": rel_input, "error": error})
+            return
+        try:
+            self.input_bytes += Path(file_path).stat().st_size
+        except OSError:
+            pass
+        self.completed.append({"input": rel_input, "output": out_path.relative_to(self.output_dir).as_posix()})
+
+    def metrics(self) -> dict:
+        return {
+            "files": len(self.completed) + len(self.failed),
+            "converted": len(self.completed),
+            "failed": len(self.failed),
+            "input_bytes": self.input_bytes,
+            "seconds": round(time.time() - self.started, 3),
+        }
+
+    def write_manifest(self) -> Path:
+        """Write the completion manifest of this shard into the output folder."""
+        path = manifest_path(self.output_dir, self.index, self.count)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "shard": self.index,
+            "shards": self.count,
+            "source": str(self.source_base),
+            "metrics": self.metrics(),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+        with OutputWriter('full') as writer:
+            writer.write_json(path, manifest)
+        logger.info(f"Shard manifest saved to {path}")
+        return path
+
+
+def merge_manifests(output_dir: str) -> dict:
+    """Combine all shard manifests of an output folder into one merged manifest.
+
+    The merged manifest lists missing shards, all completed and failed inputs and
+    summed metrics (seconds is the slowest shard, i.e. the wall-clock time). It is
+    written next to the shard manifests and returned.
+    """
+    manifest_dir = Path(output_dir) / MANIFEST_DIR
+    manifests = []
+    for path in sorted(manifest_dir.glob('shard-*-of-*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            manifests.append(json.load(f))
+    if not manifests:
+        raise ValueError(f"No shard manifests found in {manifest_dir}")
+
+    counts = {manifest["shards"] for manifest in manifests}
+    if len(counts) != 1:
+        raise ValueError(f"Shard manifests in {manifest_dir} disagree on the shard count: {sorted(counts)}")
+    count = counts.pop()
+
+    present = {manifest["shard"] for manifest in manifests}
+    metrics = {"files": 0, "converted": 0, "failed": 0, "input_bytes": 0, "seconds": 0.0}
+    completed, failed = [], []
+    for manifest in sorted(manifests, key=lambda m: m["shard"]):
+        for key in ("files", "converted", "failed", "input_bytes"):
+            metrics[key] += manifest["metrics"][key]
+        metrics["seconds"] = max(metrics["seconds"], manifest["metrics"]["seconds"])
+        completed.extend(manifest["completed"])
+        failed.extend(manifest["failed"])
+
+    merged = {
+        "shards": count,
+        "missing_shards": [index for index in range(count) if index not in present],
+        "metrics": metrics,
+        "completed": completed,
+        "failed": failed,
+    }
+    with OutputWriter('full') as writer:
+        writer.write_json(manifest_dir / MERGED_MANIFEST, merged)
+    return merged
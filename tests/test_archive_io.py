@@ -0,0 +1,118 @@
+"""
+Unit tests for archive processing (archive_io.py)
+"""
+import gzip
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from archive_io import archive_suffix, is_archive, safe_member_path, iter_members, process_archive
+
+TPM_CONTENT = b"""Manufacturer; INTC
+
+TPM2_Create
+
+Key parameters:;RSA 1024
+operation stats (ms/op):;avg op:;100.00;min op:;90.00;max op:;110.00
+"""
+
+ALG_CONTENT = b"""Card name; Test
+JavaCard support version;3.0.1;
+"""
+
+
+class TestArchiveHelpers(unittest.TestCase):
+    """Tests for archive name and member helpers."""
+
+    def test_archive_suffix(self):
+        self.assertEqual(archive_suffix("results.zip"), ".zip")
+        self.assertEqual(archive_suffix("results.TAR.GZ"), ".tar.gz")
+        self.assertEqual(archive_suffix("results.tgz"), ".tgz")
+        self.assertEqual(archive_suffix("results.csv.gz"), "")
+
+    def test_safe_member_path(self):
+        self.assertEqual(str(safe_member_path("a/b.csv")), "a/b.csv")
+        self.assertIsNone(safe_member_path("../evil.csv"))
+        self.assertIsNone(safe_member_path("/etc/evil.csv"))
+
+
+class TestProcessArchive(unittest.TestCase):
+    """Tests for process_archive with ZIP and TAR inputs."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.zip_path = os.path.join(self.temp_dir, "results.zip")
+        with zipfile.ZipFile(self.zip_path, "w") as archive:
+            archive.writestr("results/tpm/INTC.csv", TPM_CONTENT)
+            archive.writestr("results/cards/card.csv.gz", gzip.compress(ALG_CONTENT))
+            archive.writestr("results/readme.txt", b"not a profile")
+        self.tar_path = os.path.join(self.temp_dir, "results.tar.gz")
+        with tarfile.open(self.tar_path, "w:gz") as archive:
+            for name, content in (("results/tpm/INTC.csv", TPM_CONTENT), ("results/cards/card.csv", ALG_CONTENT)):
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                archive.addfile(info, io.BytesIO(content))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_is_archive(self):
+        self.assertTrue(is_archive(self.zip_path))
+        self.assertTrue(is_archive(self.tar_path))
+        self.assertFalse(is_archive(self.temp_dir))
+
+    def test_iter_members_filters_profiles(self):
+        names = [name for name, _, _ in iter_members(self.zip_path)]
+        self.assertEqual(names, ["results/tpm/INTC.csv", "results/cards/card.csv.gz"])
+
+    def test_zip_to_mirrored_tree(self):
+        out_dir = Path(self.temp_dir) / "out"
+        outputs = process_archive(self.zip_path, str(out_dir))
+
+        self.assertEqual(outputs, [out_dir / "results" / "tpm" / "INTC.json",
+                                   out_dir / "results" / "cards" / "card.json"])
+        with open(outputs[0]) as f:
+            self.assertEqual(json.load(f)["_type"], "tpm")
+        with open(outputs[1]) as f:
+            self.assertEqual(json.load(f)["_type"], "javacard")
+
+    def test_tar_to_zip_archive(self):
+        out_zip = os.path.join(self.temp_dir, "parsed.zip")
+        outputs = process_archive(self.tar_path, out_zip)
+
+        self.assertEqual(len(outputs), 2)
+        with zipfile.ZipFile(out_zip) as archive:
+            self.assertEqual(sorted(archive.namelist()), ["results/cards/card.json", "results/tpm/INTC.json"])
+            self.assertEqual(json.loads(archive.read("results/tpm/INTC.json"))["_type"], "tpm")
+
+    def test_failure_discards_output_archive(self):
+        out_zip = os.path.join(self.temp_dir, "parsed.zip")
+        with open(out_zip, "wb") as f:
+            f.write(b"previous run")
+
+        def fail_on_second(name, out_path, error):
+            if name.endswith("card.csv"):
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            process_archive(self.tar_path, out_zip, on_file_done=fail_on_second)
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ["parsed.zip", "results.tar.gz", "results.zip"])
+        with open(out_zip, "rb") as f:
+            self.assertEqual(f.read(), b"previous run")
+
+    def test_parallel_matches_sequential(self):
+        sequential = process_archive(self.zip_path, os.path.join(self.temp_dir, "seq"))
+        parallel = process_archive(self.zip_path, os.path.join(self.temp_dir, "par"), jobs=2)
+        self.assertEqual([p.read_bytes() for p in sequential], [p.read_bytes() for p in parallel])
+
+    def test_not_an_archive(self):
+        self.assertEqual(process_archive(os.path.join(self.temp_dir, "missing.zip")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Unit tests for schema-versioned MessagePack outputs (binary_format.py)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+import binary_format
+import parser_api
+from archive_io import process_archive
+from binary_format import SCHEMA_KEY, SCHEMA_VERSION, SchemaError
+from main import process_folder
+
+SAMPLE = {
+    "_type": "javacard-performance",
+    "Basic information": [{"name": "Card name", "value": "Test čard"}],
+    "MESSAGE DIGEST": {"ALG_SHA MessageDigest_doFinal()": {
+        "baseline measurements (ms)": [7.0, 8.5, -1.25],
+        "operation info": {"data length": 256, "total iterations": 70000, "big": 2 ** 40, "negative": -300000},
+        "flags": [True, False, None],
+        "long": "x" * 300, "longer": "y" * 70000,
+        "wide": {str(i): i for i in range(20)},
+        "many": list(range(-40, 40)),
+    }},
+}
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """Tests for encoding and loading binary outputs, with and without the msgpack package."""
+
+    def test_round_trip(self):
+        data = binary_format.dumps(SAMPLE)
+        self.assertEqual(binary_format.loads(data), SAMPLE)
+        self.assertEqual(binary_format.unpackb(data)[SCHEMA_KEY], SCHEMA_VERSION)
+
+    def test_fallback_round_trip(self):
+        with mock.patch.object(binary_format, "msgpack", None):
+            data = binary_format.dumps(SAMPLE)
+            self.assertEqual(binary_format.loads(data), SAMPLE)
+            # Schema version is the first key of the map
+            self.assertEqual(data[1:9], b"\xa7_schema")
+
+    @unittest.skipIf(binary_format.msgpack is None, "msgpack is not installed")
+    def test_fallback_matches_msgpack(self):
+        expected = binary_format.dumps(SAMPLE)
+        with mock.patch.object(binary_format, "msgpack", None):
+            self.assertEqual(binary_format.dumps(SAMPLE), expected)
+
+    def test_schema_checks(self):
+        with mock.patch.object(binary_format, "msgpack", None):
+            with self.assertRaises(SchemaError):
+                binary_format.loads(binary_format.packb({SCHEMA_KEY: SCHEMA_VERSION + 1, "_type": "tpm"}))
+            with self.assertRaises(SchemaError):
+                binary_format.loads(binary_format.packb({"_type": "tpm"}))
+            with self.assertRaises(SchemaError):
+                binary_format.loads(binary_format.dumps(SAMPLE)[:-3])
+            with self.assertRaises(TypeError):
+                binary_format.packb({"value": object()})
+
+
+class TestBinaryOutputs(unittest.TestCase):
+    """Tests for writing MessagePack outputs in folder and archive mode."""
+
+    def setUp(self):
+        self.source_dir = tempfile.mkdtemp()
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir, ignore_errors=True)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_process_folder_mirrors_msgpack_outputs(self):
+        tpm_dir = os.path.join(self.source_dir, "tpm")
+        os.makedirs(tpm_dir)
+        with open(os.path.join(tpm_dir, "test_tpm.csv"), "w") as f:
+            f.write("Manufacturer; INTC\n")
+
+        outputs = process_folder(self.source_dir, self.output_dir, output_format="msgpack")
+
+        expected = Path(self.output_dir) / "tpm" / "test_tpm.msgpack"
+        self.assertEqual(outputs, [expected])
+        result = parser_api.load_result(str(expected))
+        self.assertEqual(result["_type"], "tpm")
+        self.assertEqual(result["Basic information"], [{"name": "Manufacturer", "value": "INTC"}])
+
+    def test_process_archive_msgpack_outputs(self):
+        archive = os.path.join(self.source_dir, "results.zip")
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("cards/card.csv", "Card name; Test\n")
+
+        process_archive(archive, self.output_dir, output_format="msgpack")
+
+        result = binary_format.load(Path(self.output_dir) / "cards" / "card.msgpack")
+        self.assertEqual(result, parser_api.parse_text("Card name; Test\n", name="cards/card.csv"))
+
+
+if __name__ == '__main__':
+    unittest.main()
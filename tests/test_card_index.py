@@ -0,0 +1,113 @@
+"""
+Unit tests for the ATR/CPLC card index (card_index.py)
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import parser_api
+from card_index import CardIndex, card_entry, normalize_atr, build_index
+from main import process_files
+
+
+def profile(atr, name=None, fabricator=None):
+    basic = [{"name": "Card ATR", "value": atr}]
+    if name:
+        basic.append({"name": "Card name", "value": name})
+    result = {"_type": "javacard", "Basic information": basic}
+    if fabricator:
+        result["CPLC"] = [{"name": "CPLC.ICFabricator", "value": fabricator}]
+    return result
+
+
+class TestCardEntry(unittest.TestCase):
+    """Tests for extracting index entries."""
+
+    def test_normalize_atr(self):
+        self.assertEqual(normalize_atr(" 3B:F9 18-00"), "3bf91800")
+
+    def test_entry(self):
+        entry = card_entry("a.csv", profile("3b f9 18 00", " NXP J2D081", "4790"), "a.json")
+        self.assertEqual(entry["atr"], "3bf91800")
+        self.assertEqual(entry["name"], "NXP J2D081")
+        self.assertEqual(entry["cplc"], {"ICFabricator": "4790"})
+        self.assertEqual(entry["output"], "a.json")
+
+    def test_atr_in_attribute_name(self):
+        data = os.path.join(os.path.dirname(__file__), "test-data", "gemplus")
+        path = os.path.join(data, "Gemplus_GXPR3_3B 7B 94 00 00 80 65 B0 83 01 01 74 83 00 90 00_(provided_by_PetrS).csv")
+        entry = card_entry(path, parser_api.load_result(path, ';'))
+        self.assertEqual(entry["atr"], "3b7b9400008065b08301017483009000")
+        self.assertEqual(entry["atr_raw"], "3B:7B:94:00:00:80:65:B0:83:01:01:74:83:00:90:00")
+        self.assertEqual(len(build_index([data])), len(os.listdir(data)))
+
+    def test_no_atr(self):
+        self.assertIsNone(card_entry("a.csv", {"Basic information": [{"name": "Card name", "value": "X"}]}))
+
+
+class TestCardIndex(unittest.TestCase):
+    """Tests for ATR and CPLC lookups."""
+
+    def setUp(self):
+        self.index = CardIndex()
+        self.index.add("a.csv", profile("3B F9 18 00 00 81", "A", "4790"))
+        self.index.add("b.csv", profile("3B F9 13 00 00 81", "B", "4790"))
+        self.index.add("c.csv", profile("3B 88 80 01 00 00", "C", "4090"))
+
+    def sources(self, entries):
+        return sorted(entry["source"] for entry in entries)
+
+    def test_exact(self):
+        self.assertEqual(self.sources(self.index.lookup_atr("3b:f9:18:00:00:81")), ["a.csv"])
+        self.assertEqual(self.index.lookup_atr("3bf91800"), [])
+
+    def test_prefix(self):
+        self.assertEqual(self.sources(self.index.lookup_atr("3B F9*")), ["a.csv", "b.csv"])
+        self.assertEqual(self.sources(self.index.lookup_atr("*")), ["a.csv", "b.csv", "c.csv"])
+
+    def test_masked(self):
+        self.assertEqual(self.sources(self.index.lookup_atr("3b f9 1x 00 00 81")), ["a.csv", "b.csv"])
+        self.assertEqual(self.sources(self.index.lookup_atr("3b .. 80*")), ["c.csv"])
+        self.assertEqual(self.index.lookup_atr("3b f9 1x 00"), [])
+
+    def test_cplc(self):
+        self.assertEqual(self.sources(self.index.lookup_cplc("CPLC.ICFabricator", "4790")), ["a.csv", "b.csv"])
+        self.assertEqual(self.sources(self.index.lookup_cplc("icfabricator", "4090")), ["c.csv"])
+
+    def test_replace_source(self):
+        self.index.add("a.csv", profile("3B 00", "A2"))
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.lookup_atr("3bf9180000 81"), [])
+        self.assertEqual(self.index.lookup_cplc("ICFabricator", "4790")[0]["source"], "b.csv")
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cards.json")
+            self.index.save(path)
+            loaded = CardIndex.load(path)
+            self.assertEqual(len(loaded), 3)
+            self.assertEqual(self.sources(loaded.lookup_atr("3bf9*")), ["a.csv", "b.csv"])
+            self.assertEqual(len(CardIndex.load(os.path.join(tmp, "missing.json"))), 0)
+
+    def test_build_index(self):
+        data = os.path.join(os.path.dirname(__file__), "test-data", "nxp")
+        index = build_index([data])
+        self.assertGreater(len(index), 0)
+        matches = index.lookup_atr("3b f9 18 00 00 81 31 fe 45 4a 32 44 30 38 31 5f 50 56 b6")
+        self.assertTrue(matches)
+        self.assertTrue(all(entry["cplc"]["ICFabricator"] == "4790" for entry in matches))
+
+    def test_build_index_outputs_next_to_inputs(self):
+        data = os.path.join(os.path.dirname(__file__), "test-data", "nxp")
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in sorted(os.listdir(data))[:2]:
+                shutil.copy(os.path.join(data, name), tmp)
+            process_files([os.path.join(tmp, name) for name in os.listdir(tmp)])
+            self.assertEqual(len(os.listdir(tmp)), 4)
+            index = build_index([tmp])
+            self.assertEqual(len(index), 2)
+            self.assertTrue(all(entry["source"].endswith(".csv") for entry in index.lookup_atr("*")))
+
+
+if __name__ == '__main__':
+    unittest.main()
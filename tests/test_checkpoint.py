@@ -0,0 +1,82 @@
+"""
+Unit tests for resumable folder runs (checkpoint.py)
+"""
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from main import process_folder
+from checkpoint import Checkpoint, JOURNAL_NAME
+
+
+class TestResumableFolder(unittest.TestCase):
+    """Tests for checkpointing and resuming process_folder runs."""
+
+    def setUp(self):
+        self.source_dir = Path(tempfile.mkdtemp()).resolve()
+        self.output_dir = Path(tempfile.mkdtemp()).resolve()
+        for i in range(4):
+            (self.source_dir / f"card{i}.csv").write_text(f"Card name; Test {i}\n")
+        # Invalid UTF-8 makes this input fail to load
+        (self.source_dir / "broken.csv").write_bytes(b"\xff\xfe\xfa")
+        self.journal = self.output_dir / f"{JOURNAL_NAME}.jsonl"
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir, ignore_errors=True)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def journal_entries(self):
+        with open(self.journal) as f:
+            return {entry["input"]: entry for entry in map(json.loads, f)}
+
+    def test_journal_written(self):
+        process_folder(str(self.source_dir), str(self.output_dir))
+        entries = self.journal_entries()
+        self.assertEqual(len(entries), 5)
+        self.assertEqual(entries["card0.csv"]["status"], "done")
+        self.assertEqual(entries["card0.csv"]["output"], "card0.json")
+        self.assertEqual(entries["broken.csv"]["status"], "failed")
+        self.assertEqual(entries["broken.csv"]["attempts"], 1)
+
+    def test_resume_skips_completed_and_redoes_changed(self):
+        process_folder(str(self.source_dir), str(self.output_dir))
+        (self.output_dir / "card1.json").unlink()
+        (self.source_dir / "card2.csv").write_text("Card name; Changed card\n")
+
+        outputs = process_folder(str(self.source_dir), str(self.output_dir), resume=True)
+
+        self.assertEqual(sorted(p.name for p in outputs), ["card1.json", "card2.json"])
+        self.assertIn("Changed card", (self.output_dir / "card2.json").read_text())
+
+    def test_retry_budget(self):
+        process_folder(str(self.source_dir), str(self.output_dir))
+        for expected_attempts in (2, 3):
+            process_folder(str(self.source_dir), str(self.output_dir), resume=True, max_retries=2)
+            self.assertEqual(self.journal_entries()["broken.csv"]["attempts"], expected_attempts)
+        # Budget used up: the failed input is no longer retried
+        process_folder(str(self.source_dir), str(self.output_dir), resume=True, max_retries=2)
+        self.assertEqual(self.journal_entries()["broken.csv"]["attempts"], 3)
+
+    def test_without_resume_starts_from_scratch(self):
+        process_folder(str(self.source_dir), str(self.output_dir))
+        outputs = process_folder(str(self.source_dir), str(self.output_dir))
+        self.assertEqual(len(outputs), 4)
+
+    def test_periodic_flush_and_torn_line(self):
+        journal = Checkpoint(self.output_dir, self.source_dir, every=2)
+        journal.on_file_done(str(self.source_dir / "card0.csv"), self.output_dir / "card0.json", None)
+        self.assertFalse(self.journal.exists())
+        journal.on_file_done(str(self.source_dir / "card1.csv"), None, "parse error")
+        self.assertEqual(len(self.journal_entries()), 2)
+
+        # A run killed mid-write leaves a partial last line behind
+        with open(self.journal, "a") as f:
+            f.write('{"input": "card2.cs')
+        resumed = Checkpoint(self.output_dir, self.source_dir)
+        resumed.load()
+        self.assertEqual(sorted(resumed.entries), ["card0.csv", "card1.csv"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Unit tests for deduplication of identical profiles (dedup.py)
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from main import process_folder
+from dedup import content_hash, semantic_hash, REPORT_NAME
+from checkpoint import JOURNAL_NAME
+
+
+PROFILE = """Tested and provided by; {contributor};
+Execution date/time; {date}
+Card ATR; 3b f9 18 00
+Card name; Test card
+
+javacard.security.Signature
+ALG_RSA_SHA_PKCS1;yes
+"""
+
+
+class TestHashes(unittest.TestCase):
+    """Tests for content and semantic hashes."""
+
+    def test_content_hash(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = Path(tmp, "a.csv"), Path(tmp, "b.csv")
+            first.write_bytes(b"Card name; A\n")
+            second.write_bytes(b"Card name; A\n")
+            self.assertEqual(content_hash(first), content_hash(second))
+            second.write_bytes(b"Card name; B\n")
+            self.assertNotEqual(content_hash(first), content_hash(second))
+
+    def test_semantic_hash_ignores_volatile_attributes(self):
+        def result(date, contributor, name="Test"):
+            return {"_type": "javacard", "Basic information": [
+                {"name": "Execution date/time", "value": date},
+                {"name": "Tested and provided by", "value": contributor},
+                {"name": "Card name", "value": name},
+            ]}
+        self.assertEqual(semantic_hash(result("2019", "A")), semantic_hash(result("2020", "B")))
+        self.assertNotEqual(semantic_hash(result("2019", "A")), semantic_hash(result("2019", "A", "Other")))
+
+
+class TestDedupFolder(unittest.TestCase):
+    """Tests for deduplicated process_folder runs."""
+
+    def setUp(self):
+        self.source_dir = Path(tempfile.mkdtemp()).resolve()
+        self.output_dir = Path(tempfile.mkdtemp()).resolve()
+        original = PROFILE.format(contributor="PetrS", date="2019/02/13")
+        (self.source_dir / "a").mkdir()
+        (self.source_dir / "a" / "card.csv").write_text(original)
+        (self.source_dir / "card_copy.csv").write_text(original)
+        (self.source_dir / "resubmitted.csv").write_text(PROFILE.format(contributor="Toporin", date="2021/05/01"))
+        (self.source_dir / "other.csv").write_text("Card ATR; 3b 00\nCard name; Other\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir, ignore_errors=True)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_identical_inputs_parsed_once(self):
+        outputs = process_folder(str(self.source_dir), str(self.output_dir), dedup=True)
+        self.assertEqual(len(outputs), 4)
+        first, copy = self.output_dir / "a" / "card.json", self.output_dir / "card_copy.json"
+        with open(copy) as f:
+            self.assertEqual(json.load(f)["_type"], "javacard")
+        if os.stat(first).st_nlink == 2:
+            self.assertTrue(os.path.samefile(first, copy))
+
+        with open(self.output_dir / f"{JOURNAL_NAME}.jsonl") as f:
+            entries = {entry["input"]: entry for entry in map(json.loads, f)}
+        self.assertEqual(entries["card_copy.csv"]["status"], "done")
+
+    def test_report(self):
+        process_folder(str(self.source_dir), str(self.output_dir), dedup=True)
+        with open(self.output_dir / REPORT_NAME) as f:
+            report = json.load(f)
+        self.assertEqual(report["content_duplicates"], 1)
+        self.assertEqual(report["content_groups"][0]["parsed"], "a/card.csv")
+        self.assertEqual(report["content_groups"][0]["duplicates"], ["card_copy.csv"])
+        self.assertEqual([group["inputs"] for group in report["semantic_groups"]],
+                         [["a/card.csv", "card_copy.csv", "resubmitted.csv"]])
+
+    def test_without_dedup(self):
+        process_folder(str(self.source_dir), str(self.output_dir))
+        self.assertFalse((self.output_dir / REPORT_NAME).exists())
+        self.assertEqual(os.stat(self.output_dir / "card_copy.json").st_nlink, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Unit tests for per-file CPU/memory profiling (file_profiler.py)
+"""
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from main import process_files
+from file_profiler import FileProfiler
+
+
+class TestFileProfiler(unittest.TestCase):
+    """Tests for profiling individual files."""
+
+    def test_measure_cpu(self):
+        profiler = FileProfiler(cpu=True)
+        with profiler.measure("a.csv") as sample:
+            sorted(range(10000), key=lambda value: -value)
+            sample["parser_type"] = "tpm"
+        self.assertEqual(len(profiler.samples), 1)
+        sample = profiler.samples[0]
+        self.assertEqual(sample["parser_type"], "tpm")
+        self.assertGreaterEqual(sample["seconds"], 0)
+        self.assertTrue(any("<lambda>" in function["function"] for function in sample["hot_functions"]))
+        self.assertNotIn("peak_bytes", sample)
+
+    def test_measure_memory_ranking(self):
+        profiler = FileProfiler(cpu=False, mem=True)
+        with profiler.measure("small.csv"):
+            data = [0] * 10
+        with profiler.measure("large.csv"):
+            data = [0] * 1000000
+        del data
+        profiler.close()
+        self.assertFalse(tracemalloc.is_tracing())
+        report = profiler.report()
+        self.assertEqual(report["files"], 2)
+        self.assertEqual([sample["input"] for sample in report["memory"]], ["large.csv", "small.csv"])
+        self.assertGreater(report["memory"][0]["peak_bytes"], 7000000)
+
+    def test_process_files_profiles_each_file(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            paths = []
+            for i in range(2):
+                path = os.path.join(temp_dir, f"tpm{i}.csv")
+                with open(path, "w") as f:
+                    f.write("Manufacturer; INTC\n\nTPM2_Create\n\nKey parameters:;RSA 1024\n")
+                paths.append(path)
+            paths.append(os.path.join(temp_dir, "missing.csv"))
+
+            profiler = FileProfiler(cpu=True, mem=True)
+            process_files(paths, profiler=profiler)
+            profiler.close()
+
+            report = profiler.report()
+            self.assertEqual(report["files"], 3)
+            types = {sample["input"]: sample["parser_type"] for sample in report["slowest"]}
+            self.assertEqual(types[paths[0]], "tpm")
+            self.assertIsNone(types[paths[2]])
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
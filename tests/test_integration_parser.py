@@ -63,6 +63,20 @@ class TestIntegrationParser(unittest.TestCase):
                 self.assertIn('name', item)
                 self.assertIn('value', item)
 
+    def test_header_only_matches_full_output(self):
+        import json
+        full = process_files([str(p) for p in self.inputs], delimiter=';')
+        full_results = [json.loads(out.read_text(encoding='utf-8')) for out in full]
+        headers = process_files([str(p) for p in self.inputs], delimiter=';', header_only=True)
+
+        self.assertEqual(len(headers), len(self.inputs))
+        for out, full_result in zip(headers, full_results):
+            header = json.loads(out.read_text(encoding='utf-8'))
+            self.assertIn('Basic information', header)
+            # Header sections are identical to the ones of the full conversion
+            for key, value in header.items():
+                self.assertEqual(value, full_result[key])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -9,8 +9,10 @@ from jcaid_parser import (
     parse_package_aid_table,
     parse_full_package_aid_table,
     convert_to_map_aid,
+    convert_header_to_map_aid,
     BASIC_INFO
 )
+from parser_utils import NameMatcher
 
 DEFAULT_DELIMITER = ";"
 
@@ -257,6 +259,63 @@ class TestJcaidParserConvertToMap(unittest.TestCase):
         self.assertEqual(result["_type"], "javacard-aid")
         self.assertIn(BASIC_INFO, result)
 
+    def test_convert_header_to_map_aid(self):
+        """Test that header-only conversion stops at the KEY INFO section."""
+        groups = [
+            ["jcAIDScan version; 0.1.1", "Card ATR; 3BFC180000"],
+            ["***** Card info;"],
+            ["NO CPLC"],
+            ["***** KEY INFO"],
+            ["VER;255 ID;1 TYPE;DES3 LEN;16"],
+        ]
+        consumed = []
+
+        def lazy_groups():
+            for group in groups:
+                consumed.append(group)
+                yield group
+
+        result = convert_header_to_map_aid(lazy_groups(), DEFAULT_DELIMITER)
+
+        self.assertEqual(list(result), ["_type", BASIC_INFO])
+        self.assertEqual([a["name"] for a in result[BASIC_INFO]], ["jcAIDScan version", "Card ATR", "NO CPLC"])
+        self.assertEqual(len(consumed), 4)
+
+    def test_convert_to_map_aid_sections(self):
+        """Test that unselected sections are neither collected nor parsed."""
+        groups = [
+            ["Card name; Test Card"],
+            ["***** KEY INFO"],
+            ["VER;255 ID;1 TYPE;DES3 LEN;16"],
+            ["PACKAGE AID; MAJOR VERSION; MINOR VERSION; PACKAGE NAME; INTRODUCING JC API VERSION;"],
+            ["a0000000620001; 1; 0; java.lang; 2.1"],
+            ["FULL PACKAGE AID; IS SUPPORTED?; PACKAGE NAME WITH VERSION;"],
+            ["000107A0000000620001; yes; java.lang v1.0;"]
+        ]
+
+        result = convert_to_map_aid(groups, DEFAULT_DELIMITER, sections=NameMatcher(["Full package AID support"]))
+
+        self.assertEqual(list(result), ["_type", BASIC_INFO, "Full package AID support"])
+        self.assertEqual(len(result["Full package AID support"]), 1)
+
+    def test_convert_to_map_aid_exclusions(self):
+        """Test that excluded properties are skipped while parsing."""
+        groups = [
+            ["Card ATR; 3BFC180000", "Card name; Test Card"],
+            ["***** KEY INFO"],
+            ["VER;255 ID;1 TYPE;DES3 LEN;16"],
+            ["Factory keys"],
+            ["PACKAGE AID; MAJOR VERSION; MINOR VERSION; PACKAGE NAME; INTRODUCING JC API VERSION;"],
+            ["a0000000620001; 1; 0; java.lang; 2.1"]
+        ]
+
+        result = convert_to_map_aid(groups, DEFAULT_DELIMITER,
+                                    excluded=NameMatcher(["Card ATR", "notes", "LEN", "*_version"]))
+
+        self.assertEqual([a["name"] for a in result[BASIC_INFO]], ["Card name"])
+        self.assertEqual(result["Key info"], {"keys": [{"VER": "255", "ID": "1", "TYPE": "DES3"}]})
+        self.assertEqual(result["Package AID"], [{"package_aid": "a0000000620001", "package_name": "java.lang"}])
+
 
 if __name__ == '__main__':
     unittest.main()
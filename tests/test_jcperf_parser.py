@@ -16,6 +16,7 @@ from jcperf_parser import (
     convert_to_map_jcperf,
     BASIC_INFO
 )
+from parser_utils import NameMatcher
 
 DEFAULT_DELIMITER = ";"
 
@@ -266,6 +267,75 @@ class TestJcperfParserConvertToMap(unittest.TestCase):
         self.assertIn("MESSAGE DIGEST - ALG_SHA", result)
         self.assertEqual(result["MESSAGE DIGEST - ALG_SHA"][0]["data length"], "16")
 
+    def test_convert_to_map_jcperf_lazy_groups(self):
+        """Test that a lazy iterator of groups (streaming) gives the same result as a list."""
+        groups = [
+            ["Card name; Test Card"],
+            ["JCSystem.getVersion()[Major.Minor];3.0;"],
+            ["MESSAGE DIGEST"],
+            ["method name:; ALG_SHA MessageDigest_doFinal()", "operation stats (ms/op):;avg op:;4,16;min op:;4,00;max op:;4,40"],
+            ["MESSAGE DIGEST - END"],
+            ["RANDOM GENERATOR"],
+            ["method name:; ALG_PSEUDO_RANDOM RandomData_generateData()", "NO_SUCH_ALGORITHM"]
+        ]
+
+        self.assertEqual(convert_to_map_jcperf(iter(groups), DEFAULT_DELIMITER),
+                         convert_to_map_jcperf(groups, DEFAULT_DELIMITER))
+        self.assertEqual(convert_to_map_jcperf(iter(groups[:1]), DEFAULT_DELIMITER),
+                         convert_to_map_jcperf(groups[:1], DEFAULT_DELIMITER))
+
+    def test_convert_to_map_jcperf_sections(self):
+        """Test that lines of unselected sections are skipped."""
+        groups = [
+            ["Card name; Test Card"],
+            ["JCSystem.getVersion()[Major.Minor];3.0;"],
+            ["MESSAGE DIGEST"],
+            ["method name:; ALG_SHA MessageDigest_doFinal()", "operation stats (ms/op):;avg op:;4,16;min op:;4,00;max op:;4,40"],
+            ["KEY PAIR"],
+            ["method name:; ALG_RSA LENGTH_RSA_1024 KeyPair_genKeyPair()", "operation stats (ms/op):;avg op:;900;min op:;800;max op:;1000"],
+            ["CIPHER - TYPE_DES ALG_DES_CBC_NOPAD - variable data - BEGIN"],
+            ["method name:; ALG_DES_CBC_NOPAD Cipher_doFinal();16;", "NO_SUCH_ALGORITHM"],
+            ["CIPHER - TYPE_DES ALG_DES_CBC_NOPAD - variable data - END"]
+        ]
+
+        result = convert_to_map_jcperf(groups, DEFAULT_DELIMITER, sections=NameMatcher(["KEY PAIR"]))
+
+        self.assertEqual(list(result), ["_type", BASIC_INFO, "KEY PAIR"])
+        self.assertEqual(len(result["KEY PAIR"]), 1)
+        self.assertEqual(result["KEY PAIR"][0]["method name"], "ALG_RSA LENGTH_RSA_1024 KeyPair_genKeyPair()")
+
+        result = convert_to_map_jcperf(groups, DEFAULT_DELIMITER, sections=NameMatcher(["CIPHER*"]))
+        self.assertEqual(list(result), ["_type", BASIC_INFO, "CIPHER - TYPE_DES ALG_DES_CBC_NOPAD"])
+        self.assertFalse(result["CIPHER - TYPE_DES ALG_DES_CBC_NOPAD"][0]["supported"])
+
+    def test_convert_to_map_jcperf_exclusions(self):
+        """Test that excluded properties are skipped while parsing."""
+        groups = [
+            ["Card name; Test Card", "Card ATR; 3b"],
+            ["JCSystem.getVersion()[Major.Minor];3.0;"],
+            ["MESSAGE DIGEST"],
+            [
+                "method name:; ALG_SHA MessageDigest_doFinal()",
+                "measurement config:;appletPrepareINS;34",
+                "baseline measurements (ms):;103,00;",
+                "baseline stats (ms):;avg:;105,00;min:;101,00;max:;115,00",
+                "operation raw measurements (ms):;4,00;4,40;",
+                "operation stats (ms/op):;avg op:;4,16;min op:;4,00;max op:;4,40",
+                "operation info:;data length;16;total iterations;25;total invocations;25"
+            ]
+        ]
+        excluded = NameMatcher(["Card ATR", "*measurements", "measurement config", "min*", "total *"])
+
+        result = convert_to_map_jcperf(groups, DEFAULT_DELIMITER, excluded=excluded)
+
+        self.assertEqual([a["name"] for a in result[BASIC_INFO]], ["Card name"])
+        method = result["MESSAGE DIGEST"][0]
+        self.assertEqual(list(method), ["method name", "baseline stats", "operation stats", "operation info", "supported"])
+        self.assertEqual(method["baseline stats"], {"avg": "105.00", "max": "115.00"})
+        self.assertEqual(method["operation stats"], {"avg op": "4.16", "max op": "4.40"})
+        self.assertEqual(method["operation info"], {"data length": "16"})
+        self.assertTrue(method["supported"])
+
 
 if __name__ == '__main__':
     unittest.main()
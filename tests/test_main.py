@@ -5,6 +5,9 @@ import unittest
 import tempfile
 import os
 import json
+import subprocess
+import sys
+import zipfile
 from pathlib import Path
 from main import detect_parser_type, process_files, process_folder
 
@@ -123,6 +126,22 @@ FULL PACKAGE AID; IS SUPPORTED?; PACKAGE NAME WITH VERSION;
         self.assertEqual(result["_type"], "javacard-aid")
         self.assertIn("Package AID", result)
 
+    def test_process_files_indexes_results(self):
+        """Test that on_result feeds converted profiles into a card index."""
+        from card_index import CardIndex
+        csv_path = os.path.join(self.temp_dir, "aid", "test_AIDSUPPORT.csv")
+        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        with open(csv_path, "w") as f:
+            f.write("jcAIDScan version; 0.1.1\nCard ATR; 3B FC 18 00\nCard name; Test Card\n")
+
+        index = CardIndex()
+        outputs = process_files([csv_path], on_result=index.on_result)
+
+        matches = index.lookup_atr("3bfc*")
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]["name"], "Test Card")
+        self.assertEqual(matches[0]["output"], str(outputs[0]))
+
     def test_process_nonexistent_file(self):
         """Test handling of non-existent file."""
         outputs = process_files(["/nonexistent/path/file.csv"])
@@ -145,6 +164,23 @@ FULL PACKAGE AID; IS SUPPORTED?; PACKAGE NAME WITH VERSION;
 
         self.assertEqual(len(outputs), 2)
 
+    def test_batch_durability_reports_committed_outputs(self):
+        """Test that with batched commits inputs are reported done only once their output is in place."""
+        paths = []
+        for i in range(3):
+            paths.append(os.path.join(self.temp_dir, f"card{i}.csv"))
+            with open(paths[-1], "w") as f:
+                f.write("Card name; Test\n")
+        done = []
+
+        def on_file_done(file_path, out_path, error):
+            self.assertIsNone(error)
+            self.assertTrue(out_path.exists())
+            done.append(file_path)
+
+        process_files(paths, durability="batch", on_file_done=on_file_done)
+        self.assertEqual(done, paths)
+
 
 class TestProcessFolder(unittest.TestCase):
     """Tests for the process_folder function."""
@@ -236,6 +272,40 @@ class TestProcessFolder(unittest.TestCase):
         self.assertEqual(len(outputs), 1)
         self.assertTrue(outputs[0].name.endswith(".json"))
 
+    def test_process_folder_compressed_inputs(self):
+        """Test that compressed CSV files are discovered and named after the inner file."""
+        import gzip
+        os.makedirs(os.path.join(self.source_dir, "results"))
+        with gzip.open(os.path.join(self.source_dir, "results", "card.csv.gz"), "wt") as f:
+            f.write("Card name; Test\n")
+        with gzip.open(os.path.join(self.source_dir, "results", "notes.txt.gz"), "wt") as f:
+            f.write("Not a CSV\n")
+
+        outputs = process_folder(self.source_dir, self.output_dir)
+
+        self.assertEqual(outputs, [Path(self.output_dir).resolve() / "results" / "card.json"])
+        with open(outputs[0]) as f:
+            self.assertEqual(json.load(f)["_type"], "javacard")
+
+
+class TestArchiveOptions(unittest.TestCase):
+    """Tests that options archive mode does not support are rejected."""
+
+    def test_unsupported_options_rejected(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = os.path.join(tmp, "profiles.zip")
+            with zipfile.ZipFile(archive, "w") as zf:
+                zf.writestr("card.csv", "Card name; Test\n")
+            main_py = str(Path(__file__).resolve().parents[1] / "main.py")
+            for options in (["--index", os.path.join(tmp, "cards.json")], ["--dedup"], ["--profile-cpu"],
+                            ["--prefetch", "4"]):
+                proc = subprocess.run([sys.executable, main_py, "--archive", archive,
+                                       "--output", os.path.join(tmp, "out")] + options,
+                                      capture_output=True, text=True)
+                self.assertEqual(proc.returncode, 2)
+                self.assertIn(f"{options[0]} cannot be used with archive inputs", proc.stderr)
+            self.assertFalse(os.path.exists(os.path.join(tmp, "out")))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,177 @@
+"""
+Unit tests for the memory governor (memory_governor.py)
+"""
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from main import process_files
+from archive_io import process_archive
+from memory_governor import MemoryBudget, BudgetExceeded, parse_size, parse_file, limit_jobs
+from progress import Progress
+
+TEST_DATA = Path(__file__).parent / "test-data"
+
+TPM_CONTENT = """Manufacturer; INTC
+Firmware version; 11.0.0.1202
+
+TPM2_Create
+
+Key parameters:;RSA 1024
+operation stats (ms/op):;avg op:;100.00;min op:;90.00;max op:;110.00
+"""
+
+
+class TestBudget(unittest.TestCase):
+    """Tests for budget checks."""
+
+    def test_parse_size(self):
+        self.assertEqual(parse_size("512"), 512)
+        self.assertEqual(parse_size("64M"), 64 * 1024 * 1024)
+        self.assertEqual(parse_size("1.5k"), 1536)
+        self.assertEqual(parse_size("2GiB"), 2 * 1024 ** 3)
+        with self.assertRaises(ValueError):
+            parse_size("lots")
+
+    def test_limit(self):
+        lines = ["a" * 10] * 5
+        self.assertEqual(list(MemoryBudget().limit(lines, "x")), lines)
+        self.assertEqual(list(MemoryBudget(max_bytes=50, max_lines=5).limit(lines, "x")), lines)
+        with self.assertRaisesRegex(BudgetExceeded, "49 bytes"):
+            list(MemoryBudget(max_bytes=49).limit(lines, "x"))
+        with self.assertRaisesRegex(BudgetExceeded, "4 lines"):
+            list(MemoryBudget(max_lines=4).limit(lines, "x"))
+
+    def test_check_content(self):
+        MemoryBudget(max_bytes=10, max_lines=2).check_content(b"a\nb\n", "x")
+        with self.assertRaises(BudgetExceeded):
+            MemoryBudget(max_lines=2).check_content(b"a\nb\nc\n", "x")
+        with self.assertRaises(BudgetExceeded):
+            MemoryBudget(max_bytes=3).check_content(b"a\nb\n", "x")
+
+    def test_limit_jobs(self):
+        budget = MemoryBudget(stream_bytes=1024 * 1024)
+        per_worker = budget.worker_bytes()
+        self.assertEqual(limit_jobs(8, budget, available=100 * per_worker), 8)
+        self.assertEqual(limit_jobs(8, budget, available=4 * per_worker), 3)
+        self.assertEqual(limit_jobs(8, budget, available=0), 1)
+        self.assertEqual(limit_jobs(1, budget, available=0), 1)
+
+
+class TestParseFile(unittest.TestCase):
+    """Tests for loading and streaming files within budget."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_streaming_matches_loading(self):
+        for path in sorted(TEST_DATA.rglob("*.csv"))[:5]:
+            loaded = parse_file(str(path), MemoryBudget())
+            streamed = parse_file(str(path), MemoryBudget(stream_bytes=0))
+            self.assertEqual(loaded, streamed)
+
+    def test_compressed_input(self):
+        path = os.path.join(self.temp_dir, "tpm.csv.gz")
+        with gzip.open(path, "wt") as f:
+            f.write(TPM_CONTENT)
+        parser_type, result = parse_file(path, MemoryBudget())
+        self.assertEqual(parser_type, "tpm")
+        self.assertIn("TPM2_Create", result)
+        with self.assertRaises(BudgetExceeded):
+            parse_file(path, MemoryBudget(max_lines=3))
+
+    def test_byte_budget_boundary_same_when_loaded_or_streamed(self):
+        # A compressed input is streamed and its on-disk size is below the cap, so only the read budget applies
+        content = TPM_CONTENT + "\nTPM2_Sign\n" * 50
+        path = os.path.join(self.temp_dir, "tpm.csv.gz")
+        with gzip.open(path, "wt") as f:
+            f.write(content)
+        size = len(content)
+        for load in (lambda budget: parse_file(path, budget),
+                     lambda budget: parse_file(path, budget, content=content)):
+            self.assertEqual(load(MemoryBudget(max_bytes=size))[0], "tpm")
+            with self.assertRaisesRegex(BudgetExceeded, f"{size - 1} bytes"):
+                load(MemoryBudget(max_bytes=size - 1))
+
+    def test_process_files_skips_with_reason(self):
+        small = os.path.join(self.temp_dir, "small_tpm.csv")
+        large = os.path.join(self.temp_dir, "large_tpm.csv")
+        with open(small, "w") as f:
+            f.write(TPM_CONTENT)
+        with open(large, "w") as f:
+            f.write(TPM_CONTENT + "Key parameters:;RSA 2048\n" * 100)
+
+        done = {}
+        outputs = process_files([small, large], budget=MemoryBudget(max_bytes=1024),
+                                on_file_done=lambda file, out, error: done.update({file: error}))
+        self.assertEqual(len(outputs), 1)
+        self.assertIsNone(done[small])
+        self.assertTrue(done[large].startswith("skipped:"))
+
+
+class TestArchiveBudget(unittest.TestCase):
+    """Tests for budgets in archive mode."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_oversized_members_skipped(self):
+        archive_path = os.path.join(self.temp_dir, "cards.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("small_tpm.csv", TPM_CONTENT)
+            archive.writestr("large_tpm.csv", TPM_CONTENT * 50)
+        done = {}
+        progress = Progress(lambda snapshot, final: None)
+        outputs = process_archive(archive_path, os.path.join(self.temp_dir, "out"),
+                                  budget=MemoryBudget(max_bytes=1024), progress=progress,
+                                  on_file_done=lambda name, out, error: done.update({name: error}))
+        self.assertEqual([path.name for path in outputs], ["small_tpm.json"])
+        self.assertIsNone(done["small_tpm.csv"])
+        self.assertTrue(done["large_tpm.csv"].startswith("skipped:"))
+        snapshot = progress.snapshot()
+        self.assertEqual((snapshot["files_done"], snapshot["files_total"], snapshot["errors"]), (2, 2, 1))
+
+    def test_streamed_members_match_loaded(self):
+        members = [("results/tpm.csv", TPM_CONTENT.encode()),
+                   ("results/tpm2.csv.gz", gzip.compress(TPM_CONTENT.encode())),
+                   ("results/card.csv", sorted((TEST_DATA / "nxp").glob("*.csv"))[0].read_bytes())]
+        zip_path = os.path.join(self.temp_dir, "cards.zip")
+        with zipfile.ZipFile(zip_path, "w") as archive:
+            for name, content in members:
+                archive.writestr(name, content)
+        tar_path = os.path.join(self.temp_dir, "cards.tar.gz")
+        with tarfile.open(tar_path, "w:gz") as archive:
+            for name, content in members:
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                archive.addfile(info, io.BytesIO(content))
+
+        for path in (zip_path, tar_path):
+            loaded = process_archive(path, os.path.join(self.temp_dir, "loaded"), budget=MemoryBudget())
+            for jobs in (1, 2):
+                out = os.path.join(self.temp_dir, f"streamed{jobs}")
+                streamed = process_archive(path, out, jobs=jobs, budget=MemoryBudget(stream_bytes=0))
+                self.assertEqual([p.read_bytes() for p in streamed], [p.read_bytes() for p in loaded])
+                shutil.rmtree(out)
+
+        # The line budget applies while streaming
+        done = {}
+        process_archive(zip_path, os.path.join(self.temp_dir, "limited"), budget=MemoryBudget(0, max_lines=3),
+                        on_file_done=lambda name, out, error: done.update({name: error}))
+        self.assertTrue(all(error.startswith("skipped:") for error in done.values()))
+        self.assertEqual(len(done), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Unit tests for the atomic output writer (output_writer.py)
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+from output_writer import OutputWriter, DURABILITY_LEVELS
+
+
+class TestOutputWriter(unittest.TestCase):
+    """Tests for writing outputs at every durability level."""
+
+    def setUp(self):
+        self.tmpdir_obj = tempfile.TemporaryDirectory()
+        self.tmpdir = Path(self.tmpdir_obj.name)
+
+    def tearDown(self):
+        self.tmpdir_obj.cleanup()
+
+    def test_all_levels_write_json(self):
+        for durability in DURABILITY_LEVELS:
+            path = self.tmpdir / f"{durability}.json"
+            with OutputWriter(durability) as writer:
+                self.assertEqual(writer.write_json(path, {"_type": "tpm", "name": "č"}), path)
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(json.load(f), {"_type": "tpm", "name": "č"})
+            # No temp files are left behind
+            self.assertFalse([name for name in os.listdir(self.tmpdir) if name.endswith('.tmp')])
+
+    def test_unknown_level(self):
+        with self.assertRaises(ValueError):
+            OutputWriter("paranoid")
+
+    def test_atomic_replaces_existing_output(self):
+        path = self.tmpdir / "out.json"
+        path.write_text("old")
+        with OutputWriter("atomic") as writer:
+            writer.write_bytes(path, b"new")
+        self.assertEqual(path.read_bytes(), b"new")
+
+    def test_serialization_error_keeps_previous_output(self):
+        path = self.tmpdir / "out.json"
+        path.write_text('{"valid": true}')
+        with OutputWriter("atomic") as writer:
+            with self.assertRaises(TypeError):
+                writer.write_json(path, {"bad": object()})
+        self.assertEqual(path.read_text(), '{"valid": true}')
+
+    def test_batch_commits_on_batch_size_and_close(self):
+        writer = OutputWriter("batch", batch_size=2)
+        first, second, third = (self.tmpdir / f"{i}.json" for i in range(3))
+        with mock.patch("os.fsync") as fsync:
+            writer.write_bytes(first, b"1")
+            self.assertFalse(first.exists())
+            writer.write_bytes(second, b"2")
+            self.assertTrue(first.exists() and second.exists())
+            writer.write_bytes(third, b"3")
+            self.assertFalse(third.exists())
+            writer.close()
+            self.assertEqual(third.read_bytes(), b"3")
+        # One fsync per file plus one per directory and batch
+        self.assertEqual(fsync.call_count, 5)
+
+    def test_batch_reports_commit_after_rename(self):
+        committed = []
+
+        def on_commit(path):
+            self.assertEqual(path.read_bytes(), b"1")
+            committed.append(path)
+
+        path = self.tmpdir / "out.json"
+        with mock.patch("os.fsync"):
+            writer = OutputWriter("batch", batch_size=2)
+            writer.write_bytes(path, b"1", on_commit)
+            self.assertEqual(committed, [])
+            writer.close()
+        self.assertEqual(committed, [path])
+
+    def test_batch_fsync_error_closes_all_files(self):
+        writer = OutputWriter("batch", batch_size=10)
+        committed = []
+        for i in range(3):
+            writer.write_bytes(self.tmpdir / f"{i}.json", b"x", committed.append)
+        close = os.close
+        with mock.patch("os.fsync", side_effect=OSError("I/O error")), \
+                mock.patch("os.close", side_effect=close) as closed:
+            with self.assertRaises(OSError):
+                writer.flush()
+        self.assertEqual(closed.call_count, 3)
+        # Nothing of the failed batch is committed or left behind
+        self.assertEqual(os.listdir(self.tmpdir), [])
+        self.assertEqual(committed, [])
+
+    def test_full_fsyncs_every_file(self):
+        with mock.patch("os.fsync") as fsync:
+            with OutputWriter("full") as writer:
+                writer.write_bytes(self.tmpdir / "a.json", b"a")
+                writer.write_bytes(self.tmpdir / "b.json", b"b")
+        self.assertEqual(fsync.call_count, 4)
+
+    def test_atomic_does_not_fsync(self):
+        with mock.patch("os.fsync") as fsync:
+            with OutputWriter("atomic") as writer:
+                writer.write_bytes(self.tmpdir / "a.json", b"a")
+        fsync.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
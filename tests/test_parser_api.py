@@ -0,0 +1,138 @@
+"""
+Unit tests for the in-memory library API (parser_api.py)
+"""
+import io
+import unittest
+from parser_api import (
+    sniff_parser_type,
+    convert_groups,
+    parse_text,
+    parse_bytes,
+    parse_stream,
+    parse_many,
+    parse_header_lines,
+)
+
+TPM_CONTENT = """Manufacturer; INTC
+Firmware version; 11.0.0.1202
+
+TPM2_Create
+
+Key parameters:;RSA 1024
+operation stats (ms/op):;avg op:;100.00;min op:;90.00;max op:;110.00
+operation info:;total iterations:;100;successful:;100;failed:;0;error:;None
+"""
+
+AID_CONTENT = """jcAIDScan version; 0.1.1
+Card ATR; 3BFC1800
+
+PACKAGE AID; MAJOR VERSION; MINOR VERSION; PACKAGE NAME; INTRODUCING JC API VERSION;
+a0000000620001; 1; 0; java.lang; 2.1
+"""
+
+ALG_CONTENT = """Card name; Test Card
+JavaCard support version;3.0.1;
+
+javacardx.crypto.Cipher
+ALG_DES_CBC_NOPAD;yes;0.101000
+"""
+
+
+class TestSniffParserType(unittest.TestCase):
+    """Tests for content-based parser detection."""
+
+    def test_sniff_tpm(self):
+        self.assertEqual(sniff_parser_type(TPM_CONTENT.splitlines()), "tpm")
+
+    def test_sniff_aid(self):
+        self.assertEqual(sniff_parser_type(AID_CONTENT.splitlines()), "javacard-aid")
+
+    def test_sniff_performance(self):
+        lines = ["Card name; X", "MESSAGE DIGEST", "method name:; ALG_SHA MessageDigest_doFinal()"]
+        self.assertEqual(sniff_parser_type(lines), "javacard-performance")
+
+    def test_sniff_default(self):
+        self.assertEqual(sniff_parser_type(ALG_CONTENT.splitlines()), "javacard-algsupport")
+
+
+class TestParseInMemory(unittest.TestCase):
+    """Tests for parse_text/parse_bytes/parse_stream/parse_many."""
+
+    def test_parse_text_autodetect(self):
+        result = parse_text(TPM_CONTENT)
+        self.assertEqual(result["_type"], "tpm")
+        self.assertEqual(result["TPM2_Create"][0]["avg op"], "100.00")
+
+    def test_parse_text_explicit_type(self):
+        result = parse_text(ALG_CONTENT, parser_type="javacard-algsupport")
+        self.assertEqual(result["_type"], "javacard")
+        self.assertIn("javacardx.crypto.Cipher", result)
+
+    def test_parse_text_name_hint(self):
+        result = parse_text(ALG_CONTENT, name="profiles/tpm/device.csv")
+        self.assertEqual(result["_type"], "tpm")
+
+    def test_parse_text_unknown_type(self):
+        with self.assertRaises(ValueError):
+            parse_text(ALG_CONTENT, parser_type="unknown")
+
+    def test_parse_text_exclusions(self):
+        result = parse_text(AID_CONTENT, excluded_properties={"Card ATR"})
+        names = [attr["name"] for attr in result["Basic information"]]
+        self.assertNotIn("Card ATR", names)
+
+    def test_parse_text_sections(self):
+        result = parse_text(AID_CONTENT, sections={"Full package AID support"})
+        self.assertEqual(list(result), ["_type", "Basic information"])
+        result = parse_text(ALG_CONTENT, sections={"javacardx.*"})
+        self.assertIn("javacardx.crypto.Cipher", result)
+
+    def test_parse_text_typed(self):
+        record = parse_text(TPM_CONTENT, typed=True)["TPM2_Create"][0]
+        self.assertEqual(record["avg op"], 100.0)
+        self.assertEqual(record["throughput (ops/s)"], 10.0)
+        # Parsers without a typed mode ignore it
+        self.assertEqual(parse_text(AID_CONTENT, typed=True), parse_text(AID_CONTENT))
+
+    def test_parse_header_lines_stops_early(self):
+        read = []
+
+        def lines():
+            for line in ("Card name; Test Card\nJavaCard support version;3.0.1;\n\nCPLC; 9f 7f\n"
+                         "CPLC.ICType;3411\n\njavacardx.crypto.Cipher\nALG_DES_CBC_NOPAD;yes;0.101000\n").splitlines():
+                read.append(line)
+                yield line
+
+        result = parse_header_lines(lines(), parser_type="javacard-algsupport")
+        self.assertEqual(list(result), ["_type", "Basic information", "CPLC"])
+        self.assertNotIn("ALG_DES_CBC_NOPAD;yes;0.101000", read)
+
+    def test_parse_header_lines_detects_type(self):
+        result = parse_header_lines(iter(TPM_CONTENT.splitlines()))
+        self.assertEqual(result, {"_type": "tpm", "Basic information": [
+            {"name": "Manufacturer", "value": "INTC"}, {"name": "Firmware version", "value": "11.0.0.1202"}]})
+        result = parse_header_lines(AID_CONTENT.splitlines(), excluded_properties={"Card ATR"})
+        self.assertEqual(list(result), ["_type", "Basic information"])
+        self.assertEqual(result["Basic information"], [{"name": "jcAIDScan version", "value": "0.1.1"}])
+
+    def test_parse_bytes(self):
+        result = parse_bytes(AID_CONTENT.encode("utf-8"))
+        self.assertEqual(result["_type"], "javacard-aid")
+        self.assertEqual(result["Package AID"][0]["package_name"], "java.lang")
+
+    def test_parse_stream_binary_and_text(self):
+        self.assertEqual(parse_stream(io.BytesIO(TPM_CONTENT.encode()))["_type"], "tpm")
+        self.assertEqual(parse_stream(io.StringIO(TPM_CONTENT))["_type"], "tpm")
+
+    def test_parse_many(self):
+        buffers = [TPM_CONTENT, AID_CONTENT.encode(), io.StringIO(ALG_CONTENT)]
+        results = list(parse_many(buffers))
+        self.assertEqual([r["_type"] for r in results], ["tpm", "javacard-aid", "javacard"])
+
+    def test_convert_groups_matches_parse_text(self):
+        groups = [["Card name; Test Card", "JavaCard support version;3.0.1;"]]
+        self.assertEqual(convert_groups(groups, "javacard-algsupport")["_type"], "javacard")
+
+
+if __name__ == '__main__':
+    unittest.main()
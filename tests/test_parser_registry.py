@@ -0,0 +1,124 @@
+"""
+Unit tests for the parser registry (parser_registry.py)
+"""
+import json
+import unittest
+from unittest import mock
+import parser_registry
+from parser_registry import ParserSpec, register_parser, unregister_parser, detect, get_converter
+from parser_api import convert_groups
+
+
+def convert_to_map_keygen(groups, delimiter):
+    return {"_type": "rsa-keygen", "lines": sum(len(group) for group in groups)}
+
+
+class TestDetect(unittest.TestCase):
+    """Tests for ordered path and header detection."""
+
+    def test_path_detection_builtin(self):
+        self.assertEqual(detect("profiles/TPM/device.csv"), "tpm")
+        self.assertEqual(detect("performance/aid/file.csv"), "javacard-aid")
+        self.assertEqual(detect("profiles/performance/fixed/card.csv"), "javacard-performance")
+        self.assertEqual(detect("results/card.csv"), "javacard-algsupport")
+
+    def test_header_detection_builtin(self):
+        self.assertEqual(detect(lines=["Manufacturer; INTC", "TPM2_Create"]), "tpm")
+        self.assertEqual(detect(lines=["jcAIDScan version; 0.1.1"]), "javacard-aid")
+        self.assertEqual(detect(lines=["method name:; ALG_SHA MessageDigest_doFinal()"]), "javacard-performance")
+
+    def test_path_wins_over_header(self):
+        self.assertEqual(detect("tpm/device.csv", ["method name:; X"]), "tpm")
+
+    def test_header_used_when_path_has_no_hint(self):
+        self.assertEqual(detect("results/card.csv", ["method name:; X"]), "javacard-performance")
+
+    def test_header_detection_limited_to_leading_lines(self):
+        lines = ["Card name; X"] * parser_registry.SNIFF_LINES + ["TPM2_Create"]
+        self.assertEqual(detect(lines=iter(lines)), "javacard-algsupport")
+
+
+class TestRegisterParser(unittest.TestCase):
+    """Tests for explicit and entry point registration."""
+
+    def tearDown(self):
+        unregister_parser("rsa-keygen")
+
+    def test_register_and_detect(self):
+        register_parser("rsa-keygen", convert_to_map_keygen,
+                        path_detector=lambda path: "keygen" in path,
+                        header_detector=lambda line: line.startswith("RSA key generation"))
+        self.assertEqual(detect("dumps/KeyGen_card.csv"), "rsa-keygen")
+        self.assertEqual(detect(lines=["RSA key generation;2048"]), "rsa-keygen")
+        self.assertIn("rsa-keygen", parser_registry.parser_types())
+        self.assertEqual(get_converter("rsa-keygen")([["a", "b"]], ";")["lines"], 2)
+
+    def test_priority_orders_detection(self):
+        register_parser("rsa-keygen", convert_to_map_keygen,
+                        path_detector=lambda path: path.endswith(".csv"), priority=1)
+        self.assertEqual(detect("tpm/device.csv"), "rsa-keygen")
+
+    def test_lazy_converter_reference(self):
+        register_parser("rsa-keygen", "json:dumps")
+        self.assertIs(get_converter("rsa-keygen"), json.dumps)
+
+    def test_filters_applied_to_plugin_results(self):
+        # Plugins that do not filter while parsing get exclusions and sections applied to their result
+        register_parser("rsa-keygen", lambda groups, delimiter: {"Keys": [{"bits": "2048", "time": "1.5"}]})
+        result = convert_groups([["a"]], "rsa-keygen", excluded={"time"})
+        self.assertEqual(result, {"Keys": [{"bits": "2048"}]})
+        self.assertEqual(convert_groups([["a"]], "rsa-keygen", sections={"Other"}), {})
+
+    def test_unknown_parser(self):
+        with self.assertRaises(ValueError):
+            get_converter("does-not-exist")
+
+    def test_register_requires_converter(self):
+        with self.assertRaises(ValueError):
+            register_parser("rsa-keygen")
+
+    def test_entry_points_are_registered(self):
+        entry_point = mock.Mock()
+        entry_point.load.return_value = ParserSpec("rsa-keygen", convert_to_map_keygen)
+        entry_points = mock.Mock()
+        entry_points.select.return_value = [entry_point]
+        with mock.patch("importlib.metadata.entry_points", return_value=entry_points), \
+                mock.patch.object(parser_registry, "_entry_points_loaded", False):
+            parser_registry.load_entry_points()
+        entry_points.select.assert_called_once_with(group=parser_registry.ENTRY_POINT_GROUP)
+        self.assertIs(get_converter("rsa-keygen"), convert_to_map_keygen)
+
+    def test_entry_points_only_scanned_without_match(self):
+        entry_point = mock.Mock()
+        entry_point.load.return_value = ParserSpec("rsa-keygen", convert_to_map_keygen,
+                                                   header_detector=lambda line: line.startswith("RSA key generation"))
+        entry_points = mock.Mock()
+        entry_points.select.return_value = [entry_point]
+        with mock.patch("importlib.metadata.entry_points", return_value=entry_points) as scan, \
+                mock.patch.object(parser_registry, "_entry_points_loaded", False):
+            self.assertEqual(detect("profiles/TPM/device.csv"), "tpm")
+            self.assertEqual(detect(lines=iter(["Manufacturer; INTC", "TPM2_Create"])), "tpm")
+            scan.assert_not_called()
+            # The sniffed lines are checked again with the plugin parsers
+            self.assertEqual(detect("results/card.csv", iter(["Card name; X", "RSA key generation;2048"])),
+                             "rsa-keygen")
+            scan.assert_called_once()
+
+    def test_broken_entry_point_skipped(self):
+        broken = mock.Mock()
+        broken.name = "broken"
+        broken.load.side_effect = ImportError("No module named 'missing'")
+        entry_point = mock.Mock()
+        entry_point.load.return_value = ParserSpec("rsa-keygen", convert_to_map_keygen)
+        entry_points = mock.Mock()
+        entry_points.select.return_value = [broken, entry_point]
+        with mock.patch("importlib.metadata.entry_points", return_value=entry_points), \
+                mock.patch.object(parser_registry, "_entry_points_loaded", False), \
+                self.assertLogs("parser_registry", level="WARNING") as logs:
+            parser_registry.load_entry_points()
+        self.assertIn("broken", logs.output[0])
+        self.assertIs(get_converter("rsa-keygen"), convert_to_map_keygen)
+
+
+if __name__ == '__main__':
+    unittest.main()
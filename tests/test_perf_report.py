@@ -0,0 +1,151 @@
+"""
+Unit tests for the corpus performance-regression report (perf_report.py)
+"""
+import json
+import math
+import os
+import tempfile
+import unittest
+from unittest import mock
+import binary_format
+import parser_api
+from pathlib import Path
+from perf_report import RunningStats, PerformanceReport, iter_measurements, iter_profile_paths, build_report
+
+
+def jcperf_profile(avg_op):
+    return {
+        "_type": "javacard-performance",
+        "Basic information": [{"name": "Card name", "value": "Test"}],
+        "CIPHER": [{
+            "method name": "ALG_AES_BLOCK_128_CBC_NOPAD Cipher_doFinal()",
+            "supported": True,
+            "operation stats": {"avg op": avg_op},
+            "operation info": {"data length": "256"},
+        }],
+    }
+
+
+class TestRunningStats(unittest.TestCase):
+    """Tests for Welford online statistics."""
+
+    def test_mean_variance(self):
+        stats = RunningStats()
+        for i, value in enumerate([2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0]):
+            stats.add(value, i)
+        self.assertAlmostEqual(stats.mean, 5.0)
+        self.assertAlmostEqual(stats.variance, 32 / 7)
+
+    def test_without(self):
+        stats = RunningStats()
+        for i, value in enumerate([1.0, 2.0, 3.0, 10.0]):
+            stats.add(value, i)
+        mean, variance = stats.without(10.0)
+        self.assertAlmostEqual(mean, 2.0)
+        self.assertAlmostEqual(variance, 1.0)
+
+
+class TestPerformanceReport(unittest.TestCase):
+    """Tests for outlier detection."""
+
+    def test_iter_measurements_jcperf_and_tpm(self):
+        keys = [key for key, _ in iter_measurements(jcperf_profile("1.05"))]
+        self.assertEqual(keys, [("CIPHER", "ALG_AES_BLOCK_128_CBC_NOPAD Cipher_doFinal()", "256")])
+
+        tpm = {"_type": "tpm", "TPM2_Sign": [{"Key parameters": "ECC 0x0003", "avg op": "50.0", "failed": "0"}]}
+        self.assertEqual(list(iter_measurements(tpm)), [(("TPM2_Sign", "Key parameters=ECC 0x0003", None), 50.0)])
+
+    def test_ignores_other_types(self):
+        self.assertEqual(list(iter_measurements({"_type": "javacard", "Cipher": [[]]})), [])
+
+    def test_flags_ten_times_slower_card(self):
+        report = PerformanceReport()
+        for i, avg in enumerate(["1.00", "1.10", "0.95", "1.05", "0.98", "1.02", "10.5"]):
+            report.add_profile(f"card{i}", jcperf_profile(avg))
+        outliers = report.outliers()
+        self.assertEqual(len(outliers), 1)
+        self.assertEqual(outliers[0]["profile"], "card6")
+        self.assertGreater(outliers[0]["ratio"], 9)
+
+    def test_small_population_not_flagged(self):
+        report = PerformanceReport()
+        for i, avg in enumerate(["1.00", "1.00", "10.0"]):
+            report.add_profile(f"card{i}", jcperf_profile(avg))
+        self.assertEqual(report.outliers(), [])
+
+    def test_zero_spread_population(self):
+        report = PerformanceReport()
+        for i, avg in enumerate(["1.00"] * 5 + ["5.00"]):
+            report.add_profile(f"card{i}", jcperf_profile(avg))
+        outliers = report.outliers()
+        self.assertEqual([o["profile"] for o in outliers], ["card5"])
+        self.assertIsNone(outliers[0]["z"])
+        self.assertTrue(math.isclose(outliers[0]["ratio"], 5.0))
+
+    def test_far_faster_value_sorted(self):
+        report = PerformanceReport()
+        for i, avg in enumerate(["100", "101", "99", "100", "102", "98", "0.01"]):
+            report.add_profile(f"card{i}", jcperf_profile(avg))
+        outliers = report.outliers()
+        self.assertEqual([o["profile"] for o in outliers], ["card6"])
+        self.assertEqual(outliers[0]["ratio"], 0.0)
+
+    def test_build_report_from_folder(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, avg in enumerate(["1.00", "1.10", "0.95", "1.05", "0.98", "20.0"]):
+                with open(os.path.join(tmp, f"card{i}.json"), "w") as f:
+                    json.dump(jcperf_profile(avg), f)
+            with open(os.path.join(tmp, "broken.json"), "w") as f:
+                f.write("{")
+            report = build_report([tmp])
+        self.assertEqual(report["profiles"], 6)
+        self.assertEqual(report["methods"], 1)
+        self.assertTrue(report["outliers"][0]["profile"].endswith("card5.json"))
+
+    def test_outputs_next_to_inputs_counted_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.mkdir(os.path.join(tmp, "sub"))
+            names = ["a.csv", "a.json", "b.csv", "b.msgpack", "c.json", "c.msgpack", "d.msgpack",
+                     os.path.join("sub", "a.json")]
+            for name in names:
+                Path(tmp, name).write_text("")
+            found = [str(path.relative_to(tmp)) for path in iter_profile_paths([tmp])]
+            self.assertEqual(found, ["a.csv", "b.csv", "c.json", "d.msgpack", os.path.join("sub", "a.json")])
+            for name in ["e.csv.gz", "e.json", "f.csv.zst", "g.json.gz"]:
+                Path(tmp, name).write_text("")
+            found = [str(path.relative_to(tmp)) for path in iter_profile_paths([tmp])]
+            self.assertEqual(found, ["a.csv", "b.csv", "c.json", "d.msgpack", "e.csv.gz", "f.csv.zst",
+                                     os.path.join("sub", "a.json")])
+            # Files given explicitly are not deduplicated
+            self.assertEqual(len(list(iter_profile_paths([os.path.join(tmp, "a.csv"), os.path.join(tmp, "a.json")]))),
+                             2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, avg in enumerate(["1.00", "1.10", "0.95", "1.05", "0.98", "20.0"]):
+                with open(os.path.join(tmp, f"card{i}.json"), "w") as f:
+                    json.dump(jcperf_profile(avg), f)
+                with open(os.path.join(tmp, f"card{i}.msgpack"), "wb") as f:
+                    f.write(binary_format.dumps(jcperf_profile(avg)))
+            report = build_report([tmp])
+        self.assertEqual(report["profiles"], 6)
+        self.assertEqual(report["outliers"][0]["samples"], 6)
+
+    def test_build_report_skips_failing_profiles(self):
+        load_result = parser_api.load_result
+
+        def load(path, delimiter):
+            if path.endswith("card0.json"):
+                raise KeyError("unexpected layout")
+            return load_result(path, delimiter)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(3):
+                with open(os.path.join(tmp, f"card{i}.json"), "w") as f:
+                    json.dump(jcperf_profile("1.00"), f)
+            with mock.patch("parser_api.load_result", side_effect=load):
+                report = build_report([tmp])
+        self.assertEqual(report["profiles"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Unit tests for concurrent folder scanning and read-ahead (prefetch.py)
+"""
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from main import process_files
+from memory_governor import MemoryBudget
+from prefetch import prefetch, read_ahead, scan_profiles
+
+
+class TestScanProfiles(unittest.TestCase):
+    """Tests for listing profiles with a thread pool."""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def touch(self, *parts):
+        path = self.root.joinpath(*parts)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("Card name; Test\n")
+        return path
+
+    def test_tree_order_and_filter(self):
+        expected = [self.touch("a.csv"), self.touch("b.csv.gz"), self.touch("a", "z.csv"),
+                    self.touch("a", "b", "c.csv"), self.touch("b", "d.csv")]
+        self.touch("notes.txt")
+        self.touch("a", "b", "card.json")
+        for workers in (1, 4):
+            self.assertEqual(scan_profiles(self.root, workers), expected)
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "symlinks not supported")
+    def test_symlinked_directories_not_descended(self):
+        target = self.touch("real", "card.csv")
+        os.symlink(self.root / "real", self.root / "link", target_is_directory=True)
+        self.assertEqual(scan_profiles(self.root), [target])
+
+
+class TestPrefetch(unittest.TestCase):
+    """Tests for reading inputs ahead of the parse loop."""
+
+    def test_order_and_depth(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+        release = threading.Event()
+
+        def read(path):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            release.wait(0.01)
+            with lock:
+                state["running"] -= 1
+            return path.upper()
+
+        paths = [f"file{i}" for i in range(20)]
+        self.assertEqual(list(prefetch(paths, read, 3)), [(path, path.upper()) for path in paths])
+        self.assertLessEqual(state["peak"], 3)
+
+    def test_abandoned_iteration(self):
+        reads = []
+        iterator = prefetch((str(i) for i in range(100)), reads.append, 4)
+        next(iterator)
+        iterator.close()
+        self.assertLessEqual(len(reads), 5)
+
+    def test_read_ahead_budget(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            plain = os.path.join(tmp, "card.csv")
+            with open(plain, "w") as f:
+                f.write("Card name; Test\n" * 10)
+            compressed = os.path.join(tmp, "card2.csv.gz")
+            with gzip.open(compressed, "wt") as f:
+                f.write("Card name; Test\n")
+
+            self.assertEqual(read_ahead(plain), "Card name; Test\n" * 10)
+            self.assertEqual(read_ahead(compressed), "Card name; Test\n")
+            self.assertIsNone(read_ahead(os.path.join(tmp, "missing.csv")))
+            # Streamed and over-cap inputs are left to the parse loop
+            self.assertIsNone(read_ahead(plain, MemoryBudget(stream_bytes=10)))
+            self.assertIsNone(read_ahead(plain, MemoryBudget(max_bytes=10)))
+            self.assertIsNone(read_ahead(compressed, MemoryBudget()))
+            self.assertIsNotNone(read_ahead(plain, MemoryBudget()))
+
+    def test_process_files_with_prefetch(self):
+        test_data = Path(__file__).parent / "test-data"
+        files = sorted(str(path) for path in test_data.rglob("*.csv"))[:6] + ["/nonexistent/file.csv"]
+        with tempfile.TemporaryDirectory() as tmp:
+            outputs = {}
+            for name, budget in (("plain", None), ("budget", MemoryBudget()), ("prefetch", None),
+                                 ("prefetch-budget", MemoryBudget())):
+                output_dir = Path(tmp, name)
+                written = process_files(files, output_dir=output_dir, source_base=test_data, budget=budget,
+                                        prefetch_files=4 if name.startswith("prefetch") else 0)
+                outputs[name] = {path.relative_to(output_dir): path.read_bytes() for path in written}
+            self.assertEqual(len(outputs["plain"]), 6)
+            for name in ("budget", "prefetch", "prefetch-budget"):
+                self.assertEqual(outputs[name], outputs["plain"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Unit tests for the structural profile diff (profile_diff.py)
+"""
+import unittest
+from profile_diff import diff_profiles, compare_timing, method_key, tpm_key
+
+
+def alg(name, supported, time=""):
+    return [
+        {"name": "algorithm_name", "value": name},
+        {"name": "is_supported", "value": supported},
+        {"name": "time_elapsed", "value": time},
+    ]
+
+
+def kinds(report):
+    return sorted((change["key"], change["kind"]) for change in report["changes"])
+
+
+class TestCompareTiming(unittest.TestCase):
+    """Tests for relative timing comparison."""
+
+    def test_within_threshold(self):
+        self.assertIsNone(compare_timing("S", "k", "1.00", "1.05", 0.1))
+
+    def test_regression_and_improvement(self):
+        self.assertEqual(compare_timing("S", "k", "1.00", "2.00", 0.1)["kind"], "regression")
+        self.assertEqual(compare_timing("S", "k", "2.00", "1.00", 0.1)["kind"], "improvement")
+        self.assertEqual(compare_timing("S", "k", "1,00", "2,00", 0.1)["ratio"], 2.0)
+
+    def test_non_numeric_ignored(self):
+        self.assertIsNone(compare_timing("S", "k", "", "2.00", 0.1))
+
+
+class TestDiffProfiles(unittest.TestCase):
+    """Tests for per-type structural diffs."""
+
+    def test_type_mismatch(self):
+        with self.assertRaises(ValueError):
+            diff_profiles({"_type": "tpm"}, {"_type": "javacard"})
+
+    def test_javacard_support_flip_and_time(self):
+        old = {"_type": "javacard",
+               "Basic information": [{"name": "Card name", "value": "A"}],
+               "Cipher": [alg("ALG_DES", "yes", "0.10"), alg("ALG_AES", "no"), alg("ALG_RSA", "yes", "1.0")]}
+        new = {"_type": "javacard",
+               "Basic information": [{"name": "Card name", "value": "B"}],
+               "Cipher": [alg("ALG_DES", "yes", "0.20"), alg("ALG_AES", "yes", "0.3"), alg("ALG_SEED", "no")]}
+        report = diff_profiles(old, new)
+        self.assertEqual(kinds(report), [
+            ("ALG_AES", "support_changed"),
+            ("ALG_DES", "time_changed"),
+            ("ALG_RSA", "removed"),
+            ("ALG_SEED", "added"),
+            ("Card name", "value_changed"),
+        ])
+        self.assertEqual(report["summary"]["support_changed"], 1)
+
+    def test_javacard_attributes_in_algorithm_groups(self):
+        def profile(version):
+            return {"_type": "javacard",
+                    "javacardx.crypto.Cipher": [{"name": "JavaCard support version", "value": version},
+                                                alg("ALG_DES", "yes", "0.1")]}
+
+        report = diff_profiles(profile("3.0.4"), profile("9.9.9"))
+        self.assertEqual(kinds(report), [("JavaCard support version", "value_changed")])
+        self.assertEqual(diff_profiles(profile("3.0.4"), profile("3.0.4"))["summary"], {})
+
+    def test_jcperf_regression_threshold(self):
+        def method(avg, length="256"):
+            return {"method name": "ALG_SHA MessageDigest_doFinal()", "supported": True,
+                    "operation stats": {"avg op": avg}, "operation info": {"data length": length}}
+
+        old = {"_type": "javacard-performance", "MESSAGE DIGEST": [method("1.00"), method("2.00", "16")]}
+        new = {"_type": "javacard-performance", "MESSAGE DIGEST": [method("1.50"), method("2.10", "16")]}
+        report = diff_profiles(old, new, threshold=0.2)
+        self.assertEqual(len(report["changes"]), 1)
+        change = report["changes"][0]
+        self.assertEqual(change["kind"], "regression")
+        self.assertEqual(change["key"], ("ALG_SHA MessageDigest_doFinal()", "256"))
+        self.assertEqual(method_key(method("1.0", "16"))[1], "16")
+
+    def test_tpm_op_changes(self):
+        record = {"Key parameters": "RSA 1024", "avg op": "100.00", "successful": "100", "failed": "0"}
+        changed = dict(record, **{"avg op": "50.00", "failed": "3"})
+        old = {"_type": "tpm", "TPM2_Create": [record], "TPM2_Sign": []}
+        new = {"_type": "tpm", "TPM2_Create": [changed, {"Key parameters": "ECC 0x0003", "avg op": "5"}]}
+        report = diff_profiles(old, new)
+        self.assertEqual(kinds(report), [
+            ("Key parameters=ECC 0x0003", "added"),
+            ("Key parameters=RSA 1024", "improvement"),
+            ("Key parameters=RSA 1024", "stats_changed"),
+        ])
+        self.assertEqual(tpm_key(record), "Key parameters=RSA 1024")
+
+    def test_aid_support_changes(self):
+        def full(aid, supported):
+            return {"full_package_aid": aid, "supported": supported, "package_name_version": "java.lang"}
+
+        old = {"_type": "javacard-aid", "Full package AID support": [full("0001", True), full("0002", False)]}
+        new = {"_type": "javacard-aid", "Full package AID support": [full("0001", False), full("0002", False)],
+               "Package AID": [{"package_aid": "a0000000620001", "package_name": "java.lang"}]}
+        report = diff_profiles(old, new)
+        self.assertEqual(kinds(report), [("0001", "support_changed"), ("a0000000620001", "added")])
+
+    def test_duplicate_keys_reported(self):
+        record = {"Key parameters": "RSA 1024", "avg op": "100.00"}
+        old = {"_type": "tpm", "TPM2_Create": [record, dict(record, **{"avg op": "300.00"})]}
+        new = {"_type": "tpm", "TPM2_Create": [record]}
+        report = diff_profiles(old, new)
+        self.assertEqual(kinds(report), [("Key parameters=RSA 1024", "duplicate")])
+        self.assertEqual(report["changes"][0]["old"]["avg op"], "300.00")
+
+        method = {"method name": "ALG_SHA MessageDigest_doFinal()", "operation stats": {"avg op": "1.00"},
+                  "operation info": {"data length": "256"}}
+        old = {"_type": "javacard-performance", "MESSAGE DIGEST": [method]}
+        new = {"_type": "javacard-performance", "MESSAGE DIGEST": [method, method]}
+        self.assertEqual(diff_profiles(old, new)["summary"], {"duplicate": 1})
+
+        old = {"_type": "javacard", "Cipher": [alg("ALG_DES", "yes"), alg("ALG_DES", "no")]}
+        self.assertEqual(diff_profiles(old, {"_type": "javacard", "Cipher": [alg("ALG_DES", "yes")]})["summary"],
+                         {"duplicate": 1})
+
+    def test_aid_without_excluded_keys(self):
+        old = {"_type": "javacard-aid",
+               "Full package AID support": [{"supported": True, "package_name_version": "java.lang v1.0"}],
+               "Package AID": [{"package_name": "java.lang", "major_version": "1"}]}
+        new = {"_type": "javacard-aid",
+               "Full package AID support": [{"supported": False, "package_name_version": "java.lang v1.0"}],
+               "Package AID": [{"package_name": "java.lang", "major_version": "2"}]}
+        self.assertEqual(kinds(diff_profiles(old, new)), [("java.lang", "value_changed"),
+                                                           ("java.lang v1.0", "support_changed")])
+
+    def test_identical_profiles(self):
+        profile = {"_type": "javacard", "Cipher": [alg("ALG_DES", "yes", "0.1")]}
+        self.assertEqual(diff_profiles(profile, profile)["changes"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
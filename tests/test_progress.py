@@ -0,0 +1,188 @@
+"""
+Unit tests for progress reporting (progress.py)
+"""
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import zipfile
+from pathlib import Path
+from archive_io import process_archive
+from main import process_folder
+from parser_utils import PER_FILE
+from progress import BarRenderer, JsonLinesRenderer, LogThrottle, Progress, file_sizes, format_duration, \
+    make_progress
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProgress(unittest.TestCase):
+    """Tests for counting, rates, ETA and render throttling."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.renders = []
+        self.progress = Progress(lambda snapshot, final: self.renders.append((snapshot, final)), interval=1.0,
+                                 clock=self.clock)
+
+    def test_eta_from_bytes(self):
+        self.progress.add_inputs({"a.csv": 100, "b.csv": 300, "c.csv": 600})
+        self.clock.now += 2
+        self.progress.on_file_done("b.csv", Path("b.json"), None)
+        snapshot = self.progress.snapshot()
+        self.assertEqual((snapshot["files_done"], snapshot["files_total"]), (1, 3))
+        self.assertEqual((snapshot["bytes_done"], snapshot["bytes_total"]), (300, 1000))
+        self.assertEqual(snapshot["files_per_s"], 0.5)
+        # 300 bytes in 2 s, 700 to go
+        self.assertAlmostEqual(snapshot["eta_s"], 4.7)
+
+        self.clock.now += 1
+        self.progress.on_file_done("a.csv", None, "parse error: boom")
+        self.assertEqual(self.progress.snapshot()["errors"], 1)
+
+    def test_render_interval_and_close(self):
+        self.progress.add_inputs({"a.csv": 1, "b.csv": 1, "c.csv": 1})
+        self.progress.advance(1)
+        self.clock.now += 0.5
+        self.progress.advance(1)
+        self.clock.now += 0.6
+        self.progress.advance(1)
+        self.progress.close()
+        self.progress.close()
+        self.assertEqual([snapshot["files_done"] for snapshot, _ in self.renders], [1, 3, 3])
+        self.assertEqual([final for _, final in self.renders], [False, False, True])
+
+    def test_unknown_totals(self):
+        self.clock.now += 1
+        self.progress.advance(2 * 1024 * 1024)
+        snapshot = self.progress.snapshot()
+        self.assertIsNone(snapshot["files_total"])
+        self.assertIsNone(snapshot["eta_s"])
+        self.assertEqual(snapshot["mb_per_s"], 2.0)
+
+    def test_concurrent_updates(self):
+        sizes = {f"{i}.csv": 10 for i in range(400)}
+        self.progress.add_inputs(sizes)
+        threads = [threading.Thread(target=lambda chunk=chunk: [self.progress.on_file_done(name, None, None)
+                                                                for name in chunk])
+                   for chunk in (list(sizes)[i::4] for i in range(4))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        snapshot = self.progress.snapshot()
+        self.assertEqual((snapshot["files_done"], snapshot["bytes_done"]), (400, 4000))
+
+
+class TestRenderers(unittest.TestCase):
+    """Tests for the bar and JSON lines renderers."""
+
+    SNAPSHOT = {"files_done": 5, "files_total": 10, "bytes_done": 250, "bytes_total": 1000, "errors": 1,
+                "elapsed_s": 2.0, "files_per_s": 2.5, "mb_per_s": 0.0, "eta_s": 3725.0}
+
+    def test_bar(self):
+        stream = io.StringIO()
+        BarRenderer(stream)(self.SNAPSHOT, final=True)
+        line = stream.getvalue()
+        self.assertIn("[#######-----------------------] 5/10", line)
+        self.assertIn("ETA 1:02:05", line)
+        self.assertIn("errors 1", line)
+        self.assertTrue(line.endswith("\n"))
+
+    def test_json_lines(self):
+        stream = io.StringIO()
+        renderer = JsonLinesRenderer(stream)
+        renderer(self.SNAPSHOT)
+        renderer(self.SNAPSHOT, final=True)
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([event["event"] for event in events], ["progress", "done"])
+        self.assertEqual(events[0]["eta_s"], 3725.0)
+
+    def test_make_progress(self):
+        self.assertIsNone(make_progress("auto", io.StringIO()))
+        self.assertIsNone(make_progress("none"))
+        self.assertEqual(make_progress("json", io.StringIO()).interval, 5.0)
+        self.assertEqual(make_progress("bar", io.StringIO(), interval=2).interval, 2)
+        with self.assertRaises(ValueError):
+            make_progress("fancy")
+        self.assertEqual(format_duration(None), "?")
+
+
+class TestLogThrottle(unittest.TestCase):
+    """Tests for throttling per-file log records."""
+
+    def test_throttles_per_file_info_only(self):
+        clock = FakeClock()
+        throttle = LogThrottle(interval=10, clock=clock)
+        logger = logging.getLogger("test_progress.throttle")
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        handler.addFilter(throttle)
+        logger.addHandler(handler)
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        try:
+            for i in range(5):
+                logger.info(f"file {i}", extra=PER_FILE)
+            logger.info("summary")
+            logger.error("failed", extra=PER_FILE)
+            clock.now += 10
+            logger.info("file 5", extra=PER_FILE)
+        finally:
+            logger.removeHandler(handler)
+        self.assertEqual([record.getMessage() for record in records], ["file 0", "summary", "failed", "file 5"])
+        self.assertEqual(throttle.suppressed, 4)
+
+
+class TestRunProgress(unittest.TestCase):
+    """Tests for progress of folder and archive runs."""
+
+    def setUp(self):
+        self.source_dir = tempfile.mkdtemp()
+        self.output_dir = tempfile.mkdtemp()
+        self.progress = Progress(lambda snapshot, final: None)
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir, ignore_errors=True)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_process_folder(self):
+        for name in ("a.csv", "b.csv"):
+            with open(os.path.join(self.source_dir, name), "w") as f:
+                f.write("Manufacturer; INTC\n")
+        with open(os.path.join(self.source_dir, "bad.csv"), "wb") as f:
+            f.write(b"\xff\xfe\x00")
+
+        process_folder(self.source_dir, self.output_dir, progress=self.progress)
+
+        snapshot = self.progress.snapshot()
+        self.assertEqual((snapshot["files_done"], snapshot["files_total"]), (3, 3))
+        self.assertEqual(snapshot["bytes_done"], snapshot["bytes_total"])
+        self.assertEqual(snapshot["bytes_total"], sum(file_sizes(Path(self.source_dir).iterdir()).values()))
+
+    def test_process_archive(self):
+        archive = os.path.join(self.source_dir, "results.zip")
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("a.csv", "Card name; Test\n")
+            zf.writestr("b.csv", "Card name; Other\n")
+            zf.writestr("readme.txt", "not a profile")
+
+        process_archive(archive, self.output_dir, progress=self.progress)
+
+        snapshot = self.progress.snapshot()
+        self.assertEqual((snapshot["files_done"], snapshot["files_total"], snapshot["bytes_done"]), (2, 2, 33))
+
+
+if __name__ == '__main__':
+    unittest.main()
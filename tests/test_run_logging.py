@@ -0,0 +1,109 @@
+"""
+Unit tests for quiet logging and run summaries (run_logging.py)
+"""
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+import run_logging
+from archive_io import process_archive
+from main import process_folder
+from parser_utils import PER_FILE
+from run_logging import JsonFormatter, RunSummary, configure_quiet, error_kind
+
+
+class TestJsonFormatter(unittest.TestCase):
+    """Tests for structured error lines."""
+
+    def test_fields(self):
+        logger = logging.getLogger("test_run_logging.formatter")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logger.makeRecord(logger.name, logging.ERROR, __file__, 1, "Failed to parse %s", ("a.csv",),
+                                       exc_info=sys.exc_info(), extra={"input": "a.csv"})
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry["level"], "ERROR")
+        self.assertEqual(entry["message"], "Failed to parse a.csv")
+        self.assertEqual(entry["input"], "a.csv")
+        self.assertIn("ValueError: boom", entry["exception"])
+
+
+class TestRunSummary(unittest.TestCase):
+    """Tests for aggregating file outcomes."""
+
+    def test_counts(self):
+        now = [10.0]
+        summary = RunSummary(clock=lambda: now[0])
+        summary.on_file_done("a.csv", Path("a.json"), None)
+        summary.on_file_done("b.csv", Path("b.json"), None)
+        summary.on_file_done("c.csv", None, "parse error: bad line")
+        summary.on_file_done("d.csv", None, "skipped: d.csv has 10 bytes, more than the budget of 5")
+        summary.on_file_done("e.csv", None, "parse error: other")
+        now[0] = 12.0
+        result = summary.to_dict()
+        self.assertEqual((result["files"], result["converted"], result["failed"]), (5, 2, 3))
+        self.assertEqual(result["errors"], {"parse error": 2, "skipped": 1})
+        self.assertEqual(result["failed_files"], ["c.csv", "d.csv", "e.csv"])
+        self.assertEqual(result["files_per_s"], 2.5)
+        self.assertEqual(error_kind("failed to load file"), "failed to load file")
+
+
+class TestQuietMode(unittest.TestCase):
+    """Tests for the quiet logging configuration."""
+
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.saved = (self.root.level, self.root.handlers[:], run_logging.logger.level)
+        self.stream = io.StringIO()
+        self.root.handlers = [logging.StreamHandler(self.stream)]
+        self.source_dir = tempfile.mkdtemp()
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.root.setLevel(self.saved[0])
+        self.root.handlers = self.saved[1]
+        run_logging.logger.setLevel(self.saved[2])
+        shutil.rmtree(self.source_dir, ignore_errors=True)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_only_errors_and_summary(self):
+        configure_quiet()
+        with open(os.path.join(self.source_dir, "good.csv"), "w") as f:
+            f.write("Manufacturer; INTC\n")
+        with open(os.path.join(self.source_dir, "bad.csv"), "wb") as f:
+            f.write(b"\xff\xfe\x00")
+        logging.getLogger("test_run_logging").info("per file", extra=PER_FILE)
+
+        summary = RunSummary()
+        process_folder(self.source_dir, self.output_dir, on_file_done=summary.on_file_done)
+        summary.log()
+
+        entries = [json.loads(line) for line in self.stream.getvalue().splitlines()]
+        *errors, last = entries
+        self.assertEqual(errors[0]["level"], "ERROR")
+        for entry in errors:
+            self.assertIn(entry["level"], ("WARNING", "ERROR"))
+            self.assertTrue(entry["input"].endswith("bad.csv"))
+        self.assertEqual(last["summary"]["converted"], 1)
+        self.assertEqual(last["summary"]["errors"], {"failed to load file": 1})
+
+    def test_archive_members_reported(self):
+        archive = os.path.join(self.source_dir, "results.zip")
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("a.csv", "Card name; Test\n")
+            zf.writestr("../escape.csv", "Card name; Test\n")
+        summary = RunSummary()
+        process_archive(archive, self.output_dir, on_file_done=summary.on_file_done)
+        result = summary.to_dict()
+        self.assertEqual((result["converted"], result["failed_files"]), (1, ["../escape.csv"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit tests for deterministic sharding (sharding.py)
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from main import process_folder
+from sharding import parse_shard, shard_of, merge_manifests, manifest_path
+
+
+class TestShardHelpers(unittest.TestCase):
+    """Tests for shard parsing and assignment."""
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("0/4"), (0, 4))
+        self.assertEqual(parse_shard("3/4"), (3, 4))
+        for spec in ("4/4", "-1/4", "1/0", "a/b", "1"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_shard_of_is_stable_and_in_range(self):
+        self.assertEqual(shard_of("nxp/card.csv", 7), shard_of("nxp/card.csv", 7))
+        self.assertEqual(shard_of("nxp\\card.csv", 7), shard_of("nxp/card.csv", 7))
+        self.assertTrue(all(0 <= shard_of(f"dir/{i}.csv", 3) < 3 for i in range(50)))
+        self.assertEqual(len({shard_of(f"dir/{i}.csv", 3) for i in range(50)}), 3)
+
+
+class TestShardedFolder(unittest.TestCase):
+    """Tests for sharded process_folder runs and manifest merging."""
+
+    def setUp(self):
+        self.source_dir = tempfile.mkdtemp()
+        self.output_dir = tempfile.mkdtemp()
+        for i in range(12):
+            subdir = os.path.join(self.source_dir, f"vendor{i % 3}")
+            os.makedirs(subdir, exist_ok=True)
+            with open(os.path.join(subdir, f"card{i}.csv"), "w") as f:
+                f.write(f"Card name; Test {i}\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir, ignore_errors=True)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_shards_are_disjoint_and_complete(self):
+        all_outputs = []
+        for index in range(3):
+            all_outputs.extend(process_folder(self.source_dir, self.output_dir, shard=(index, 3)))
+            self.assertTrue(manifest_path(Path(self.output_dir).resolve(), index, 3).exists())
+
+        self.assertEqual(len(all_outputs), 12)
+        self.assertEqual(len(set(all_outputs)), 12)
+
+        merged = merge_manifests(self.output_dir)
+        self.assertEqual(merged["missing_shards"], [])
+        self.assertEqual(merged["metrics"]["converted"], 12)
+        self.assertEqual(merged["metrics"]["failed"], 0)
+        self.assertEqual(len(merged["completed"]), 12)
+        self.assertTrue((Path(self.output_dir) / "_shards" / "merged.json").exists())
+
+    def test_manifest_contents(self):
+        outputs = process_folder(self.source_dir, self.output_dir, shard=(1, 2))
+        with open(manifest_path(Path(self.output_dir).resolve(), 1, 2)) as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["shard"], 1)
+        self.assertEqual(manifest["metrics"]["converted"], len(outputs))
+        self.assertTrue(all(entry["output"].endswith(".json") for entry in manifest["completed"]))
+
+    def test_merge_reports_missing_shards(self):
+        process_folder(self.source_dir, self.output_dir, shard=(0, 3))
+        self.assertEqual(merge_manifests(self.output_dir)["missing_shards"], [1, 2])
+
+    def test_merge_without_manifests(self):
+        with self.assertRaises(ValueError):
+            merge_manifests(self.output_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
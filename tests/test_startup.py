@@ -0,0 +1,77 @@
+"""
+Cold-start guards for main.py: parser modules must be imported lazily.
+"""
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PARSER_MODULES = {'tpm_parser', 'jcperf_parser', 'jcaid_parser', 'jcres_parser'}
+
+# Upper bound for a fresh interpreter converting one small profile (~0.15 s on a developer machine)
+CONVERSION_BUDGET_S = 2.0
+
+
+def imported_modules(code: str) -> set[str]:
+    """Run code under `python -X importtime` and return the names of all imported modules."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    names = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:') and 'imported package' not in line:
+            names.add(line.rsplit('|', 1)[1].strip())
+    return names
+
+
+class TestStartup(unittest.TestCase):
+    """Tests that importing main stays cheap."""
+
+    def test_import_main_loads_no_parser(self):
+        modules = imported_modules('import main')
+        self.assertIn('main', modules)
+        self.assertEqual(modules & PARSER_MODULES, set())
+        self.assertNotIn('shutil', modules)
+        self.assertNotIn('argparse', modules)
+
+    def test_analysis_modules_load_no_parser(self):
+        modules = imported_modules('import profile_diff, perf_report')
+        self.assertEqual(modules & PARSER_MODULES, set())
+
+    def test_single_conversion_loads_only_selected_parser(self):
+        # importlib.import_module bypasses -X importtime reporting, so inspect sys.modules instead
+        code = ("import sys, main, parser_api; "
+                "parser_api.parse_text('Manufacturer; INTC\\n\\nTPM2_Create\\n', parser_type='tpm'); "
+                "print(' '.join(sorted(sys.modules)))")
+        proc = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True)
+        modules = set(proc.stdout.split())
+        self.assertEqual(modules & PARSER_MODULES, {'tpm_parser'})
+
+    def test_single_file_conversion_end_to_end(self):
+        source = REPO_ROOT / 'tests' / 'test-data' / 'gemplus' / \
+            'Gemplus_GXPR3_3B 7B 94 00 00 80 65 B0 83 01 01 74 83 00 90 00_(provided_by_PetrS).csv'
+        code = ("import runpy, sys; sys.argv = ['main.py', sys.argv[1], '--quiet']\n"
+                "try:\n"
+                "    runpy.run_path('main.py', run_name='__main__')\n"
+                "finally:\n"
+                "    print(' '.join(sorted(sys.modules)))")
+        with tempfile.TemporaryDirectory() as tmp:
+            profile = Path(shutil.copy(source, tmp))
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, '-c', code, str(profile)], cwd=REPO_ROOT,
+                                  capture_output=True, text=True, check=True)
+            elapsed = time.perf_counter() - start
+            with open(profile.with_suffix('.json'), encoding='utf-8') as f:
+                result = json.load(f)
+        self.assertEqual(result['_type'], 'javacard')
+        self.assertEqual(set(proc.stdout.split()) & PARSER_MODULES, {'jcres_parser'})
+        self.assertLess(elapsed, CONVERSION_BUDGET_S)
+
+
+if __name__ == '__main__':
+    unittest.main()
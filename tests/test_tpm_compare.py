@@ -0,0 +1,97 @@
+"""
+Unit tests for cross-device TPM comparison tables (tpm_compare.py)
+"""
+import csv
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from main import process_files
+from tpm_compare import TpmComparison, COLUMNS, TABLE_NAME, build_table, device_name, export_table, to_csv
+
+
+def tpm_profile(manufacturer, avg_op, failed="0"):
+    return {
+        "_type": "tpm",
+        "Basic information": [{"name": "Manufacturer", "value": manufacturer},
+                              {"name": "Firmware version", "value": "1.2"}],
+        "TPM2_Sign": [{"Key parameters": "ECC 0x0003", "Scheme": "0x0018", "avg op": avg_op, "min op": "40.0",
+                       "max op": "60.0", "total iterations": "100", "failed": failed}],
+    }
+
+
+class TestTpmComparison(unittest.TestCase):
+    """Tests for grouping TPM records per key and device."""
+
+    def test_device_name(self):
+        self.assertEqual(device_name(tpm_profile("INTC", "1"), "fallback"), "INTC 1.2")
+        self.assertEqual(device_name({"_type": "tpm"}, "fallback"), "fallback")
+
+    def test_groups_per_device(self):
+        table = TpmComparison()
+        table.add_profile("a.csv", tpm_profile("INTC", "50.0"))
+        table.add_profile("b.csv", tpm_profile("INTC", "52.0", failed="2"))
+        table.add_profile("c.csv", tpm_profile("IFX", "30.0"))
+        self.assertFalse(table.add_profile("d.csv", {"_type": "javacard"}))
+
+        rows = [dict(zip(COLUMNS, row)) for row in table.rows()]
+        self.assertEqual([row["device"] for row in rows], ["IFX 1.2", "INTC 1.2"])
+        intel = rows[1]
+        self.assertEqual(intel["operation"], "TPM2_Sign")
+        self.assertEqual(intel["key_parameters"], "ECC 0x0003")
+        self.assertEqual(intel["parameters"], "Scheme=0x0018")
+        self.assertEqual((intel["samples"], intel["profiles"], intel["avg_op"]), (2, 2, 51.0))
+        self.assertEqual((intel["total_iterations"], intel["failed"]), (200, 2))
+
+    def test_export_csv_and_sqlite(self):
+        table = TpmComparison()
+        table.add_profile("a.csv", tpm_profile("INTC", "50.0"))
+        table.add_profile("b.csv", tpm_profile("IFX", "30.0"))
+
+        rows = list(csv.DictReader(io.StringIO(to_csv(table))))
+        self.assertEqual([row["device"] for row in rows], ["IFX 1.2", "INTC 1.2"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tpm.sqlite")
+            export_table(table, path)
+            export_table(table, path)  # replaced, not appended
+            connection = sqlite3.connect(path)
+            try:
+                result = connection.execute(f"SELECT device, avg_op FROM {TABLE_NAME} "
+                                            f"WHERE operation = 'TPM2_Sign' ORDER BY avg_op").fetchall()
+            finally:
+                connection.close()
+            self.assertEqual(result, [("IFX 1.2", 30.0), ("INTC 1.2", 50.0)])
+            self.assertEqual(os.listdir(tmp), ["tpm.sqlite"])
+
+    def test_build_table_from_csv_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, manufacturer in (("intel.csv", "INTC"), ("stm.csv", "STM")):
+                with open(os.path.join(tmp, name), "w") as f:
+                    f.write(f"Manufacturer; {manufacturer}\n\nTPM2_Create\n\nKey parameters:;RSA 1024\n"
+                            "operation stats (ms/op):;avg op:;100.00;min op:;90.00;max op:;110.00\n")
+            with open(os.path.join(tmp, "card.csv"), "w") as f:
+                f.write("Card name; Test card\n")
+            table = build_table([tmp])
+        self.assertEqual(table.profiles, 2)
+        self.assertEqual(sorted(key[-1] for key in table.stats), ["INTC", "STM"])
+
+    def test_outputs_next_to_inputs_counted_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "intel.csv")
+            with open(path, "w") as f:
+                f.write("Manufacturer; INTC\n\nTPM2_Create\n\nKey parameters:;RSA 1024\n"
+                        "operation stats (ms/op):;avg op:;100.00;min op:;90.00;max op:;110.00;"
+                        "total iterations:;100\n")
+            process_files([path])
+            self.assertEqual(sorted(os.listdir(tmp)), ["intel.csv", "intel.json"])
+            table = build_table([tmp])
+        self.assertEqual(table.profiles, 1)
+        (row,) = table.rows()
+        row = dict(zip(COLUMNS, row))
+        self.assertEqual((row["samples"], row["profiles"], row["total_iterations"]), (1, 1, 100))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,8 +10,11 @@ from tpm_parser import (
     parse_stats_line,
     parse_data_group,
     convert_to_map_tpm,
+    typed_value,
+    type_record,
     BASIC_INFO
 )
+from parser_utils import NameMatcher
 
 DEFAULT_DELIMITER = ";"
 
@@ -166,6 +169,91 @@ class TestTpmParserConvertToMap(unittest.TestCase):
         self.assertEqual(result["_type"], "tpm")
         self.assertIn("TPM2_Create", result)
 
+    def test_convert_to_map_tpm_sections(self):
+        """Test that data groups of unselected operations are skipped."""
+        groups = [
+            ["Manufacturer; INTC"],
+            ["TPM2_Create"],
+            ["Key parameters:;RSA 1024", "operation stats (ms/op):;avg op:;100.00;min op:;90.00;max op:;110.00"],
+            ["TPM2_Sign"],
+            ["Key parameters:;ECC 0x0003;Scheme:;0x0018", "operation stats (ms/op):;avg op:;145.32;min op:;131.96;max op:;156.38"]
+        ]
+
+        result = convert_to_map_tpm(groups, DEFAULT_DELIMITER, sections=NameMatcher(["TPM2_Sign"]))
+
+        self.assertEqual(list(result), ["_type", BASIC_INFO, "TPM2_Sign"])
+        self.assertEqual(result["TPM2_Sign"][0]["Scheme"], "0x0018")
+
+    def test_convert_to_map_tpm_exclusions(self):
+        """Test that excluded properties are skipped while parsing."""
+        groups = [
+            ["Manufacturer; INTC", "Firmware version; 11.0.0.1202"],
+            ["TPM2_Create"],
+            [
+                "Key parameters:;RSA 1024",
+                "operation stats (ms/op):;avg op:;100.00;min op:;90.00;max op:;110.00",
+                "operation info:;total iterations:;100;successful:;100;failed:;0;error:;None"
+            ]
+        ]
+
+        result = convert_to_map_tpm(groups, DEFAULT_DELIMITER,
+                                    excluded=NameMatcher(["Firmware *", "re:(min|max) op", "error"]))
+
+        self.assertEqual(result[BASIC_INFO], [{"name": "Manufacturer", "value": "INTC"}])
+        self.assertEqual(list(result["TPM2_Create"][0]),
+                         ["Key parameters", "avg op", "total iterations", "successful", "failed"])
+
+
+class TestTpmParserTyped(unittest.TestCase):
+    """Tests for typed TPM records."""
+
+    def test_typed_value(self):
+        self.assertEqual(typed_value("1000"), 1000)
+        self.assertEqual(typed_value("996.97"), 996.97)
+        self.assertEqual(typed_value("4,16"), 4.16)
+        self.assertIsNone(typed_value("None"))
+        self.assertIsNone(typed_value(""))
+        self.assertEqual(typed_value("RSA 1024"), "RSA 1024")
+        self.assertEqual(typed_value("inf"), "inf")
+
+    def test_type_record(self):
+        record = type_record({"Key parameters": "ECC 0x0003", "Algorithm": "0x0006", "Key length": "128",
+                              "Mode": "0x0040", "avg op": "250.00",
+                              "total iterations": "1000", "successful": "990", "failed": "10", "error": "None"})
+        self.assertEqual(record["Algorithm"], "0x0006")
+        self.assertEqual(record["Key parameters"], "ECC 0x0003")
+        self.assertEqual(record["parsed ids"], {"Key parameters": 3, "Algorithm": 6, "Mode": 64})
+        self.assertEqual(record["Key length"], 128)
+        self.assertIsNone(record["error"])
+        self.assertEqual(record["success ratio"], 0.99)
+        self.assertEqual(record["throughput (ops/s)"], 4.0)
+
+    def test_type_record_without_stats(self):
+        record = type_record({"Key parameters": "RSA 1024", "avg op": "0.00", "total iterations": "0"})
+        self.assertEqual(record, {"Key parameters": "RSA 1024", "avg op": 0.0, "total iterations": 0})
+
+    def test_convert_to_map_tpm_typed(self):
+        groups = [
+            ["Manufacturer; INTC"],
+            ["TPM2_Create"],
+            [
+                "Key parameters:;RSA 1024",
+                "operation stats (ms/op):;avg op:;100.00;min op:;90.00;max op:;110.00",
+                "operation info:;total iterations:;100;successful:;100;failed:;0;error:;None"
+            ]
+        ]
+        untyped = convert_to_map_tpm(groups, DEFAULT_DELIMITER)
+        self.assertEqual(untyped["TPM2_Create"][0]["avg op"], "100.00")
+
+        typed = convert_to_map_tpm(groups, DEFAULT_DELIMITER, typed=True)
+        record = typed["TPM2_Create"][0]
+        self.assertEqual((record["avg op"], record["failed"], record["error"]), (100.0, 0, None))
+        self.assertEqual((record["success ratio"], record["throughput (ops/s)"]), (1.0, 10.0))
+        self.assertEqual(typed[BASIC_INFO], untyped[BASIC_INFO])
+
+        excluded = convert_to_map_tpm(groups, DEFAULT_DELIMITER, excluded=NameMatcher(["throughput*"]), typed=True)
+        self.assertNotIn("throughput (ops/s)", excluded["TPM2_Create"][0])
+
 
 if __name__ == '__main__':
     unittest.main()
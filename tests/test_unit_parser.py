@@ -1,9 +1,12 @@
 import unittest
 import os
+import sys
 import tempfile
 
-from jcres_parser import END_OF_BASIC_INFO, parse_group, BASIC_INFO, convert_to_map
-from parser_utils import prepare_lines, create_attribute, load_exclusions, apply_exclusions
+from jcres_parser import END_OF_BASIC_INFO, parse_group, BASIC_INFO, convert_to_map, ATTRIBUTE_NAMES
+from parser_utils import (prepare_lines, create_attribute, load_exclusions, apply_exclusions, load_file,
+                          strip_compression_suffix, is_profile_file, NameMatcher, select_sections, tokenize,
+                          labelled_pairs, intern_name, name_matcher)
 
 DEFAULT_DELIMITER = ";"
 
@@ -352,6 +355,116 @@ class TestUnitParser(unittest.TestCase):
         filtered = apply_exclusions(result, set())
         self.assertIs(filtered, result)
 
+    def test_apply_exclusions_nested_records(self):
+        result = {
+            "_type": "javacard",
+            "Cipher": [[{"name": "algorithm_name", "value": "ALG_DES"}, {"name": "time_elapsed", "value": "1"}]],
+            "TPM2_Create": [{"Key parameters": "RSA 1024", "avg op": "1.0", "min op": "0.9"}],
+            "Key info": {"keys": [{"VER": "255", "ID": "1"}], "notes": ["factory keys"]},
+        }
+        filtered = apply_exclusions(result, {"time_elapsed", "re:(min|max) op", "ID", "notes"})
+        self.assertEqual(filtered["_type"], "javacard")
+        self.assertEqual(filtered["Cipher"], [[{"name": "algorithm_name", "value": "ALG_DES"}]])
+        self.assertEqual(filtered["TPM2_Create"], [{"Key parameters": "RSA 1024", "avg op": "1.0"}])
+        self.assertEqual(filtered["Key info"], {"keys": [{"VER": "255"}]})
+
+    def test_name_matcher_patterns(self):
+        matcher = NameMatcher(["Card ATR", "ram_*", "re:(min|max) op"])
+        self.assertIn("Card ATR", matcher)
+        self.assertIn("ram_reset_allocated", matcher)
+        self.assertIn("min op", matcher)
+        self.assertNotIn("avg op", matcher)
+        # Regular expressions have to match the whole name
+        self.assertNotIn("min operation", matcher)
+        self.assertNotIn("Card ATR ", matcher)
+        self.assertFalse(NameMatcher())
+
+    def test_name_matcher_names_with_glob_characters(self):
+        name = "JCSystem.getVersion()[Major.Minor]"
+        self.assertIn(name, name_matcher({name}))
+        groups = [
+            ["Card name; Test", END_OF_BASIC_INFO + ";3.0.1;"],
+            ["JCSystem", name + ";3.0;", "JCSystem.isObjectDeletionSupported;yes;"],
+        ]
+        result = convert_to_map(groups, DEFAULT_DELIMITER, excluded=name_matcher([name]))
+        self.assertEqual([a["name"] for a in result["JCSystem"]], ["JCSystem.isObjectDeletionSupported"])
+
+    def test_convert_to_map_excludes_while_parsing(self):
+        groups = [
+            ["Card name; Test", "Card ATR; 3b", END_OF_BASIC_INFO + ";3.0.1;"],
+            ["javacardx.crypto.Cipher", "ALG_DES_CBC_NOPAD;yes;3.024000;148;18;18"],
+        ]
+        result = convert_to_map(groups, DEFAULT_DELIMITER, excluded=NameMatcher(["Card ATR", "ram_*"]))
+        self.assertEqual([a["name"] for a in result[BASIC_INFO]], ["Card name", END_OF_BASIC_INFO])
+        self.assertEqual([a["name"] for a in result["javacardx.crypto.Cipher"][0]],
+                         ["algorithm_name", "is_supported", "time_elapsed", "persistent_mem_allocated"])
+
+    def test_convert_to_map_selected_sections(self):
+        groups = [
+            ["Card name; Test", END_OF_BASIC_INFO + ";3.0.1;"],
+            ["JCSystem", "JCSystem.getVersion()[Major.Minor];3.0;"],
+            ["javacardx.crypto.Cipher", "ALG_DES_CBC_NOPAD;yes;3.024000;148;18;18"],
+            ["CPLC", "CPLC.ICFabricator;4790"],
+        ]
+        result = convert_to_map(groups, DEFAULT_DELIMITER, sections=NameMatcher(["CPLC", "JCSystem"]))
+        self.assertEqual(list(result), ["_type", BASIC_INFO, "JCSystem", "CPLC"])
+        self.assertEqual(result, select_sections(convert_to_map(groups, DEFAULT_DELIMITER), {"CPLC", "JCSystem"}))
+
+    def test_load_file_compressed(self):
+        import gzip, bz2, lzma
+        content = "Card name; Test\n\nGroup;x\n"
+        expected = [["Card name; Test"], ["Group;x"]]
+        with tempfile.TemporaryDirectory() as tmp:
+            for suffix, module in ((".gz", gzip), (".bz2", bz2), (".xz", lzma)):
+                path = os.path.join(tmp, "card.csv" + suffix)
+                with module.open(path, "wt") as f:
+                    f.write(content)
+                self.assertEqual(load_file(path), expected)
+
+    def test_strip_compression_suffix(self):
+        self.assertEqual(str(strip_compression_suffix("a/card.csv.gz")), os.path.join("a", "card.csv"))
+        self.assertEqual(str(strip_compression_suffix("card.CSV.ZST")), "card.CSV")
+        self.assertEqual(str(strip_compression_suffix("card.csv")), "card.csv")
+
+    def test_is_profile_file(self):
+        self.assertTrue(is_profile_file("card.csv"))
+        self.assertTrue(is_profile_file("card.csv.xz"))
+        self.assertFalse(is_profile_file("card.json.gz"))
+        self.assertFalse(is_profile_file("card.gz"))
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize(" Card name ;  Test card ; ", ";"), ["Card name", "Test card", ""])
+        self.assertEqual(tokenize("no delimiter ", ";"), ["no delimiter"])
+        self.assertEqual(tokenize("a | b", "|"), ["a", "b"])
+
+    def test_labelled_pairs(self):
+        line = "operation info:; total iterations:; 100 ;stray;error:"
+        self.assertEqual(labelled_pairs(line, DEFAULT_DELIMITER, 1), {"total iterations": "100", "error": ""})
+        self.assertEqual(labelled_pairs(line, DEFAULT_DELIMITER, 0),
+                         {"operation info": "total iterations:", "error": ""})
+        self.assertEqual(labelled_pairs(line, DEFAULT_DELIMITER, 1, NameMatcher(["err*"])),
+                         {"total iterations": "100"})
+
+    def test_intern_name(self):
+        name = "".join(["ALG_AES", "_BLOCK_128_CBC_NOPAD"])
+        self.assertIs(intern_name(name), intern_name("".join(["ALG_AES_BLOCK", "_128_CBC_NOPAD"])))
+        self.assertIs(intern_name("".join(["algorithm", "_name"])), ATTRIBUTE_NAMES[0])
+        # Names live in the interpreter's table, which drops them once they are no longer referenced
+        self.assertIs(intern_name(name), sys.intern("".join(["ALG_AES_BLOCK_128", "_CBC_NOPAD"])))
+
+    def test_convert_to_map_shares_names_across_profiles(self):
+        def parse():
+            groups = [["Card name;A", "JavaCard support version;3.0.4"],
+                      ["javacardx.crypto.Cipher", "ALG_AES_BLOCK_128_CBC_NOPAD;yes;0.1"]]
+            return convert_to_map(groups, DEFAULT_DELIMITER)
+        first, second = parse(), parse()
+        first_row, second_row = first["javacardx.crypto.Cipher"][0], second["javacardx.crypto.Cipher"][0]
+        self.assertEqual(first_row, second_row)
+        self.assertIs(first_row[0]["value"], second_row[0]["value"])
+        # Data values such as the support status are not interned
+        self.assertIsNot(first_row[1]["value"], second_row[1]["value"])
+        self.assertIs(first[BASIC_INFO][0]["name"], second[BASIC_INFO][0]["name"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,187 @@
+"""Cross-device comparison tables of TPM operations.
+
+TPM profiles are streamed one at a time and every measured record is grouped
+under (operation, key parameters, algorithm, hash algorithm, data length,
+other parameters, device) in a hash table, so building the table is a single
+pass that is linear in the input size. Parsed profiles are not held in memory,
+only one row of running stats per key and device.
+
+The table has one row per key and device, sorted so that the devices measured
+on the same operation and parameters are adjacent, and is exported to CSV or
+to a SQLite database.
+"""
+import csv
+import io
+import logging
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import parser_api
+from parser_utils import BASIC_INFO, to_float
+from perf_report import iter_profile_paths
+from profile_diff import TPM_RESULT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Basic information attributes identifying a device, joined in this order
+DEVICE_FIELDS = ("Manufacturer", "Vendor string", "Firmware version")
+
+# Record parameters with their own column; any other parameters are joined into "parameters"
+KEY_FIELDS = {"Key parameters": "key_parameters", "Algorithm": "algorithm", "Hash algorithm": "hash_algorithm",
+              "Data length (bytes)": "data_length"}
+
+KEY_COLUMNS = ["operation", *KEY_FIELDS.values(), "parameters", "device"]
+STAT_COLUMNS = ["samples", "avg_op", "min_op", "max_op", "total_iterations", "failed", "profiles"]
+COLUMNS = KEY_COLUMNS + STAT_COLUMNS
+
+TABLE_NAME = "tpm_operations"
+
+# Output suffixes exported as SQLite databases, anything else is written as CSV
+SQLITE_SUFFIXES = ('.sqlite', '.sqlite3', '.db')
+
+
+def device_name(profile: dict, fallback: str) -> str:
+    """Name of the device a TPM profile was measured on, from its basic information."""
+    attributes = {attribute.get("name"): attribute.get("value") for attribute in profile.get(BASIC_INFO, [])
+                  if isinstance(attribute, dict)}
+    parts = [str(attributes[field]) for field in DEVICE_FIELDS if attributes.get(field)]
+    return " ".join(parts) or fallback
+
+
+def record_key(operation: str, record: dict) -> tuple:
+    """(operation, key parameters, algorithm, hash algorithm, data length, other parameters) of a record."""
+    other = "; ".join(sorted(f"{name}={value}" for name, value in record.items()
+                             if name not in TPM_RESULT_FIELDS and name not in KEY_FIELDS))
+    return (operation, *(str(record.get(field, "")) for field in KEY_FIELDS), other)
+
+
+class DeviceStats:
+    """Running stats of one operation/parameters key on one device."""
+
+    __slots__ = ("samples", "avg_sum", "min_op", "max_op", "total_iterations", "failed", "profiles", "last_profile")
+
+    def __init__(self):
+        self.samples = 0
+        self.avg_sum = 0.0
+        self.min_op: Optional[float] = None
+        self.max_op: Optional[float] = None
+        self.total_iterations = 0
+        self.failed = 0
+        self.profiles = 0
+        self.last_profile = -1
+
+    def add(self, record: dict, profile_index: int) -> None:
+        if profile_index != self.last_profile:
+            self.profiles += 1
+            self.last_profile = profile_index
+        avg_op = to_float(record.get("avg op"))
+        if avg_op is not None:
+            self.samples += 1
+            self.avg_sum += avg_op
+        min_op, max_op = to_float(record.get("min op")), to_float(record.get("max op"))
+        if min_op is not None and (self.min_op is None or min_op < self.min_op):
+            self.min_op = min_op
+        if max_op is not None and (self.max_op is None or max_op > self.max_op):
+            self.max_op = max_op
+        self.total_iterations += int(to_float(record.get("total iterations")) or 0)
+        self.failed += int(to_float(record.get("failed")) or 0)
+
+    def values(self) -> list:
+        avg_op = round(self.avg_sum / self.samples, 6) if self.samples else None
+        return [self.samples, avg_op, self.min_op, self.max_op, self.total_iterations, self.failed, self.profiles]
+
+
+class TpmComparison:
+    """Accumulates a per-device stats table over a stream of TPM profiles."""
+
+    def __init__(self):
+        self.stats: dict[tuple, DeviceStats] = {}
+        self.profiles = 0
+
+    def add_profile(self, name: str, profile: dict) -> bool:
+        """Add all records of a parsed profile; returns False (and ignores it) if it is not a TPM profile."""
+        if profile.get("_type") != "tpm":
+            return False
+        device = device_name(profile, Path(name).stem)
+        profile_index = self.profiles
+        self.profiles += 1
+        for operation, records in profile.items():
+            if operation in ("_type", BASIC_INFO) or not isinstance(records, list):
+                continue
+            for record in records:
+                if not isinstance(record, dict):
+                    continue
+                key = (*record_key(operation, record), device)
+                stats = self.stats.get(key)
+                if stats is None:
+                    stats = self.stats[key] = DeviceStats()
+                stats.add(record, profile_index)
+        return True
+
+    def rows(self) -> Iterator[list]:
+        """Table rows (see COLUMNS), sorted by operation, parameters and device."""
+        for key in sorted(self.stats):
+            yield [*key, *self.stats[key].values()]
+
+
+def build_table(paths: Iterable[str], delimiter: str = ';') -> TpmComparison:
+    """Stream TPM profiles from paths (CSV/JSON files or folders) into a comparison table."""
+    table = TpmComparison()
+    for path in iter_profile_paths(paths):
+        try:
+            profile: Optional[dict] = parser_api.load_result(str(path), delimiter)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping {path}: {e}")
+            continue
+        if profile is not None and not table.add_profile(str(path), profile):
+            logger.debug("Skipping %s: not a TPM profile", path)
+    logger.info(f"Compared {table.profiles} TPM profile(s), {len(table.stats)} row(s)")
+    return table
+
+
+def to_csv(table: TpmComparison) -> str:
+    """Render the table as CSV text with a header row."""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(COLUMNS)
+    writer.writerows(table.rows())
+    return output.getvalue()
+
+
+def write_sqlite(table: TpmComparison, path: str) -> None:
+    """Write the table into a new SQLite database at path, replacing it atomically."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        connection = sqlite3.connect(temp_path)
+        try:
+            key_columns = ", ".join(f"{column} TEXT NOT NULL" for column in KEY_COLUMNS)
+            connection.execute(f"CREATE TABLE {TABLE_NAME} ({key_columns}, samples INTEGER, avg_op REAL, "
+                               f"min_op REAL, max_op REAL, total_iterations INTEGER, failed INTEGER, "
+                               f"profiles INTEGER, PRIMARY KEY ({', '.join(KEY_COLUMNS)}))")
+            placeholders = ", ".join("?" * len(COLUMNS))
+            connection.executemany(f"INSERT INTO {TABLE_NAME} VALUES ({placeholders})", table.rows())
+            connection.execute(f"CREATE INDEX {TABLE_NAME}_device ON {TABLE_NAME} (device)")
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def export_table(table: TpmComparison, output_path: Optional[str] = None) -> None:
+    """Export to SQLite (.sqlite/.sqlite3/.db) or CSV (any other suffix), or print CSV to stdout."""
+    if output_path is None:
+        print(to_csv(table), end='')
+    elif output_path.lower().endswith(SQLITE_SUFFIXES):
+        write_sqlite(table, output_path)
+        logger.info(f"Comparison table saved to {output_path}")
+    else:
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(to_csv(table))
+        logger.info(f"Comparison table saved to {output_path}")
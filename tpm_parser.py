@@ -1,10 +1,23 @@
-from parser_utils import create_attribute
+import re
+from typing import Iterable, Optional, Union
+from parser_utils import create_attribute, tokenize, labelled_pairs, intern_name, intern_names, NameMatcher, NO_EXCLUSIONS
+from parser_utils import SUCCESS_RATIO, THROUGHPUT, PARSED_IDS  # fields added to records in typed mode
 
 BASIC_INFO = "Basic information"
 
 # Keywords that indicate the start of a configuration parameter line
 CONFIG_KEYWORDS = ["Key parameters:", "Algorithm:", "Hash algorithm:", "Data length (bytes):"]
 
+intern_names(keyword[:-1] for keyword in CONFIG_KEYWORDS)
+
+# Values converted to null in typed mode
+NULL_VALUES = ("", "None", "N/A")
+
+INT_PATTERN = re.compile(r'[+-]?\d+')
+FLOAT_PATTERN = re.compile(r'[+-]?(?:\d+(?:[.,]\d*)?|[.,]\d+)(?:[eE][+-]?\d+)?')
+# Hex id as the whole value ("0x0006") or its last word ("ECC 0x0003")
+HEX_PATTERN = re.compile(r'(?:.*\s)?(0[xX][0-9a-fA-F]+)')
+
 
 def is_tpm_operation(line: str) -> bool:
     """Check if a line is a TPM operation header (e.g., TPM2_Create, TPM2_Sign, etc.)"""
@@ -17,45 +30,30 @@ def is_config_line(line: str) -> bool:
     return any(line.startswith(kw) for kw in CONFIG_KEYWORDS)
 
 
-def parse_basic_info(group: list[str], delimiter: str) -> list[dict]:
+def parse_basic_info(group: list[str], delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS) -> list[dict]:
     """Parse the basic information group (first group in the file)"""
     attributes = []
     for line in group:
-        content = line.split(delimiter)
-        if content:
-            name = content[0].strip()
-            value = content[1].strip() if len(content) > 1 else ''
-            attributes.append(create_attribute(name, value))
+        content = tokenize(line, delimiter)
+        name = content[0]
+        if name in excluded:
+            continue
+        attributes.append(create_attribute(name, content[1] if len(content) > 1 else ''))
     return attributes
 
 
-def parse_key_value_pairs(line: str, delimiter: str) -> dict:
+def parse_key_value_pairs(line: str, delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
     """Parse a line with format 'name:;value;name:;value;...' into a dictionary.
 
     Example: 'Key parameters:;ECC 0x0003' -> {'Key parameters': 'ECC 0x0003'}
     Example: 'Algorithm:;0x0006;Key length:;128;Mode:;0x0040' ->
              {'Algorithm': '0x0006', 'Key length': '128', 'Mode': '0x0040'}
     """
-    parts = line.split(delimiter)
-    result = {}
-
-    i = 0
-    while i < len(parts):
-        part = parts[i].strip()
-        if part.endswith(':'):
-            # This is a key, next part is the value
-            key = part[:-1]  # Remove trailing colon
-            value = parts[i + 1].strip() if i + 1 < len(parts) else ''
-            result[key] = value
-            i += 2
-        else:
-            # Standalone value or malformed, skip
-            i += 1
-
-    return result
+    # Standalone values (malformed lines) are skipped
+    return labelled_pairs(line, delimiter, 0, excluded)
 
 
-def parse_stats_line(line: str, delimiter: str) -> dict:
+def parse_stats_line(line: str, delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
     """Parse operation stats or info line into a dictionary.
 
     Example: 'operation stats (ms/op):;avg op:;315.61;min op:;308.45;max op:;340.50'
@@ -64,29 +62,57 @@ def parse_stats_line(line: str, delimiter: str) -> dict:
     Example: 'operation info:;total iterations:;1000;successful:;1000;failed:;0;error:;None'
     Returns: {'total iterations': '1000', 'successful': '1000', 'failed': '0', 'error': 'None'}
     """
-    parts = line.split(delimiter)
-    result = {}
-
     # Skip the first part (e.g., "operation stats (ms/op):" or "operation info:")
-    i = 1
-    while i < len(parts):
-        part = parts[i].strip()
-        if part.endswith(':'):
-            # This is a key, next part is the value
-            key = part[:-1]  # Remove trailing colon
-            value = parts[i + 1].strip() if i + 1 < len(parts) else ''
-            result[key] = value
-            i += 2
+    return labelled_pairs(line, delimiter, 1, excluded)
+
+
+def typed_value(text: str) -> Union[str, int, float, None]:
+    """Convert a record value to an int or float (comma or dot decimals), None for null values, else keep the text."""
+    if text in NULL_VALUES:
+        return None
+    if INT_PATTERN.fullmatch(text):
+        return int(text)
+    if FLOAT_PATTERN.fullmatch(text):
+        return float(text.replace(',', '.'))
+    return text
+
+
+def type_record(record: dict, excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
+    """Typed form of a parsed record, with derived fields.
+
+    Numbers become ints and floats and null values ("None", empty) become None.
+    Hex ids such as "0x0006" or the curve of "ECC 0x0003" keep their text and are
+    added as ints under "parsed ids".
+    The success ratio (successful / total iterations) and the throughput in
+    operations per second (from "avg op" in ms/op) are computed when available.
+    """
+    typed = {}
+    parsed_ids = {}
+    for key, value in record.items():
+        hex_id = HEX_PATTERN.fullmatch(value) if isinstance(value, str) else None
+        if hex_id:
+            typed[key] = value
+            parsed_ids[key] = int(hex_id.group(1), 16)
         else:
-            i += 1
+            typed[key] = typed_value(value) if isinstance(value, str) else value
+    if parsed_ids and PARSED_IDS not in excluded:
+        typed[PARSED_IDS] = parsed_ids
 
-    return result
+    successful, total = typed.get("successful"), typed.get("total iterations")
+    if isinstance(successful, int) and isinstance(total, int) and total > 0 and SUCCESS_RATIO not in excluded:
+        typed[SUCCESS_RATIO] = successful / total
+    avg_op = typed.get("avg op")
+    if isinstance(avg_op, (int, float)) and avg_op > 0 and THROUGHPUT not in excluded:
+        typed[THROUGHPUT] = 1000.0 / avg_op
+    return typed
 
 
-def parse_data_group(group: list[str], delimiter: str) -> dict:
+def parse_data_group(group: list[str], delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS,
+                     typed: bool = False) -> dict:
     """Parse a data group (config params + operation stats + operation info).
 
-    Returns a structured object with parsed configuration and stats.
+    Returns a structured object with parsed configuration and stats, typed by
+    type_record when typed is set.
     """
     if not group:
         return None
@@ -95,22 +121,23 @@ def parse_data_group(group: list[str], delimiter: str) -> dict:
 
     # First line contains configuration parameters
     config_line = group[0].strip()
-    config_params = parse_key_value_pairs(config_line, delimiter)
+    config_params = parse_key_value_pairs(config_line, delimiter, excluded)
     result.update(config_params)
 
     # Parse remaining lines (operation stats and operation info)
     for line in group[1:]:
         if line.startswith("operation stats"):
-            stats = parse_stats_line(line, delimiter)
+            stats = parse_stats_line(line, delimiter, excluded)
             result.update(stats)
         elif line.startswith("operation info"):
-            info = parse_stats_line(line, delimiter)
+            info = parse_stats_line(line, delimiter, excluded)
             result.update(info)
 
-    return result
+    return type_record(result, excluded) if typed else result
 
 
-def convert_to_map_tpm(groups: list[list[str]], delimiter: str) -> dict:
+def convert_to_map_tpm(groups: Iterable[list[str]], delimiter: str, excluded: NameMatcher = NO_EXCLUSIONS,
+                       sections: Optional[NameMatcher] = None, typed: bool = False) -> dict:
     """Convert TPM CSV data to a structured JSON-compatible dictionary.
 
     The output structure:
@@ -124,6 +151,12 @@ def convert_to_map_tpm(groups: list[list[str]], delimiter: str) -> dict:
     - Configuration parameters (e.g., "Key parameters": "ECC 0x0003", "Scheme": "0x0018")
     - Stats (e.g., "avg op": "315.61", "min op": "308.45", "max op": "340.50")
     - Info (e.g., "total iterations": "1000", "successful": "1000", "failed": "0", "error": "None")
+
+    With typed, records hold numbers and nulls instead of strings, plus parsed hex ids,
+    the success ratio and the throughput (see type_record).
+
+    Properties whose name is in excluded are skipped while parsing. When sections is
+    given, data groups of other operations are skipped without being tokenized.
     """
     result = {"_type": "tpm"}
     current_operation = None  # Track the current TPM operation
@@ -136,24 +169,35 @@ def convert_to_map_tpm(groups: list[list[str]], delimiter: str) -> dict:
 
         if i == 0:
             # First group is always basic information
-            result[BASIC_INFO] = parse_basic_info(group, delimiter)
+            result[BASIC_INFO] = parse_basic_info(group, delimiter, excluded)
         elif is_tpm_operation(first_line):
             # This is an operation header group (just "TPM2_Create" etc.)
-            current_operation = first_line
+            if sections is not None and first_line not in sections:
+                # Data groups up to the next selected operation are skipped
+                current_operation = None
+                continue
+            current_operation = intern_name(first_line)
             # Initialize array for this operation if not exists
             if current_operation not in result:
                 result[current_operation] = []
         elif is_config_line(first_line):
             # This is a data group belonging to the current operation
-            test_result = parse_data_group(group, delimiter)
-
-            if current_operation and test_result:
-                result[current_operation].append(test_result)
+            if current_operation:
+                test_result = parse_data_group(group, delimiter, excluded, typed)
+                if test_result:
+                    result[current_operation].append(test_result)
         else:
             # Handle any other groups - try to parse them similarly
             if current_operation:
-                test_result = parse_data_group(group, delimiter)
+                test_result = parse_data_group(group, delimiter, excluded, typed)
                 if test_result:
                     result[current_operation].append(test_result)
 
     return result
+
+
+def convert_header_to_map_tpm(groups: Iterable[list[str]], delimiter: str,
+                              excluded: NameMatcher = NO_EXCLUSIONS) -> dict:
+    """Header-only conversion: the basic information group, without reading any further group."""
+    basic_info = next(iter(groups), [])
+    return {"_type": "tpm", BASIC_INFO: parse_basic_info(basic_info, delimiter, excluded)}